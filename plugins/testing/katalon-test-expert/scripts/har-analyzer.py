@@ -4,211 +4,1610 @@ Katalon HAR File Analyzer
 Analyzes HTTP Archive (HAR) files from Katalon tests for performance and errors
 """
 
+import bisect
+import calendar
+import glob
+import hashlib
+import heapq
 import json
+import math
+import operator
+import os
+import re
 import sys
-from datetime import datetime
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Any
-from collections import defaultdict
+from typing import Dict, List, Any, Iterator
+from collections import defaultdict, Counter
+from collections.abc import Mapping
+from array import array
+from itertools import islice
+
+# ndjson_writer.py sits next to this script; importable however this file is loaded
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from ndjson_writer import NdjsonWriter
 
 try:
-    from haralyzer import HarParser, HarPage
+    from haralyzer import HarParser
 except ImportError:
     print("Error: haralyzer not installed. Run: pip3 install haralyzer")
     sys.exit(1)
 
+# Optional: event-based JSON parsing for --stream mode
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:
+    ijson = None
+
+
+# Bump whenever analyze() output changes so cached results are recomputed
+ANALYZER_VERSION = '2.6'
+CACHE_DIR_ENV = 'KATALON_HAR_CACHE_DIR'
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_MAX_ENTRIES = 2000
+
+SLOW_REQUEST_THRESHOLD_MS = 1000
+BATCH_SLOWEST_LIMIT = 20
+WATERFALL_LIMIT = 20
+ERROR_SAMPLE_LIMIT = 10
+ENDPOINT_LIMIT = 50
+CRITICAL_PATH_LIMIT = 50
+UNCOMPRESSED_MIN_BYTES = 10 * 1024
+NETWORK_ROW_LIMIT = 20
+# Sections already emitted as one NDJSON record per request
+NDJSON_PER_REQUEST_SECTIONS = ('slow_requests', 'failed_requests', 'timing_waterfall')
+# Sections of analyze(), in output order; ON_REQUEST_SECTIONS are left out of
+# the default result and only computed when asked for (sections=/--sections)
+HAR_SECTIONS = ('summary', 'performance', 'errors', 'slow_requests', 'failed_requests', 'resource_breakdown',
+                'timing_waterfall', 'latency', 'endpoints', 'timeline', 'network')
+ON_REQUEST_SECTIONS = ('latency', 'endpoints', 'timeline', 'network')
+ANALYZE_SECTIONS = tuple(name for name in HAR_SECTIONS if name not in ON_REQUEST_SECTIONS)
+# Sections batch mode merges across files
+BATCH_SECTIONS = ('summary', 'errors', 'slow_requests', 'latency')
+
+# compare mode: a change is a regression when it exceeds both the relative and
+# absolute threshold and (with enough samples to test) is significant at alpha
+COMPARE_THRESHOLDS = {
+    'latency_pct': 20.0,
+    'latency_ms': 50.0,
+    'size_pct': 20.0,
+    'size_bytes': 1024.0,
+    'alpha': 0.05
+}
+MIN_SIGNIFICANCE_SAMPLES = 5
+REGRESSION_EXIT_CODE = 2
+TIMING_PHASES = ('blocked', 'dns', 'connect', 'ssl', 'send', 'wait', 'receive')
+LATENCY_SERIES = TIMING_PHASES + ('total',)
+PERCENTILES = (50, 90, 95, 99)
+HISTOGRAM_RELATIVE_ERROR = 0.01
+# Entries per decoding pass when the store keeps the transfer columns
+DECODE_CHUNK_ENTRIES = 4096
+
+
+def _classify_error(status: int) -> str:
+    """Classify HTTP error by status code"""
+    if status == 0:
+        return 'Network Error'
+    elif 400 <= status < 500:
+        return 'Client Error'
+    elif 500 <= status < 600:
+        return 'Server Error'
+    else:
+        return 'Unknown Error'
+
+
+def _get_resource_type(mime_type: str) -> str:
+    """Categorize resource by MIME type"""
+    if 'javascript' in mime_type or 'json' in mime_type:
+        return 'JavaScript'
+    elif 'css' in mime_type:
+        return 'CSS'
+    elif 'html' in mime_type:
+        return 'HTML'
+    elif 'image' in mime_type:
+        return 'Image'
+    elif 'font' in mime_type:
+        return 'Font'
+    elif 'video' in mime_type:
+        return 'Video'
+    else:
+        return 'Other'
+
+
+_EMPTY = {}
+
+
+def _or_default(value, default):
+    return default if value is None else value
+
+
+def _size(value, default: float = -1) -> float:
+    """A HAR size field as a number, default (-1) when missing or not a number"""
+    return value if isinstance(value, (int, float)) else default
+
+
+def _header(message: Dict[str, Any], name: str) -> str:
+    """Value of the first header called name (lowercase), or None"""
+    for header in message.get('headers') or ():
+        if header.get('name', '').lower() == name:
+            return header.get('value')
+    return None
+
+
+def _number(value: float):
+    """Report whole-number floats from the store as ints, as they appear in the HAR"""
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+_TIMESTAMP_PATTERN = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(\.\d+)?\s*(Z|[+-]\d{2}:?\d{2})?$')
+_minute_epochs = {}
+
+
+def _epoch_ms(timestamp: str) -> float:
+    """
+    Parse an ISO 8601 startedDateTime into epoch milliseconds (NaN if invalid).
+
+    The epoch of each distinct date/hour/minute/offset prefix is computed once,
+    since consecutive HAR entries share it. Once a prefix is known, timestamps
+    in the usual ...:SS.fffZ or ...:SS.fff+HH:MM form only have their seconds
+    checked and parsed.
+    """
+    if timestamp and timestamp[16:17] == ':':
+        if timestamp[-1] == 'Z':
+            key, seconds = timestamp[:16] + 'Z', timestamp[17:-1]
+        elif timestamp[-3:-2] == ':' and timestamp[-6:-5] in ('+', '-'):
+            key, seconds = timestamp[:16] + timestamp[-6:], timestamp[17:-6]
+        else:
+            key = seconds = None
+        base = _minute_epochs.get(key)
+        if base is not None and seconds[:2].isdecimal():
+            if len(seconds) == 2:
+                return base + int(seconds) * 1000
+            if seconds[2] == '.' and seconds[3:].isdecimal():
+                return base + int(seconds[:2]) * 1000 + float(seconds[2:]) * 1000
+
+    match = _TIMESTAMP_PATTERN.match(timestamp or '')
+    if not match:
+        return math.nan
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    key = timestamp[:16] + (offset or '')
+    base = _minute_epochs.get(key)
+    if base is None:
+        base = calendar.timegm((int(year), int(month), int(day), int(hour), int(minute), 0)) * 1000.0
+        if offset and offset != 'Z':
+            sign = -1 if offset[0] == '+' else 1
+            digits = offset[1:].replace(':', '')
+            base += sign * (int(digits[:2]) * 60 + int(digits[2:])) * 60000
+        if len(_minute_epochs) > 100000:
+            _minute_epochs.clear()
+        _minute_epochs[key] = base
+    return base + int(second) * 1000 + (float(fraction) * 1000 if fraction else 0)
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def _start_time_ms(timestamp: str) -> float:
+    """Epoch milliseconds of one startedDateTime, as HarEntryStore.start_times() reads it"""
+    try:
+        return (datetime.fromisoformat(timestamp) - _EPOCH) / _MILLISECOND
+    except (TypeError, ValueError):
+        return _epoch_ms(timestamp)
+
+
+class StringTable:
+    """Interned string table mapping values to compact integer ids"""
+
+    def __init__(self):
+        self._ids = {}
+        self._values = []
+
+    def intern(self, value) -> int:
+        return self._ids.setdefault(value, len(self._ids))
+
+    def get_id(self, value) -> int:
+        """Id of an interned value, or None if it was never seen"""
+        return self._ids.get(value)
+
+    @property
+    def values(self) -> List[Any]:
+        """Interned values in id order"""
+        if len(self._values) != len(self._ids):
+            self._values = list(self._ids)
+        return self._values
+
+    def __getitem__(self, index: int):
+        return self.values[index]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class HarEntryStore:
+    """
+    Compact columnar store of decoded HAR entries.
+
+    Each entry is decoded once into typed arrays (status, time, bodySize and
+    one column per timing phase) plus interned URL, method, MIME type, status
+    text and pageref tables. Statistics then run over whole columns instead
+    of chasing nested dicts per entry. Missing timing phases are stored as -1
+    and a missing statusText is interned as None.
+
+    With transfer=True, transfer details (headersSize, content size and
+    compression, _transferSize, the Content-Encoding header,
+    serverIPAddress and the connection id) are kept too; missing sizes are
+    -1 and missing strings are interned as None. Only network_efficiency()
+    reads them, so a store built without them can get them later from
+    add_transfer().
+    """
+
+    def __init__(self, transfer: bool = True):
+        self.transfer = transfer
+        self.status = array('i')
+        self.time = array('d')
+        self.body_size = array('d')
+        self.timings = {phase: array('d') for phase in TIMING_PHASES}
+        self.url = array('I')
+        self.method = array('I')
+        self.mime = array('I')
+        self.status_text = array('I')
+        self.pageref = array('i')
+        self.headers_size = array('d')
+        self.content_size = array('d')
+        self.compression = array('d')
+        self.transfer_size = array('d')
+        self.encoding = array('I')
+        self.server_ip = array('I')
+        self.connection = array('I')
+        self.started = []
+        self._start_ms = None
+        self._url_hosts = None
+        self._host_ids = None
+
+        self.urls = StringTable()
+        self.methods = StringTable()
+        self.mime_types = StringTable()
+        self.status_texts = StringTable()
+        self.pagerefs = StringTable()
+        self.encodings = StringTable()
+        self.server_ips = StringTable()
+        self.connections = StringTable()
+
+    @classmethod
+    def from_entries(cls, entries, transfer: bool = True) -> 'HarEntryStore':
+        store = cls(transfer)
+        store.extend(entries)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+    def append(self, entry: Dict[str, Any]):
+        """Decode one HAR entry into the columns"""
+        self.extend((entry,))
+
+    def extend(self, entries):
+        """
+        Decode entries, appending each field to its column. The transfer
+        fields are decoded in a second pass over each chunk of entries, so
+        a store without them skips that work entirely.
+        """
+        if not self.transfer:
+            self._decode(entries)
+            return
+        entries = iter(entries)
+        while True:
+            chunk = list(islice(entries, DECODE_CHUNK_ENTRIES))
+            if not chunk:
+                break
+            self._decode(chunk)
+            self._decode_transfer(chunk)
+
+    def add_transfer(self, entries):
+        """
+        Decode the transfer columns of a store built with transfer=False.
+        entries must be the ones already in the store, in the same order.
+        """
+        if self.transfer:
+            return
+        self._decode_transfer(entries)
+        if len(self.headers_size) != len(self):
+            for column in self._transfer_columns():
+                del column[:]
+            raise ValueError(f"Expected {len(self)} entries for the transfer columns, "
+                             f"got {len(self.headers_size)}")
+        self.transfer = True
+
+    def _decode(self, entries):
+        """
+        Decode the core fields in a single pass.
+
+        The fast path reads the fields the HAR spec requires by subscript
+        and looks up already interned methods, MIME types and status texts.
+        An entry that misses one, has a null or non-numeric number, or
+        brings a new value is rolled back and decoded again field by field
+        by _decode_checked().
+        """
+        status, elapsed, body_size = self.status.append, self.time.append, self.body_size.append
+        blocked, dns, connect, ssl, send, wait, receive = (self.timings[phase].append for phase in TIMING_PHASES)
+        url, method, mime = self.url.append, self.method.append, self.mime.append
+        status_text, pageref, started = self.status_text.append, self.pageref.append, self.started.append
+        url_ids, method_ids, mime_ids = self.urls._ids, self.methods._ids, self.mime_types._ids
+        status_text_ids, pageref_ids = self.status_texts._ids, self.pagerefs._ids
+        count = len(self.status)
+
+        for entry in entries:
+            try:
+                response = entry['response']
+                timing = entry['timings']
+                status(response['status'])
+                elapsed(entry['time'])
+                body_size(response['bodySize'])
+                blocked(timing['blocked'])
+                dns(timing['dns'])
+                connect(timing['connect'])
+                ssl(timing['ssl'])
+                send(timing['send'])
+                wait(timing['wait'])
+                receive(timing['receive'])
+                request = entry['request']
+                value = request['url']
+                url(url_ids.setdefault(value, len(url_ids)))
+                method(method_ids[request['method']])
+                mime(mime_ids[response['content']['mimeType']])
+                status_text(status_text_ids[response['statusText']])
+                value = entry.get('pageref')
+                pageref(-1 if value is None else pageref_ids[value])
+                started(entry['startedDateTime'])
+            except (KeyError, TypeError, OverflowError):
+                self._decode_checked(count, entry)
+            count += 1
+
+    def _decode_checked(self, count: int, entry: Dict[str, Any]):
+        """Drop whatever _decode() appended for entry `count` and decode it with defaults and type checks"""
+        columns = (self.status, self.time, self.body_size, *self.timings.values(), self.url, self.method,
+                   self.mime, self.status_text, self.pageref, self.started)
+        for column in columns:
+            del column[count:]
+
+        get = entry.get
+        request = get('request') or _EMPTY
+        response = get('response') or _EMPTY
+        timings = get('timings') or _EMPTY
+        status = response.get('status')
+        self.status.append(int(status) if isinstance(status, (int, float)) and -2 ** 31 <= status < 2 ** 31 else 0)
+        self.time.append(_size(get('time'), 0))
+        self.body_size.append(_size(response.get('bodySize'), 0))
+        for phase, column in self.timings.items():
+            column.append(_size(timings.get(phase)))
+        self.url.append(self.urls.intern(request.get('url', 'unknown')))
+        self.method.append(self.methods.intern(request.get('method', 'unknown')))
+        self.mime.append(self.mime_types.intern((response.get('content') or _EMPTY).get('mimeType', 'unknown')))
+        self.status_text.append(self.status_texts.intern(response.get('statusText')))
+        value = get('pageref')
+        self.pageref.append(-1 if value is None else self.pagerefs.intern(value))
+        self.started.append(get('startedDateTime'))
+
+    def _decode_transfer(self, entries):
+        """
+        Decode the transfer fields in a single pass. These are mostly
+        optional, so they are read with defaults; an entry with a null or
+        non-numeric size has its sizes rolled back and appended again with
+        type checks.
+        """
+        headers_size, content_size = self.headers_size.append, self.content_size.append
+        compression, transfer_size = self.compression.append, self.transfer_size.append
+        encoding, server_ip, connection = self.encoding.append, self.server_ip.append, self.connection.append
+        encoding_ids, server_ip_ids, connection_ids = self.encodings._ids, self.server_ips._ids, self.connections._ids
+        count = len(self.headers_size)
+
+        for entry in entries:
+            get = entry.get
+            response = get('response') or _EMPTY
+            content = response.get('content') or _EMPTY
+            try:
+                headers_size(response.get('headersSize', -1))
+                content_size(content.get('size', -1))
+                compression(content.get('compression', -1))
+                transfer_size(response.get('_transferSize', -1))
+            except (TypeError, OverflowError):
+                self._append_checked_transfer(count, entry)
+
+            value = _header(response, 'content-encoding')
+            encoding(encoding_ids.setdefault(value, len(encoding_ids)))
+            value = get('serverIPAddress')
+            server_ip(server_ip_ids.setdefault(value, len(server_ip_ids)))
+            value = get('connection') or None
+            connection(connection_ids.setdefault(value, len(connection_ids)))
+            count += 1
+
+    def _transfer_columns(self) -> tuple:
+        return (self.headers_size, self.content_size, self.compression, self.transfer_size,
+                self.encoding, self.server_ip, self.connection)
+
+    def _append_checked_transfer(self, count: int, entry: Dict[str, Any]):
+        """Drop the partially appended transfer sizes of entry `count` and append them with null/type checks"""
+        for column in (self.headers_size, self.content_size, self.compression, self.transfer_size):
+            del column[count:]
+
+        response = entry.get('response') or _EMPTY
+        content = response.get('content') or _EMPTY
+        self.headers_size.append(_size(response.get('headersSize')))
+        self.content_size.append(_size(content.get('size')))
+        self.compression.append(_size(content.get('compression')))
+        self.transfer_size.append(_size(response.get('_transferSize')))
+
+    def start_times(self) -> array:
+        """
+        Entry start times in epoch milliseconds (NaN if unparseable), parsed
+        once. datetime.fromisoformat() reads the whole column at C speed;
+        only if it rejects a value (or finds no UTC offset) is each value
+        parsed on its own, falling back to _epoch_ms() where it fails.
+        """
+        if self._start_ms is None or len(self._start_ms) != len(self.started):
+            try:
+                self._start_ms = array('d', [(started - _EPOCH) / _MILLISECOND
+                                             for started in map(datetime.fromisoformat, self.started)])
+            except (TypeError, ValueError):
+                self._start_ms = array('d', map(_start_time_ms, self.started))
+        return self._start_ms
+
+    def url_hosts(self) -> List[str]:
+        """Hostname of each distinct URL, indexed by URL id"""
+        if self._url_hosts is None or len(self._url_hosts) != len(self.urls):
+            self._url_hosts = _hosts(self.urls.values)
+        return self._url_hosts
+
+    def host_ids(self) -> array:
+        """Host id of every entry, indexing the `hosts` table (built on first call)"""
+        if self._host_ids is None or len(self._host_ids) != len(self.url):
+            self.hosts = StringTable()
+            host_of_url = [self.hosts.intern(host) for host in self.url_hosts()]
+            self._host_ids = array('I', map(host_of_url.__getitem__, self.url))
+        return self._host_ids
+
+    def error_indices(self) -> List[int]:
+        """Indices of entries with HTTP status >= 400"""
+        return [i for i, status in enumerate(self.status) if status >= 400]
+
+    def failed_indices(self) -> List[int]:
+        """Indices of entries with a network error or HTTP status >= 400"""
+        return [i for i, status in enumerate(self.status) if status == 0 or status >= 400]
+
+    def slow_indices(self, threshold_ms: float) -> List[int]:
+        """Indices of entries slower than threshold, slowest first"""
+        time = self.time
+        slow = [i for i, value in enumerate(time) if value > threshold_ms]
+        return sorted(slow, key=time.__getitem__, reverse=True)
+
+    def phase_total(self, phase: str, pageref: str = None) -> float:
+        """Sum of the non-negative values of a timing phase, optionally for one page"""
+        column = self.timings[phase]
+        if pageref is None:
+            return sum(value for value in column if value > 0)
+        page_id = self.pagerefs.get_id(pageref)
+        if page_id is None:
+            return 0
+        if len(self.pagerefs) == 1 and -1 not in self.pageref:
+            # Every entry belongs to this page
+            return sum(value for value in column if value > 0)
+        return sum(value for value, ref in zip(column, self.pageref) if ref == page_id and value > 0)
+
+    def mime_totals(self):
+        """Per MIME-type id request counts and summed body sizes"""
+        counts = [0] * len(self.mime_types)
+        sizes = [0.0] * len(self.mime_types)
+        for mime, size in zip(self.mime, self.body_size):
+            counts[mime] += 1
+            sizes[mime] += size
+        return counts, sizes
+
+
+def _selected_sections(sections=None) -> tuple:
+    """Validated, de-duplicated section names; ANALYZE_SECTIONS when None"""
+    if sections is None:
+        return ANALYZE_SECTIONS
+    unknown = [name for name in sections if name not in HAR_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown HAR section(s): {', '.join(unknown)} "
+                         f"(choose from {', '.join(HAR_SECTIONS)})")
+    return tuple(dict.fromkeys(sections))
+
+
+def analyze_store(store: HarEntryStore, pages: List[Dict[str, Any]],
+                  slow_threshold_ms: float = SLOW_REQUEST_THRESHOLD_MS,
+                  waterfall_limit: int = WATERFALL_LIMIT,
+                  error_limit: int = ERROR_SAMPLE_LIMIT,
+                  histograms: Dict[str, Any] = None, sections=None) -> Dict[str, Any]:
+    """Build the analysis sections (ANALYZE_SECTIONS by default) from a columnar entry store"""
+    return {name: store_section(store, pages, name, slow_threshold_ms, waterfall_limit, error_limit, histograms)
+            for name in _selected_sections(sections)}
+
+
+def store_section(store: HarEntryStore, pages: List[Dict[str, Any]], name: str,
+                  slow_threshold_ms: float = SLOW_REQUEST_THRESHOLD_MS,
+                  waterfall_limit: int = WATERFALL_LIMIT,
+                  error_limit: int = ERROR_SAMPLE_LIMIT,
+                  histograms: Dict[str, Any] = None):
+    """One analysis section (see HAR_SECTIONS) from a columnar entry store"""
+    if name == 'summary':
+        return _summary(store, pages)
+    if name == 'performance':
+        return _page_performance(store, pages)
+    if name == 'errors':
+        return _error_section(store, error_limit)
+    if name == 'slow_requests':
+        return slow_request_rows(store, slow_threshold_ms)
+    if name == 'failed_requests':
+        return failed_request_rows(store)
+    if name == 'resource_breakdown':
+        return _resource_breakdown(store)
+    if name == 'timing_waterfall':
+        return waterfall_rows(store, waterfall_limit)
+    if name == 'latency':
+        return summarize_latency(histograms if histograms is not None else latency_histograms(store))
+    if name == 'endpoints':
+        return endpoint_rows(store)
+    if name == 'timeline':
+        return timeline(store)
+    if name == 'network':
+        return network_efficiency(store)
+    raise ValueError(f"Unknown HAR section: {name} (choose from {', '.join(HAR_SECTIONS)})")
+
+
+def _summary(store: HarEntryStore, pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Request count, sizes, summed and wall-clock duration"""
+    timestamp = 'unknown'
+    if pages and pages[0].get('startedDateTime'):
+        timestamp = pages[0]['startedDateTime']
+    elif len(store) and store.started[0]:
+        timestamp = store.started[0]
+
+    total_duration = _number(sum(store.time))
+    wall_clock = _wall_clock(store)
+    return {
+        'total_requests': len(store),
+        'total_size_kb': sum(store.body_size) / 1024,
+        'total_duration_ms': total_duration,
+        'wall_clock_ms': _number(round(wall_clock, 3)) if wall_clock == wall_clock else total_duration,
+        'pages': len(pages),
+        'timestamp': timestamp
+    }
+
+
+def _wall_clock(store: HarEntryStore) -> float:
+    """
+    Span from the first start to the last end of the entries with a
+    parseable startedDateTime (NaN when there are none); what timeline()
+    reports as wall_clock_ms
+    """
+    starts, time = store.start_times(), store.time
+    if starts and not math.isnan(sum(starts)) and min(time) >= 0:
+        # Every start parsed and no negative time: whole-column builtins will do
+        return max(map(operator.add, starts, time)) - min(starts)
+    timed = [i for i, start in enumerate(starts) if start == start]  # drop NaN
+    if not timed:
+        return math.nan
+    return max(starts[i] + max(time[i], 0) for i in timed) - min(starts[i] for i in timed)
+
+
+def _error_section(store: HarEntryStore, error_limit: int) -> Dict[str, Any]:
+    """Error count per type and the first error_limit errors"""
+    urls, status_texts = store.urls, store.status_texts
+    error_indices = store.error_indices()
+    error_counts = defaultdict(int)
+    for i in error_indices:
+        error_counts[_classify_error(store.status[i])] += 1
+    return {
+        'total_errors': len(error_indices),
+        'error_breakdown': dict(error_counts),
+        'errors': [{
+            'url': urls[store.url[i]],
+            'status': store.status[i],
+            'status_text': status_texts[store.status_text[i]] or '',
+            'type': _classify_error(store.status[i]),
+            'time': store.started[i]
+        } for i in error_indices[:error_limit]]
+    }
+
+
+def failed_request_rows(store: HarEntryStore) -> List[Dict[str, Any]]:
+    """Every failed request (status 0 or >= 400)"""
+    urls, methods, status_texts = store.urls, store.methods, store.status_texts
+    return [{
+        'url': urls[store.url[i]],
+        'method': methods[store.method[i]],
+        'status': store.status[i],
+        'error': _or_default(status_texts[store.status_text[i]], 'Unknown error'),
+        'time': store.started[i]
+    } for i in store.failed_indices()]
+
+
+def _resource_breakdown(store: HarEntryStore) -> Dict[str, Any]:
+    """Request count and size per resource type"""
+    resource_stats = {}
+    counts, sizes = store.mime_totals()
+    for mime_id, mime_type in enumerate(store.mime_types.values):
+        stats = resource_stats.setdefault(_get_resource_type(mime_type), {'count': 0, 'size_kb': 0})
+        stats['count'] += counts[mime_id]
+        stats['size_kb'] += sizes[mime_id] / 1024
+    return resource_stats
+
+
+def slow_request_rows(store: HarEntryStore, threshold_ms: float) -> List[Dict[str, Any]]:
+    """Requests slower than threshold, slowest first"""
+    urls, methods = store.urls, store.methods
+    return [{
+        'url': urls[store.url[i]],
+        'method': methods[store.method[i]],
+        'time_ms': _number(store.time[i]),
+        'size_kb': store.body_size[i] / 1024,
+        'status': store.status[i]
+    } for i in store.slow_indices(threshold_ms)]
+
+
+def waterfall_rows(store: HarEntryStore, limit: int) -> List[Dict[str, Any]]:
+    """Timing waterfall rows for the first `limit` entries"""
+    waterfall = []
+    starts = store.start_times()
+    origin = min((start for start in starts if start == start), default=math.nan)
+    for i in range(min(limit, len(store))):
+        offset = starts[i] - origin
+        row = {'url': store.urls[store.url[i]], 'start_time': store.started[i],
+               'start_offset_ms': _number(round(offset, 3)) if offset == offset else None}
+        for phase in TIMING_PHASES:
+            row[phase] = _number(store.timings[phase][i])
+        row['total'] = _number(store.time[i])
+        waterfall.append(row)
+    return waterfall
+
+
+def _concurrency(starts: List[float], ends: List[float]) -> Dict[str, Any]:
+    """
+    Peak concurrent requests, busy time (union of the [start, end] intervals)
+    and average concurrency while busy. At the same instant a request that
+    ends is no longer in flight when another starts, except a zero-length one.
+    """
+    # Concurrency right after the k-th start: k + 1 minus the requests already finished
+    finished = sorted(end for start, end in zip(starts, ends) if end > start)
+    instant = sorted(end for start, end in zip(starts, ends) if end <= start)
+    right, left = bisect.bisect_right, bisect.bisect_left
+    peak = max((k + 1 - right(finished, start) - left(instant, start) for k, start in enumerate(sorted(starts))),
+               default=0)
+
+    busy = 0.0
+    period_start = period_end = None
+    for start, end in sorted(zip(starts, ends)):
+        if period_end is None or start >= period_end:
+            if period_end is not None:
+                busy += period_end - period_start
+            period_start, period_end = start, end
+        elif end > period_end:
+            period_end = end
+    if period_end is not None:
+        busy += period_end - period_start
+
+    in_flight = sum(end - start for start, end in zip(starts, ends))
+    return {
+        'requests': len(starts),
+        'peak_concurrency': peak,
+        'avg_concurrency': round(in_flight / busy, 2) if busy else 0,
+        'busy_ms': _number(round(busy, 3))
+    }
+
+
+def _critical_path(store: HarEntryStore, indices: List[int], starts, ends) -> List[int]:
+    """
+    Walk back from the request that finishes last: each step's blocker is the
+    request that finished most recently before it started. The chain is the
+    sequence of requests that bounded the wall-clock time.
+    """
+    by_end = sorted(indices, key=ends.__getitem__)
+    end_times = [ends[i] for i in by_end]
+    path = []
+    position = len(by_end) - 1
+    while position >= 0:
+        current = by_end[position]
+        path.append(current)
+        # Latest request that had finished when this one started (and started before it)
+        position = bisect.bisect_right(end_times, starts[current], 0, position) - 1
+        while position >= 0 and starts[by_end[position]] >= starts[current]:
+            position -= 1
+    path.reverse()
+    return path
+
+
+def timeline(store: HarEntryStore, critical_path_limit: int = CRITICAL_PATH_LIMIT) -> Dict[str, Any]:
+    """
+    Reconstruct the request timeline from startedDateTime and time.
+
+    Unlike summing entry times (which overstates wall time when requests
+    overlap), this reports the true wall-clock span, the time with at least
+    one request in flight, peak and average concurrency overall and per host,
+    and the critical path of requests each blocked on the previous one.
+    Entries without a parseable startedDateTime are skipped.
+    """
+    starts = store.start_times()
+    ends = array('d', (start + max(elapsed, 0) for start, elapsed in zip(starts, store.time)))
+    indices = [i for i, start in enumerate(starts) if start == start]  # drop NaN
+    if not indices:
+        return {}
+
+    origin = min(starts[i] for i in indices)
+    wall_clock = max(ends[i] for i in indices) - origin
+    overall = _concurrency([starts[i] for i in indices], [ends[i] for i in indices])
+
+    host_ids = store.host_ids()
+    by_host = defaultdict(list)
+    for i in indices:
+        by_host[host_ids[i]].append(i)
+    hosts = {store.hosts[host_id]: _concurrency([starts[i] for i in group], [ends[i] for i in group])
+             for host_id, group in by_host.items()}
+
+    path = _critical_path(store, indices, starts, ends)
+    steps = []
+    previous_end = origin
+    for i in path:
+        steps.append({
+            'url': store.urls[store.url[i]],
+            'method': store.methods[store.method[i]],
+            'status': store.status[i],
+            'start_offset_ms': _number(round(starts[i] - origin, 3)),
+            'time_ms': _number(store.time[i]),
+            'gap_before_ms': _number(round(max(starts[i] - previous_end, 0), 3))
+        })
+        previous_end = ends[i]
+    path_time = sum(step['time_ms'] for step in steps if step['time_ms'] > 0)
+    if len(steps) > critical_path_limit:
+        # Keep the longest steps, still in timeline order
+        longest = set(heapq.nlargest(critical_path_limit, range(len(steps)), key=lambda n: steps[n]['time_ms']))
+        steps = [step for n, step in enumerate(steps) if n in longest]
+
+    return {
+        'wall_clock_ms': _number(round(wall_clock, 3)),
+        'busy_ms': overall['busy_ms'],
+        'idle_ms': _number(round(wall_clock - overall['busy_ms'], 3)),
+        'summed_request_time_ms': _number(round(sum(max(store.time[i], 0) for i in indices), 3)),
+        'peak_concurrency': overall['peak_concurrency'],
+        'avg_concurrency': overall['avg_concurrency'],
+        'by_host': hosts,
+        'critical_path': {
+            'requests': len(path),
+            'request_time_ms': _number(round(path_time, 3)),
+            'gap_ms': _number(round(wall_clock - path_time, 3)),
+            'steps': steps
+        }
+    }
+
+
+def _is_text_mime(mime_type: str) -> bool:
+    """Whether a MIME type is text that HTTP compression would shrink"""
+    mime_type = (mime_type or '').lower()
+    return mime_type.startswith('text/') or any(
+        kind in mime_type for kind in ('json', 'javascript', 'xml', 'svg', 'font/ttf', 'font/otf'))
+
+
+def network_efficiency(store: HarEntryStore, uncompressed_min_bytes: int = UNCOMPRESSED_MIN_BYTES,
+                       limit: int = NETWORK_ROW_LIMIT) -> Dict[str, Any]:
+    """
+    Connection reuse and transfer efficiency, per host.
+
+    A request opened a new TCP connection when its connect timing is >= 0
+    (-1 means an existing connection was reused) and a new TLS session when
+    ssl >= 0. Entries without any timings are counted as unknown and left
+    out of the reuse rate (None when no entry of a host has timings).
+    Distinct connection ids and server IPs are reported when the exporter
+    recorded them. Compression savings are content.compression when
+    present, else the decoded size minus the body size on the wire.
+
+    Also lists successful text responses of at least uncompressed_min_bytes
+    sent without Content-Encoding, and URLs downloaded (status 200, non-empty
+    body) more than once.
+    """
+    if not store.transfer:
+        raise ValueError("network_efficiency() needs the transfer columns (HarEntryStore(transfer=True))")
+    host_ids = store.host_ids()
+    text_mimes = [_is_text_mime(mime) for mime in store.mime_types.values]
+    identity = {store.encodings.get_id(None), store.encodings.get_id('identity')}
+
+    # Per host id: [requests, new connections, unknown, new TLS, connection ms, body, content, headers,
+    # transfer, compression saved]
+    totals = [[0, 0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0] for _ in range(len(store.hosts))]
+    uncompressed = []
+    downloads = defaultdict(list)
+    columns = zip(host_ids, store.timings['connect'], store.timings['ssl'], zip(*store.timings.values()),
+                  store.body_size, store.content_size, store.headers_size, store.transfer_size, store.compression)
+    for host_id, connect, ssl, phases, body, content, headers, transfer, saved in columns:
+        stats = totals[host_id]
+        stats[0] += 1
+        if connect >= 0:
+            stats[1] += 1
+            stats[4] += connect
+        elif max(phases) < 0:
+            stats[2] += 1
+        if ssl >= 0:
+            stats[3] += 1
+
+        body = body if body > 0 else 0
+        headers = headers if headers > 0 else 0
+        stats[5] += body
+        stats[7] += headers
+        if content > 0:
+            stats[6] += content
+        stats[8] += transfer if transfer >= 0 else body + headers
+        if saved < 0:
+            saved = content - body if body > 0 and content > body else 0
+        stats[9] += saved
+
+    # Compression and duplicate checks only concern successful responses with a body
+    columns = zip(store.status, store.body_size, store.content_size, store.compression, store.encoding,
+                  store.mime, store.url)
+    for i, (status, body, content, saved, encoding, mime, url_id) in enumerate(columns):
+        if 200 <= status < 300 and body > 0:
+            if saved < 0:
+                saved = content - body if content > body else 0
+            compressed = saved > 0 or encoding not in identity
+            if not compressed and text_mimes[mime] and max(body, content) >= uncompressed_min_bytes:
+                uncompressed.append(i)
+            if status == 200:
+                downloads[url_id].append(body)
+
+    connection_ids, server_ips = defaultdict(set), defaultdict(set)
+    for host_id, connection in set(zip(host_ids, store.connection)):
+        connection_ids[host_id].add(connection)
+    for host_id, server_ip in set(zip(host_ids, store.server_ip)):
+        server_ips[host_id].add(server_ip)
+
+    no_id = {store.connections.get_id(None)}
+    no_ip = {store.server_ips.get_id(None)}
+    by_host = {}
+    for host_id in dict.fromkeys(host_ids):
+        requests, new_connections, unknown, new_tls, connection_ms = totals[host_id][:5]
+        known = requests - unknown
+        stats = {'requests': requests, 'new_connections': new_connections, 'unknown_connections': unknown,
+                 'new_tls': new_tls, 'connection_ms': _number(round(connection_ms, 3))}
+        for key, value in zip(('body_bytes', 'content_bytes', 'header_bytes', 'transfer_bytes',
+                               'compression_saved_bytes'), totals[host_id][5:]):
+            stats[key] = _number(value)
+        stats['reused_connections'] = known - new_connections
+        stats['reuse_rate'] = round(stats['reused_connections'] / known, 4) if known else None
+        host_connections = connection_ids[host_id] - no_id
+        if host_connections:
+            stats['distinct_connections'] = len(host_connections)
+        stats['server_ips'] = sorted(store.server_ips[ip] for ip in server_ips[host_id] - no_ip)
+        by_host[store.hosts[host_id]] = stats
+
+    uncompressed.sort(key=lambda i: store.body_size[i], reverse=True)
+    duplicates = sorted(((url_id, sizes) for url_id, sizes in downloads.items() if len(sizes) > 1),
+                        key=lambda item: sum(item[1]) - item[1][0], reverse=True)
+
+    return {
+        'by_host': by_host,
+        'totals': {
+            'requests': len(store),
+            'new_connections': sum(h['new_connections'] for h in by_host.values()),
+            'reused_connections': sum(h['reused_connections'] for h in by_host.values()),
+            'unknown_connections': sum(h['unknown_connections'] for h in by_host.values()),
+            'new_tls': sum(h['new_tls'] for h in by_host.values()),
+            'transfer_bytes': _number(sum(h['transfer_bytes'] for h in by_host.values())),
+            'compression_saved_bytes': _number(sum(h['compression_saved_bytes'] for h in by_host.values())),
+            'uncompressed_text_resources': len(uncompressed),
+            'uncompressed_text_bytes': _number(sum(store.body_size[i] for i in uncompressed)),
+            'duplicate_urls': len(duplicates),
+            'duplicate_download_bytes': _number(sum(sum(sizes) - sizes[0] for _, sizes in duplicates))
+        },
+        'uncompressed_resources': [{
+            'url': store.urls[store.url[i]],
+            'mime_type': store.mime_types[store.mime[i]],
+            'size_kb': store.body_size[i] / 1024
+        } for i in uncompressed[:limit]],
+        'duplicate_downloads': [{
+            'url': store.urls[url_id],
+            'count': len(sizes),
+            'wasted_kb': (sum(sizes) - sizes[0]) / 1024
+        } for url_id, sizes in duplicates[:limit]]
+    }
+
+
+def _page_performance(store: HarEntryStore, pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Performance metrics for the first page"""
+    if not pages:
+        return {}
+
+    page = pages[0]  # Focus on first page
+    page_id = page.get('id')
+    page_timings = page.get('pageTimings', {})
+    on_load = page_timings.get('onLoad', -1)
+    on_content_load = page_timings.get('onContentLoad', -1)
+
+    def phase_total(phase):
+        return _number(float(store.phase_total(phase, page_id))) if page_id is not None else 0
+
+    return {
+        'page_load_time_ms': on_load if on_load is not None and on_load >= 0 else 0,
+        'on_content_load_ms': on_content_load,
+        'on_load_ms': on_load,
+        'dns_time_ms': phase_total('dns'),
+        'connect_time_ms': phase_total('connect'),
+        'ssl_time_ms': phase_total('ssl'),
+        'blocked_time_ms': phase_total('blocked'),
+        'send_time_ms': phase_total('send'),
+        'wait_time_ms': phase_total('wait'),
+        'receive_time_ms': phase_total('receive')
+    }
+
+
+class LatencyHistogram:
+    """
+    Mergeable log-bucketed latency histogram (HDR-style).
+
+    Values are counted in buckets whose width grows geometrically, so every
+    reported percentile is within HISTOGRAM_RELATIVE_ERROR of the true value
+    while memory stays bounded by the (logarithmic) value range rather than
+    the number of samples. Histograms built on different files or workers
+    can be combined with merge().
+    """
+
+    def __init__(self, relative_error: float = HISTOGRAM_RELATIVE_ERROR):
+        self.relative_error = relative_error
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = Counter()
+        self.zero_count = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def bucket_index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def record(self, value: float):
+        """Record one non-negative latency value in milliseconds"""
+        if value < 0:
+            return
+        if value == 0:
+            self.zero_count += 1
+        else:
+            self.buckets[self.bucket_index(value)] += 1
+        self._update_bounds(1, value, value)
+
+    def record_bucket_counts(self, counts: Dict[int, int], zero_count: int, minimum: float, maximum: float):
+        """Add pre-bucketed counts (as produced by bucket_index) in one step"""
+        self.buckets.update(counts)
+        self.zero_count += zero_count
+        self._update_bounds(sum(counts.values()) + zero_count, minimum, maximum)
+
+    def _update_bounds(self, count: int, minimum: float, maximum: float):
+        if not count:
+            return
+        self.count += count
+        self.min = minimum if self.min is None else min(self.min, minimum)
+        self.max = maximum if self.max is None else max(self.max, maximum)
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Fold another histogram with the same precision into this one"""
+        if other.relative_error != self.relative_error:
+            raise ValueError("Cannot merge histograms with different precision")
+        if other.count:
+            self.record_bucket_counts(other.buckets, other.zero_count, other.min, other.max)
+        return self
+
+    def percentile(self, pct: float) -> float:
+        """Approximate value at the given percentile (0-100)"""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(pct / 100 * self.count))
+        if rank <= self.zero_count:
+            return 0
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Midpoint of the bucket, clamped to the observed range
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, p50/p90/p95/p99 and max"""
+        result = {'count': self.count}
+        for pct in PERCENTILES:
+            value = self.percentile(pct)
+            result[f'p{pct}'] = round(value, 2) if value is not None else None
+        result['max'] = _number(round(float(self.max), 2)) if self.max is not None else None
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'relative_error': self.relative_error,
+            'zero_count': self.zero_count,
+            'min': self.min,
+            'max': self.max,
+            'buckets': {str(k): v for k, v in self.buckets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencyHistogram':
+        histogram = cls(data.get('relative_error', HISTOGRAM_RELATIVE_ERROR))
+        buckets = {int(k): v for k, v in data.get('buckets', {}).items()}
+        histogram.record_bucket_counts(buckets, data.get('zero_count', 0), data.get('min'), data.get('max'))
+        return histogram
+
+
+_HOST_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.\-]*://(?:[^@/?#]*@)?(\[[^\]/?#]*\]|[^:/?#]*)')
+
+
+def _host(url: str) -> str:
+    """Hostname of a URL (cheaper than urlsplit for the many unique HAR URLs)"""
+    match = _HOST_PATTERN.match(url or '')
+    if not match or not match.group(1):
+        return 'unknown'
+    return match.group(1).strip('[]').lower()
+
+
+def _hosts(urls: List[str]) -> List[str]:
+    """_host() of each URL, matching each distinct scheme://authority prefix once"""
+    host_of_prefix = {}
+    hosts = []
+    for url in urls:
+        url = url or ''
+        end = url.find('/', url.find('//') + 2)
+        prefix = url[:end] if end >= 0 else url
+        host = host_of_prefix.get(prefix)
+        if host is None:
+            host = host_of_prefix[prefix] = _host(prefix)
+        hosts.append(host)
+    return hosts
+
+
+# Path segments that identify one resource rather than an endpoint
+_SEGMENT_PATTERNS = (
+    (re.compile(r'^\d+$'), '{id}'),
+    (re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$'), '{uuid}'),
+    (re.compile(r'^(?=[^/]*\d)[0-9a-fA-F]{10,}$'), '{hash}'),
+    (re.compile(r'^(?=[^/]*\d)[A-Za-z0-9_\-]{24,}$'), '{token}'),
+)
+
+# Query parameters that change on every request (cache busters, signatures, tracing)
+VOLATILE_QUERY_PARAMS = frozenset((
+    '_', 't', 'ts', 'timestamp', 'time', 'cb', 'cachebuster', 'nocache', 'rnd', 'rand', 'random',
+    'nonce', 'v', 'sig', 'signature', 'token', 'access_token', 'session', 'sessionid', 'requestid',
+    'traceid', 'x-amz-date', 'x-amz-signature', 'x-amz-credential', 'x-amz-security-token',
+    'expires', 'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content'
+))
+
+
+# Content hashes in fingerprinted asset names, e.g. app.3f9a8b7c.js
+_FINGERPRINT_PATTERN = re.compile(r'(?<=[.\-_])(?=[^.]*\d)[0-9a-fA-F]{8,}(?=\.)')
+
+# Only path segments containing a digit can be IDs, so only those are examined
+_DIGIT_SEGMENT_PATTERN = re.compile(r'(?<=/)[^/]*\d[^/]*')
+# All-digit segments, by far the most common IDs, are replaced without a callback first
+_NUMERIC_SEGMENT_PATTERN = re.compile(r'(?<=/)\d+(?=/|\Z)')
+_DIGIT_PATTERN = re.compile(r'\d')
+_PARAM_NAME_PATTERN = re.compile(r'(?:^|&)([^&=]*)')
+_query_suffixes = {}
+
+
+def _template_segment(match) -> str:
+    segment = match.group()
+    if segment.isdecimal():
+        return '{id}'
+    for pattern, placeholder in _SEGMENT_PATTERNS:
+        if pattern.match(segment):
+            return placeholder
+    return _FINGERPRINT_PATTERN.sub('{hash}', segment)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Endpoint template of a URL: host and path with ID-like segments replaced
+    by {id}, {uuid}, {hash} or {token}, volatile query parameters dropped and
+    the remaining parameter names kept (sorted, without values).
+
+    https://api.example.com/api/user/123?t=1&page=2 -> api.example.com/api/user/{id}?page
+    """
+    return _endpoint_template(url or '', _host(url))
+
+
+def _endpoint_template(url: str, host: str) -> str:
+    """normalize_url() for a URL whose host is already known"""
+    base = url.split('#', 1)[0]
+    base, _, query = base.partition('?')
+    path_start = base.find('/', base.find('://') + 3) if '://' in base else base.find('/')
+    path = base[path_start:] if path_start >= 0 else '/'
+    path = _NUMERIC_SEGMENT_PATTERN.sub('{id}', path)
+    if _DIGIT_PATTERN.search(path):
+        path = _DIGIT_SEGMENT_PATTERN.sub(_template_segment, path)
+    if not query:
+        return host + path
+
+    names = tuple(_PARAM_NAME_PATTERN.findall(query))
+    suffix = _query_suffixes.get(names)
+    if suffix is None:
+        kept = sorted({name for name in names if name and name.lower() not in VOLATILE_QUERY_PARAMS})
+        suffix = '?' + '&'.join(kept) if kept else ''
+        if len(_query_suffixes) > 10000:
+            _query_suffixes.clear()
+        _query_suffixes[names] = suffix
+    return host + path + suffix
+
+
+def _endpoint_templates(store: HarEntryStore) -> List[str]:
+    """Endpoint template of each distinct URL, indexed by URL id"""
+    return [_endpoint_template(url or '', host) for url, host in zip(store.urls.values, store.url_hosts())]
+
+
+def endpoint_rows(store: HarEntryStore, limit: int = ENDPOINT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Aggregate requests by method and endpoint template, busiest first.
+
+    URLs are normalized once per distinct URL in the store's string table.
+    Each row has the request count, error count and rate, total time and its
+    share of all request time, total bytes and total-time percentiles.
+    """
+    endpoint_of_url = _endpoint_templates(store)
+    methods = store.methods
+    key_index = {}
+    key_ids = [key_index.setdefault((method_id, endpoint_of_url[url_id]), len(key_index))
+               for method_id, url_id in zip(store.method, store.url)]
+
+    stats = [{'count': 0, 'errors': 0, 'time': 0.0, 'size': 0.0, 'max': 0.0, 'min': None, 'buckets': Counter()}
+             for _ in key_index]
+    for key_id, count in Counter(key_ids).items():
+        stats[key_id]['count'] = count
+    failed = Counter(key_id for key_id, status in zip(key_ids, store.status) if status == 0 or status >= 400)
+    for key_id, count in failed.items():
+        stats[key_id]['errors'] = count
+    for key_id, size in zip(key_ids, store.body_size):
+        if size > 0:
+            stats[key_id]['size'] += size
+
+    log_gamma = LatencyHistogram()._log_gamma
+    for (key_id, elapsed), count in Counter(zip(key_ids, store.time)).items():
+        if elapsed < 0:
+            continue
+        row = stats[key_id]
+        row['min'] = elapsed if row['min'] is None else min(row['min'], elapsed)
+        if elapsed > 0:
+            row['time'] += elapsed * count
+            row['max'] = max(row['max'], elapsed)
+            row['buckets'][math.ceil(math.log(elapsed) / log_gamma)] += count
+        else:
+            row['buckets'][None] += count
+    total_time = sum(row['time'] for row in stats)
+    stats = dict(zip(key_index, stats))
+
+    ranked = sorted(stats.items(), key=lambda item: (-item[1]['time'], -item[1]['count'], item[0][1]))
+    rows = []
+    for (method_id, endpoint), row in ranked[:limit]:
+        latency = {'count': 0}
+        if row['min'] is not None:
+            latency = _histogram_from_counts(row['buckets'], row['min'], _number(row['max'])).summary()
+        rows.append({
+            'endpoint': endpoint,
+            'method': methods[method_id],
+            'count': row['count'],
+            'errors': row['errors'],
+            'error_rate': round(row['errors'] / row['count'], 4),
+            'total_time_ms': _number(round(row['time'], 2)),
+            'time_share': round(row['time'] / total_time, 4) if total_time else 0,
+            'total_size_kb': row['size'] / 1024,
+            'latency': latency
+        })
+    return rows
+
+
+def latency_histograms(store: HarEntryStore) -> Dict[str, Dict[str, Any]]:
+    """
+    Build latency histograms per timing phase (plus total time), overall and
+    broken down per host and per resource type. Missing phases (-1) are skipped.
+
+    Each series is counted once per (host, resource type, value), so a bucket
+    index is computed per distinct value and the breakdowns only aggregate the
+    distinct combinations. Minimum and maximum of every histogram are the
+    exact observed values, not bucket bounds.
+    """
+    host_ids = store.host_ids()
+    hosts = store.hosts.values
+    types = StringTable()
+    type_of_mime = [types.intern(_get_resource_type(mime)) for mime in store.mime_types.values]
+    # One small int per (host, resource type) combination
+    width = max(len(types), 1)
+    groups_of_entry = [host_id * width + type_of_mime[mime_id] for host_id, mime_id in zip(host_ids, store.mime)]
+
+    result = {'overall': {}, 'by_host': defaultdict(dict), 'by_resource_type': defaultdict(dict)}
+    columns = dict(store.timings, total=store.time)
+    log_gamma = LatencyHistogram()._log_gamma
+    for series in LATENCY_SERIES:
+        # [bucket counts (None for zero samples), min, max] per host and resource type
+        combinations = {}
+        for (group, value), count in Counter(zip(groups_of_entry, columns[series])).items():
+            if value < 0:
+                continue
+            index = math.ceil(math.log(value) / log_gamma) if value > 0 else None
+            combination = combinations.get(group)
+            if combination is None:
+                combinations[group] = [Counter({index: count}), value, value]
+                continue
+            combination[0][index] += count
+            if value < combination[1]:
+                combination[1] = value
+            if value > combination[2]:
+                combination[2] = value
+        if not combinations:
+            continue
+
+        groups = {'overall': {}, 'by_host': {}, 'by_resource_type': {}}
+        for group, (counts, minimum, maximum) in combinations.items():
+            host, resource_type = hosts[group // width], types[group % width]
+            for key, label in (('overall', None), ('by_host', host), ('by_resource_type', resource_type)):
+                group = groups[key].get(label)
+                if group is None:
+                    groups[key][label] = [Counter(counts), minimum, maximum]
+                else:
+                    group[0].update(counts)
+                    group[1] = min(group[1], minimum)
+                    group[2] = max(group[2], maximum)
+
+        for key, labels in groups.items():
+            for label, (counts, minimum, maximum) in labels.items():
+                histogram = _histogram_from_counts(counts, _number(float(minimum)), _number(float(maximum)))
+                if key == 'overall':
+                    result['overall'][series] = histogram
+                else:
+                    result[key][label][series] = histogram
+
+    result['by_host'] = dict(result['by_host'])
+    result['by_resource_type'] = dict(result['by_resource_type'])
+    return result
+
+
+def _histogram_from_counts(counts: Counter, minimum: float, maximum: float) -> LatencyHistogram:
+    histogram = LatencyHistogram()
+    counts = Counter(counts)
+    zero_count = counts.pop(None, 0)
+    histogram.record_bucket_counts(counts, zero_count, minimum, maximum)
+    return histogram
+
+
+def summarize_latency(histograms: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn latency_histograms() output into percentile summaries"""
+    return {
+        'overall': {series: h.summary() for series, h in histograms['overall'].items()},
+        'by_host': {host: {series: h.summary() for series, h in phases.items()}
+                    for host, phases in histograms['by_host'].items()},
+        'by_resource_type': {kind: {series: h.summary() for series, h in phases.items()}
+                             for kind, phases in histograms['by_resource_type'].items()}
+    }
+
+
+class StreamingHarReader:
+    """
+    Reads a HAR file entry by entry with an event-based JSON parser.
+
+    Only one entry is decoded at a time and request/response bodies are
+    dropped as they are parsed, so memory stays bounded by the largest
+    single entry instead of the whole document. Pages are collected as
+    they are encountered and are complete once entries() is exhausted.
+    """
+
+    ENTRY_PREFIX = 'log.entries.item'
+    PAGE_PREFIX = 'log.pages.item'
+    SKIPPED_PREFIXES = frozenset({
+        'log.entries.item.response.content.text',
+        'log.entries.item.request.postData.text',
+    })
+
+    def __init__(self, har_file_path: Path):
+        if ijson is None:
+            raise ImportError("ijson not installed. Run: pip3 install ijson")
+        self.har_file_path = Path(har_file_path)
+        self.pages = []
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Yield HAR entries one at a time without their bodies"""
+        self.pages = []
+        skipped = self.SKIPPED_PREFIXES
+        builder = None
+        target = None
+
+        with open(self.har_file_path, 'rb') as f:
+            for prefix, event, value in ijson.parse(f, use_float=True):
+                if builder is not None:
+                    if prefix in skipped:
+                        continue
+                    builder.event(event, value)
+                    if prefix == target and event == 'end_map':
+                        if target == self.ENTRY_PREFIX:
+                            yield builder.value
+                        else:
+                            self.pages.append(builder.value)
+                        builder = None
+                elif event == 'start_map' and prefix in (self.ENTRY_PREFIX, self.PAGE_PREFIX):
+                    builder = ObjectBuilder()
+                    builder.event(event, value)
+                    target = prefix
+
+
+class HarAnalysis(Mapping):
+    """
+    Result of KatalonHarAnalyzer.report(): a read-only mapping whose
+    sections are computed on first access and memoized by the analyzer, so
+    callers that only read the summary never build latency histograms.
+    to_dict() computes every selected section.
+    """
+
+    def __init__(self, analyzer: 'KatalonHarAnalyzer', sections=None):
+        self._analyzer = analyzer
+        self._sections = _selected_sections(sections)
+
+    def __getitem__(self, name: str):
+        if name not in self._sections:
+            raise KeyError(name)
+        return self._analyzer.section(name)
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    @property
+    def computed(self) -> List[str]:
+        """Sections computed so far"""
+        return [name for name in self._sections if name in self._analyzer._values]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: self[name] for name in self._sections}
+
 
 class KatalonHarAnalyzer:
-    def __init__(self, har_file_path: str):
+    def __init__(self, har_file_path: str, stream: bool = False):
         self.har_file_path = Path(har_file_path)
         if not self.har_file_path.exists():
             raise FileNotFoundError(f"HAR file not found: {har_file_path}")
 
+        self.stream = stream
+        self._store = None
+        self._values = {}
+        self._histograms = None
+        # Whether the store decodes the transfer columns up front (only 'network' reads them)
+        self._with_transfer = False
+        if stream:
+            # Entries are read on demand; the document is never held in memory
+            self._har_data = None
+            self._reader = StreamingHarReader(self.har_file_path)
+            return
+
         with open(self.har_file_path, 'r') as f:
-            self.har_data = json.load(f)
+            self._har_data = json.load(f)
 
-        self.parser = HarParser(self.har_data)
-        self.pages = self.parser.pages
+        # haralyzer validates the document. It is only kept until the entries
+        # have been decoded into the store; the raw pages are kept for good.
+        self._pages = HarParser(self._har_data).har_data.get('pages') or []
 
-    def analyze(self) -> Dict[str, Any]:
-        """Perform complete HAR analysis"""
-        return {
-            'summary': self.get_summary(),
-            'performance': self.analyze_performance(),
-            'errors': self.analyze_errors(),
-            'slow_requests': self.find_slow_requests(),
-            'failed_requests': self.get_failed_requests(),
-            'resource_breakdown': self.analyze_resources(),
-            'timing_waterfall': self.get_timing_waterfall(),
-            'recommendations': self.generate_recommendations()
+    @property
+    def har_data(self) -> Dict[str, Any]:
+        """
+        The parsed HAR document (None with stream=True). Once the store has
+        released it, it is read from disk again on every access.
+        """
+        if self.stream:
+            return None
+        if self._har_data is not None:
+            return self._har_data
+        with open(self.har_file_path, 'r') as f:
+            return json.load(f)
+
+    @property
+    def parser(self) -> HarParser:
+        """haralyzer parser over har_data (None with stream=True)"""
+        return None if self.stream else HarParser(self.har_data)
+
+    @property
+    def pages(self) -> list:
+        """haralyzer HarPage objects of the document (None with stream=True)"""
+        return None if self.stream else self.parser.pages
+
+    def analyze(self, sections=None) -> Dict[str, Any]:
+        """
+        Analyze the HAR: ANALYZE_SECTIONS, or only the given sections (see
+        HAR_SECTIONS), plus recommendations drawn from them
+        """
+        analysis = self.report(sections).to_dict()
+        analysis['recommendations'] = self.generate_recommendations(analysis)
+        return analysis
+
+    def report(self, sections=None) -> HarAnalysis:
+        """Lazy analyze() without recommendations: each section is computed when first accessed"""
+        sections = _selected_sections(sections)
+        if 'network' in sections:
+            self._with_transfer = True
+        return HarAnalysis(self, sections)
+
+    def _entries(self) -> Iterator[Dict[str, Any]]:
+        if self.stream:
+            return self._reader.entries()
+        return iter(self.har_data['log']['entries'])
+
+    def _raw_pages(self) -> List[Dict[str, Any]]:
+        if self.stream:
+            return self._reader.pages
+        return self._pages
+
+    @property
+    def store(self) -> HarEntryStore:
+        """
+        Columnar store of every entry, decoded once on first access. The
+        parsed document is released afterwards; only the store is kept.
+        The transfer columns are decoded along only when a report() asked
+        for 'network' beforehand; otherwise section('network') adds them,
+        reading the entries again.
+        """
+        if self._store is None:
+            self._store = HarEntryStore.from_entries(self._entries(), transfer=self._with_transfer)
+            self._har_data = None
+        return self._store
+
+    def latency_histograms(self) -> Dict[str, Any]:
+        """Mergeable latency histograms behind the 'latency' section"""
+        if self._histograms is None:
+            self._histograms = latency_histograms(self.store)
+        return self._histograms
+
+    def section(self, name: str):
+        """One analysis section (see HAR_SECTIONS), computed from the store once and memoized"""
+        if name not in self._values:
+            if name == 'network' and not self.store.transfer:
+                self.store.add_transfer(self._entries())
+            histograms = self.latency_histograms() if name == 'latency' else None
+            self._values[name] = store_section(self.store, self._raw_pages(), name, histograms=histograms)
+        return self._values[name]
+
+    def iter_records(self, chunk_size: int = 4096, sections=None) -> Iterator[Dict[str, Any]]:
+        """
+        NDJSON records for this HAR: a header, one 'request' record per entry
+        (plus an 'error' record for each failed one) as the entries are
+        decoded, and a closing 'summary' record with the remaining analysis
+        sections (ANALYZE_SECTIONS, or the given ones). Entries go through
+        the columnar store a chunk at a time, so with stream=True nothing
+        larger than a chunk is held as dicts. A store that analyze() already
+        built is reused instead.
+        """
+        yield {
+            'record': 'header',
+            'tool': 'har-analyzer',
+            'version': ANALYZER_VERSION,
+            'har_file': str(self.har_file_path),
+            'streamed': self.stream
         }
 
+        sections = _selected_sections(sections)
+        if self._store is not None:
+            yield from self._entry_records(self._store, 0)
+        else:
+            store = HarEntryStore(transfer='network' in sections)
+            entries = self._entries()
+            while True:
+                chunk = list(islice(entries, chunk_size))
+                if not chunk:
+                    break
+                start = len(store)
+                store.extend(chunk)
+                del chunk
+                yield from self._entry_records(store, start)
+
+            self._store = store
+            self._har_data = None
+            self._values = {}
+            self._histograms = None
+
+        analysis = self.analyze(sections)
+        yield dict({'record': 'summary'}, **{name: section for name, section in analysis.items()
+                                             if name not in NDJSON_PER_REQUEST_SECTIONS})
+
+    @staticmethod
+    def _entry_records(store: HarEntryStore, start: int) -> Iterator[Dict[str, Any]]:
+        """'request' (and 'error') records for the store entries from index start on"""
+        urls, methods, mime_types, status_texts = store.urls, store.methods, store.mime_types, store.status_texts
+        for i in range(start, len(store)):
+            status = store.status[i]
+            yield {
+                'record': 'request',
+                'index': i,
+                'started': store.started[i],
+                'method': methods[store.method[i]],
+                'url': urls[store.url[i]],
+                'status': status,
+                'mime_type': mime_types[store.mime[i]],
+                'time_ms': _number(store.time[i]),
+                'body_size': _number(store.body_size[i]),
+                'timings': {phase: _number(store.timings[phase][i]) for phase in TIMING_PHASES}
+            }
+            if status == 0 or status >= 400:
+                yield {
+                    'record': 'error',
+                    'index': i,
+                    'url': urls[store.url[i]],
+                    'method': methods[store.method[i]],
+                    'status': status,
+                    'status_text': status_texts[store.status_text[i]] or '',
+                    'type': _classify_error(status),
+                    'time': store.started[i]
+                }
+
     def get_summary(self) -> Dict[str, Any]:
         """Get high-level summary"""
-        entries = self.parser.har_data['entries']
-        return {
-            'total_requests': len(entries),
-            'total_size_kb': sum(e.get('response', {}).get('bodySize', 0) for e in entries) / 1024,
-            'total_duration_ms': sum(e.get('time', 0) for e in entries),
-            'pages': len(self.pages),
-            'timestamp': self.parser.har_data.get('log', {}).get('pages', [{}])[0].get('startedDateTime', 'unknown')
-        }
+        return self.section('summary')
 
     def analyze_performance(self) -> Dict[str, Any]:
         """Analyze performance metrics"""
-        if not self.pages:
-            return {}
-
-        page = self.pages[0]  # Focus on first page
-        return {
-            'page_load_time_ms': page.page_load_time,
-            'on_content_load_ms': page.on_content_load,
-            'on_load_ms': page.on_load,
-            'dns_time_ms': page.dns_time,
-            'connect_time_ms': page.connect_time,
-            'ssl_time_ms': page.ssl_time,
-            'blocked_time_ms': page.blocked_time,
-            'send_time_ms': page.send_time,
-            'wait_time_ms': page.wait_time,
-            'receive_time_ms': page.receive_time
-        }
+        return self.section('performance')
 
     def analyze_errors(self) -> Dict[str, Any]:
         """Analyze errors and failed requests"""
-        entries = self.parser.har_data['entries']
-        errors = []
-        error_counts = defaultdict(int)
-
-        for entry in entries:
-            status = entry.get('response', {}).get('status', 0)
-            if status >= 400:
-                url = entry.get('request', {}).get('url', 'unknown')
-                error_type = self._classify_error(status)
-                errors.append({
-                    'url': url,
-                    'status': status,
-                    'status_text': entry.get('response', {}).get('statusText', ''),
-                    'type': error_type,
-                    'time': entry.get('startedDateTime')
-                })
-                error_counts[error_type] += 1
-
-        return {
-            'total_errors': len(errors),
-            'error_breakdown': dict(error_counts),
-            'errors': errors[:10]  # Limit to first 10
-        }
+        return self.section('errors')
 
     def _classify_error(self, status: int) -> str:
         """Classify HTTP error by status code"""
-        if status == 0:
-            return 'Network Error'
-        elif 400 <= status < 500:
-            return 'Client Error'
-        elif 500 <= status < 600:
-            return 'Server Error'
-        else:
-            return 'Unknown Error'
+        return _classify_error(status)
 
-    def find_slow_requests(self, threshold_ms: int = 1000) -> List[Dict[str, Any]]:
+    def find_slow_requests(self, threshold_ms: int = SLOW_REQUEST_THRESHOLD_MS) -> List[Dict[str, Any]]:
         """Find requests slower than threshold"""
-        entries = self.parser.har_data['entries']
-        slow_requests = []
+        if threshold_ms == SLOW_REQUEST_THRESHOLD_MS:
+            return self.section('slow_requests')
 
-        for entry in entries:
-            time_ms = entry.get('time', 0)
-            if time_ms > threshold_ms:
-                slow_requests.append({
-                    'url': entry.get('request', {}).get('url', 'unknown'),
-                    'method': entry.get('request', {}).get('method', 'unknown'),
-                    'time_ms': time_ms,
-                    'size_kb': entry.get('response', {}).get('bodySize', 0) / 1024,
-                    'status': entry.get('response', {}).get('status', 0)
-                })
-
-        return sorted(slow_requests, key=lambda x: x['time_ms'], reverse=True)
+        return slow_request_rows(self.store, threshold_ms)
 
     def get_failed_requests(self) -> List[Dict[str, Any]]:
         """Get all failed requests"""
-        entries = self.parser.har_data['entries']
-        failed = []
-
-        for entry in entries:
-            status = entry.get('response', {}).get('status', 0)
-            if status == 0 or status >= 400:
-                failed.append({
-                    'url': entry.get('request', {}).get('url', 'unknown'),
-                    'method': entry.get('request', {}).get('method', 'unknown'),
-                    'status': status,
-                    'error': entry.get('response', {}).get('statusText', 'Unknown error'),
-                    'time': entry.get('startedDateTime')
-                })
-
-        return failed
+        return self.section('failed_requests')
 
     def analyze_resources(self) -> Dict[str, Any]:
         """Analyze resource types and sizes"""
-        entries = self.parser.har_data['entries']
-        resource_stats = defaultdict(lambda: {'count': 0, 'size_kb': 0})
+        return self.section('resource_breakdown')
 
-        for entry in entries:
-            content = entry.get('response', {}).get('content', {})
-            mime_type = content.get('mimeType', 'unknown')
-            size_bytes = entry.get('response', {}).get('bodySize', 0)
+    def _get_resource_type(self, mime_type: str) -> str:
+        """Categorize resource by MIME type"""
+        return _get_resource_type(mime_type)
 
-            # Simplify MIME type
-            resource_type = self._get_resource_type(mime_type)
+    def analyze_timeline(self) -> Dict[str, Any]:
+        """Wall-clock span, concurrency per host and the critical path"""
+        return self.section('timeline')
 
-            resource_stats[resource_type]['count'] += 1
-            resource_stats[resource_type]['size_kb'] += size_bytes / 1024
+    def analyze_network(self) -> Dict[str, Any]:
+        """Connection reuse, compression and duplicate downloads per host"""
+        return self.section('network')
 
-        return dict(resource_stats)
+    def analyze_endpoints(self, limit: int = ENDPOINT_LIMIT) -> List[Dict[str, Any]]:
+        """Aggregate requests per normalized endpoint, busiest first"""
+        if limit <= ENDPOINT_LIMIT:
+            return self.section('endpoints')[:limit]
 
-    def _get_resource_type(self, mime_type: str) -> str:
-        """Categorize resource by MIME type"""
-        if 'javascript' in mime_type or 'json' in mime_type:
-            return 'JavaScript'
-        elif 'css' in mime_type:
-            return 'CSS'
-        elif 'html' in mime_type:
-            return 'HTML'
-        elif 'image' in mime_type:
-            return 'Image'
-        elif 'font' in mime_type:
-            return 'Font'
-        elif 'video' in mime_type:
-            return 'Video'
-        else:
-            return 'Other'
+        return endpoint_rows(self.store, limit)
 
-    def get_timing_waterfall(self, limit: int = 20) -> List[Dict[str, Any]]:
+    def get_timing_waterfall(self, limit: int = WATERFALL_LIMIT) -> List[Dict[str, Any]]:
         """Get timing waterfall data for requests"""
-        entries = self.parser.har_data['entries'][:limit]
-        waterfall = []
+        if limit <= WATERFALL_LIMIT:
+            return self.section('timing_waterfall')[:limit]
+
+        return waterfall_rows(self.store, limit)
+
+    def generate_recommendations(self, analysis: Dict[str, Any] = None) -> List[str]:
+        """Generate performance recommendations from the sections present in analysis (default: report())"""
+        if analysis is None:
+            analysis = self.report()
 
-        for entry in entries:
-            timings = entry.get('timings', {})
-            waterfall.append({
-                'url': entry.get('request', {}).get('url', 'unknown'),
-                'start_time': entry.get('startedDateTime'),
-                'blocked': timings.get('blocked', -1),
-                'dns': timings.get('dns', -1),
-                'connect': timings.get('connect', -1),
-                'ssl': timings.get('ssl', -1),
-                'send': timings.get('send', -1),
-                'wait': timings.get('wait', -1),
-                'receive': timings.get('receive', -1),
-                'total': entry.get('time', 0)
-            })
-
-        return waterfall
-
-    def generate_recommendations(self) -> List[str]:
-        """Generate performance recommendations"""
         recommendations = []
-        performance = self.analyze_performance()
-        slow_requests = self.find_slow_requests()
-        errors = self.analyze_errors()
+        performance = analysis.get('performance') or {}
+        slow_requests = analysis.get('slow_requests') or []
+        errors = analysis.get('errors') or {}
 
         # Check page load time
         if performance.get('page_load_time_ms', 0) > 3000:
@@ -238,8 +1637,37 @@ class KatalonHarAnalyzer:
                 f"Slowest: {slow_requests[0]['url']} ({slow_requests[0]['time_ms']}ms)"
             )
 
+        # Check parallelism
+        timeline_section = analysis.get('timeline') or {}
+        critical_path = timeline_section.get('critical_path', {})
+        if critical_path.get('requests', 0) > 10 and timeline_section.get('avg_concurrency', 0) < 1.5:
+            recommendations.append(
+                f"⚠️  Requests mostly run one at a time (average concurrency "
+                f"{timeline_section['avg_concurrency']}); {critical_path['requests']} requests form the "
+                f"critical path. Consider parallelizing independent calls."
+            )
+
+        # Check transfer efficiency
+        totals = (analysis.get('network') or {}).get('totals', {})
+        if totals.get('uncompressed_text_resources'):
+            recommendations.append(
+                f"⚠️  {totals['uncompressed_text_resources']} text resources are served without compression "
+                f"({totals['uncompressed_text_bytes'] / 1024:.0f} KB). Enable gzip/brotli on the server."
+            )
+        if totals.get('duplicate_urls'):
+            recommendations.append(
+                f"⚠️  {totals['duplicate_urls']} URLs were downloaded more than once "
+                f"({totals['duplicate_download_bytes'] / 1024:.0f} KB wasted). Check caching headers."
+            )
+        timed_requests = totals.get('requests', 0) - totals.get('unknown_connections', 0)
+        if timed_requests > 10 and totals.get('new_connections', 0) > timed_requests / 2:
+            recommendations.append(
+                f"⚠️  {totals['new_connections']} of {timed_requests} timed requests opened a new connection. "
+                "Enable keep-alive / HTTP/2 connection reuse."
+            )
+
         # Check errors
-        if errors['total_errors'] > 0:
+        if errors.get('total_errors', 0) > 0:
             recommendations.append(
                 f"❌ Found {errors['total_errors']} failed requests. "
                 f"Breakdown: {errors['error_breakdown']}"
@@ -251,6 +1679,475 @@ class KatalonHarAnalyzer:
         return recommendations
 
 
+class HarAnalysisCache:
+    """
+    On-disk cache of HAR analysis results.
+
+    Results are keyed by the HAR file's size, mtime, SHA-256 of its content,
+    ANALYZER_VERSION and the requested sections. A small per-path index remembers the content hash
+    for a given size/mtime, so a repeat lookup only stats the file instead of
+    re-hashing it. Entries are evicted least-recently-used first once the
+    cache exceeds max_bytes or max_entries.
+
+    The cache never fails an analysis: an unreadable or unwritable cache
+    directory (read-only home, full disk) turns lookups into misses and
+    stores into no-ops.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = CACHE_MAX_BYTES,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        if cache_dir is None:
+            cache_dir = os.environ.get(CACHE_DIR_ENV) or Path.home() / '.cache' / 'katalon-har-analyzer'
+        self.cache_dir = Path(cache_dir)
+        self.entries_dir = self.cache_dir / 'results'
+        self.index_dir = self.cache_dir / 'index'
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def key(self, har_file: str, sections=None) -> str:
+        """Cache key for the current contents of a HAR file (and a section selection)"""
+        path = Path(har_file).resolve()
+        stat = path.stat()
+        index_file = self.index_dir / (hashlib.sha1(str(path).encode()).hexdigest() + '.json')
+
+        content_hash = None
+        try:
+            index = json.loads(index_file.read_text())
+            if index['size'] == stat.st_size and index['mtime_ns'] == stat.st_mtime_ns:
+                content_hash = index['sha256']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if content_hash is None:
+            content_hash = self._hash_file(path)
+            try:
+                self._write_atomic(index_file, json.dumps({
+                    'path': str(path), 'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns, 'sha256': content_hash
+                }))
+            except OSError:
+                pass  # the index only saves re-hashing next time
+
+        # The default selection is spelled out, so changing ANALYZE_SECTIONS invalidates it too
+        selection = ','.join(ANALYZE_SECTIONS if sections is None else sections)
+        material = f"{stat.st_size}:{stat.st_mtime_ns}:{content_hash}:{ANALYZER_VERSION}:{selection}"
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, har_file: str, sections=None) -> Dict[str, Any]:
+        """Cached result for a HAR file, or None"""
+        try:
+            entry = self.entries_dir / (self.key(har_file, sections) + '.json')
+            payload = json.loads(entry.read_text())
+        except (OSError, ValueError):
+            return None
+        # Record the access for LRU eviction
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return payload
+
+    def put(self, har_file: str, payload: Dict[str, Any], sections=None) -> bool:
+        """Store a result and evict old entries if the cache is over budget; False if it could not be written"""
+        try:
+            entry = self.entries_dir / (self.key(har_file, sections) + '.json')
+            self._write_atomic(entry, json.dumps(payload, default=str))
+        except OSError:
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """Drop least-recently-used entries beyond max_bytes / max_entries"""
+        try:
+            entries = [(e.stat().st_mtime, e.stat().st_size, e) for e in self.entries_dir.glob('*.json')]
+        except OSError:
+            return
+        entries.sort(key=lambda item: item[0])
+        total = sum(size for _, size, _ in entries)
+        while entries and (total > self.max_bytes or len(entries) > self.max_entries):
+            _, size, oldest = entries.pop(0)
+            try:
+                oldest.unlink()
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for directory in (self.entries_dir, self.index_dir):
+            for path in directory.glob('*.json'):
+                path.unlink()
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _write_atomic(path: Path, content: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(content)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            raise
+
+
+def analyze_with_cache(har_file: str, stream: bool = False, cache: HarAnalysisCache = None,
+                       refresh: bool = False, sections=None) -> Dict[str, Any]:
+    """
+    Analyze a HAR file (ANALYZE_SECTIONS, or the given sections), serving
+    repeat analyses from the cache.
+
+    Returns {'analysis': ...}, plus 'histograms' serialized when 'latency'
+    is among the sections, so batch mode can merge cached results too. With
+    refresh=True the result is recomputed and the cache entry replaced;
+    with cache=None the cache is neither read nor written.
+    """
+    if sections is not None:
+        sections = _selected_sections(sections)
+    if cache is not None and not refresh:
+        payload = cache.get(har_file, sections)
+        if payload is not None:
+            return payload
+
+    analyzer = KatalonHarAnalyzer(har_file, stream=stream)
+    payload = {'analysis': analyzer.analyze(sections)}
+    if 'latency' in payload['analysis']:
+        payload['histograms'] = _histograms_to_dict(analyzer.latency_histograms())
+    if cache is not None:
+        cache.put(har_file, payload, sections)
+    return payload
+
+
+def find_har_files(inputs: List[str]) -> List[Path]:
+    """Expand HAR files, directories (searched recursively) and glob patterns"""
+    found = {}
+    for item in inputs:
+        if glob.has_magic(item):
+            candidates = [Path(p) for p in glob.glob(item, recursive=True)]
+        else:
+            candidates = [Path(item)]
+
+        for candidate in candidates:
+            if candidate.is_dir():
+                for root, _, files in os.walk(candidate):
+                    for name in files:
+                        if name.endswith('.har'):
+                            path = Path(root) / name
+                            found.setdefault(str(path.resolve()), path)
+            elif candidate.is_file():
+                found.setdefault(str(candidate.resolve()), candidate)
+
+    return sorted(found.values(), key=str)
+
+
+def _histograms_to_dict(histograms: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'overall': {series: h.to_dict() for series, h in histograms['overall'].items()},
+        'by_host': {host: {series: h.to_dict() for series, h in phases.items()}
+                    for host, phases in histograms['by_host'].items()},
+        'by_resource_type': {kind: {series: h.to_dict() for series, h in phases.items()}
+                             for kind, phases in histograms['by_resource_type'].items()}
+    }
+
+
+def _merge_histogram_dicts(target: Dict[str, Any], source: Dict[str, Any]):
+    """Merge serialized latency histograms from one file into the running totals"""
+    def merge_series(into, series_dicts):
+        for series, data in series_dicts.items():
+            histogram = LatencyHistogram.from_dict(data)
+            if series in into:
+                into[series].merge(histogram)
+            else:
+                into[series] = histogram
+
+    merge_series(target['overall'], source['overall'])
+    for key in ('by_host', 'by_resource_type'):
+        for label, series_dicts in source[key].items():
+            merge_series(target[key].setdefault(label, {}), series_dicts)
+
+
+def analyze_for_batch(har_file: str, stream: bool = False, use_cache: bool = True,
+                      refresh: bool = False, sections=BATCH_SECTIONS) -> Dict[str, Any]:
+    """
+    Analyze one HAR file in a worker process and return a picklable result.
+    sections must include summary, errors and slow_requests; without
+    'latency' the result has no histograms.
+    """
+    start = time.perf_counter()
+    try:
+        cache = HarAnalysisCache() if use_cache else None
+        payload = analyze_with_cache(har_file, stream=stream, cache=cache, refresh=refresh, sections=sections)
+        analysis, histograms = payload['analysis'], payload.get('histograms')
+    except Exception as e:
+        return {'file': har_file, 'error': str(e), 'wall_time_s': time.perf_counter() - start}
+
+    return {
+        'file': har_file,
+        'wall_time_s': time.perf_counter() - start,
+        'summary': analysis['summary'],
+        'errors': analysis['errors'],
+        'slow_requests': analysis['slow_requests'][:BATCH_SLOWEST_LIMIT],
+        'slow_request_count': len(analysis['slow_requests']),
+        'histograms': histograms
+    }
+
+
+def merge_batch_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-file batch results into an aggregate report"""
+    error_breakdown = defaultdict(int)
+    histograms = {'overall': {}, 'by_host': {}, 'by_resource_type': {}}
+    slowest = []
+    totals = {'total_requests': 0, 'total_size_kb': 0, 'total_errors': 0, 'slow_requests': 0}
+    files = []
+
+    for result in sorted(results, key=lambda r: r['file']):
+        row = {'file': result['file'], 'wall_time_s': round(result['wall_time_s'], 4)}
+        if 'error' in result:
+            row['error'] = result['error']
+            files.append(row)
+            continue
+
+        summary, errors = result['summary'], result['errors']
+        row.update({
+            'total_requests': summary['total_requests'],
+            'total_errors': errors['total_errors'],
+            'slow_requests': result['slow_request_count']
+        })
+        files.append(row)
+
+        totals['total_requests'] += summary['total_requests']
+        totals['total_size_kb'] += summary['total_size_kb']
+        totals['total_errors'] += errors['total_errors']
+        totals['slow_requests'] += result['slow_request_count']
+        for error_type, count in errors['error_breakdown'].items():
+            error_breakdown[error_type] += count
+        slowest.extend(dict(request, file=result['file']) for request in result['slow_requests'])
+        if result.get('histograms'):
+            _merge_histogram_dicts(histograms, result['histograms'])
+
+    failed = [row for row in files if 'error' in row]
+    return {
+        'files': files,
+        'aggregate': dict(
+            totals,
+            files_analyzed=len(files) - len(failed),
+            files_failed=len(failed),
+            error_breakdown=dict(error_breakdown),
+            slowest_requests=heapq.nlargest(BATCH_SLOWEST_LIMIT, slowest, key=lambda r: r['time_ms']),
+            latency=summarize_latency(histograms)
+        )
+    }
+
+
+def analyze_batch(inputs: List[str], workers: int = None, stream: bool = False,
+                  use_cache: bool = True, refresh: bool = False, on_result=None) -> Dict[str, Any]:
+    """
+    Analyze many HAR files in parallel across CPU cores and merge the results.
+    on_result(result) is called with each per-file result as it completes.
+    """
+    har_files = find_har_files(inputs)
+    start = time.perf_counter()
+    results = []
+
+    if har_files:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(har_files)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(analyze_for_batch, str(path), stream, use_cache, refresh)
+                       for path in har_files]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if on_result is not None:
+                    on_result(results[-1])
+
+    batch = merge_batch_results(results)
+    batch['wall_time_s'] = round(time.perf_counter() - start, 4)
+    batch['workers'] = workers or 0
+    return batch
+
+
+def endpoint_samples(store: HarEntryStore) -> Dict[str, Dict[str, Any]]:
+    """Raw total time, body size and timing phase samples per 'METHOD endpoint'"""
+    endpoint_of_url = _endpoint_templates(store)
+    methods = store.methods.values
+    samples = {}
+    for i, (method_id, url_id) in enumerate(zip(store.method, store.url)):
+        key = f"{methods[method_id]} {endpoint_of_url[url_id]}"
+        group = samples.get(key)
+        if group is None:
+            group = samples[key] = {'time': [], 'size': [], 'phases': {phase: [] for phase in TIMING_PHASES}}
+        if store.time[i] >= 0:
+            group['time'].append(store.time[i])
+        if store.body_size[i] >= 0:
+            group['size'].append(store.body_size[i])
+        for phase, column in store.timings.items():
+            if column[i] >= 0:
+                group['phases'][phase].append(column[i])
+    return samples
+
+
+def collect_samples(inputs: List[str], stream: bool = False) -> Dict[str, Any]:
+    """Endpoint samples merged across every HAR file matched by inputs"""
+    har_files = find_har_files(inputs)
+    if not har_files:
+        raise FileNotFoundError(f"No HAR files found: {' '.join(inputs)}")
+
+    merged = {}
+    for path in har_files:
+        for key, group in endpoint_samples(KatalonHarAnalyzer(str(path), stream=stream).store).items():
+            target = merged.get(key)
+            if target is None:
+                merged[key] = group
+                continue
+            target['time'].extend(group['time'])
+            target['size'].extend(group['size'])
+            for phase, values in group['phases'].items():
+                target['phases'][phase].extend(values)
+    return {'files': [str(path) for path in har_files], 'endpoints': merged}
+
+
+def mann_whitney_p(baseline: List[float], candidate: List[float]) -> float:
+    """
+    Two-sided p-value of the Mann-Whitney U test (normal approximation with
+    tie and continuity correction); None when either side has too few samples.
+    """
+    n1, n2 = len(baseline), len(candidate)
+    if n1 < MIN_SIGNIFICANCE_SAMPLES or n2 < MIN_SIGNIFICANCE_SAMPLES:
+        return None
+
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in candidate])
+    total = n1 + n2
+    rank_sum = 0.0
+    tie_term = 0
+    i = 0
+    while i < total:
+        j = i
+        while j + 1 < total and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        average_rank = (i + j) / 2 + 1
+        rank_sum += average_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        i = j + 1
+
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((total + 1) - tie_term / (total * (total - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    return min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+def _median(values: List[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def _compare_series(baseline: List[float], candidate: List[float], pct_threshold: float,
+                    abs_threshold: float, alpha: float) -> Dict[str, Any]:
+    """Median change of one metric and whether it counts as a regression"""
+    if not baseline or not candidate:
+        return None
+    before, after = _median(baseline), _median(candidate)
+    delta = after - before
+    change_pct = delta / before * 100 if before else (0.0 if not delta else math.inf)
+    p_value = mann_whitney_p(baseline, candidate)
+    significant = None if p_value is None else p_value < alpha
+    return {
+        'baseline_p50': _number(round(float(before), 2)),
+        'candidate_p50': _number(round(float(after), 2)),
+        'delta': _number(round(float(delta), 2)),
+        'change_pct': round(change_pct, 1) if math.isfinite(change_pct) else None,
+        'samples': [len(baseline), len(candidate)],
+        'p_value': round(p_value, 4) if p_value is not None else None,
+        'significant': significant,
+        'regression': (delta >= abs_threshold and (not before or change_pct >= pct_threshold)
+                       and significant is not False)
+    }
+
+
+def compare_samples(baseline: Dict[str, Any], candidate: Dict[str, Any],
+                    thresholds: Dict[str, float] = None) -> Dict[str, Any]:
+    """
+    Compare endpoint samples of a baseline and a candidate run.
+
+    Endpoints are matched by method and normalized URL. Total time, body
+    size and each timing phase are compared per endpoint, and each timing
+    phase over all requests. An endpoint regressed when any of its metrics
+    did, so a phase regression fails the comparison even if the endpoint's
+    total time stayed within the thresholds. A change is a regression when the median grows by at
+    least both the relative and absolute threshold and, when both sides have
+    MIN_SIGNIFICANCE_SAMPLES or more samples, a Mann-Whitney U test rejects
+    "no difference" at alpha. With fewer samples the thresholds alone decide.
+    """
+    limits = dict(COMPARE_THRESHOLDS, **(thresholds or {}))
+    before, after = baseline['endpoints'], candidate['endpoints']
+
+    def latency(old, new):
+        return _compare_series(old, new, limits['latency_pct'], limits['latency_ms'], limits['alpha'])
+
+    endpoints = []
+    for key in sorted(set(before) & set(after)):
+        old, new = before[key], after[key]
+        phases = {phase: latency(old['phases'][phase], new['phases'][phase]) for phase in TIMING_PHASES}
+        phases = {phase: result for phase, result in phases.items() if result is not None}
+        row = {
+            'endpoint': key,
+            'time': latency(old['time'], new['time']),
+            'size': _compare_series(old['size'], new['size'], limits['size_pct'], limits['size_bytes'],
+                                    limits['alpha']),
+            'phases': phases
+        }
+        row['regression'] = any(metric and metric['regression']
+                                for metric in (row['time'], row['size'], *phases.values()))
+        endpoints.append(row)
+
+    def pooled(samples, phase):
+        return [value for group in samples.values() for value in group['phases'][phase]]
+
+    phases = {}
+    for phase in TIMING_PHASES:
+        result = latency(pooled(before, phase), pooled(after, phase))
+        if result is not None:
+            phases[phase] = result
+
+    endpoints.sort(key=lambda row: (not row['regression'], -((row['time'] or {}).get('delta') or 0)))
+    regressions = [row['endpoint'] for row in endpoints if row['regression']]
+    phase_regressions = [phase for phase, result in phases.items() if result['regression']]
+    return {
+        'baseline_files': baseline['files'],
+        'candidate_files': candidate['files'],
+        'thresholds': limits,
+        'endpoints': endpoints,
+        'phases': phases,
+        'new_endpoints': sorted(set(after) - set(before)),
+        'removed_endpoints': sorted(set(before) - set(after)),
+        'regressions': regressions,
+        'phase_regressions': phase_regressions,
+        'passed': not regressions and not phase_regressions
+    }
+
+
+def compare_hars(baseline_inputs: List[str], candidate_inputs: List[str], thresholds: Dict[str, float] = None,
+                 stream: bool = False) -> Dict[str, Any]:
+    """Compare a baseline and a candidate HAR file, directory or glob (batches are pooled)"""
+    return compare_samples(collect_samples(baseline_inputs, stream), collect_samples(candidate_inputs, stream),
+                           thresholds)
+
+
 def print_analysis(analysis: Dict[str, Any]):
     """Print formatted analysis"""
     print("\n" + "="*80)
@@ -258,16 +2155,17 @@ def print_analysis(analysis: Dict[str, Any]):
     print("="*80 + "\n")
 
     # Summary
-    summary = analysis['summary']
-    print("SUMMARY")
-    print("-" * 80)
-    print(f"Total Requests: {summary['total_requests']}")
-    print(f"Total Size: {summary['total_size_kb']:.2f} KB")
-    print(f"Total Duration: {summary['total_duration_ms']:.2f} ms")
-    print(f"Timestamp: {summary['timestamp']}\n")
+    summary = analysis.get('summary')
+    if summary:
+        print("SUMMARY")
+        print("-" * 80)
+        print(f"Total Requests: {summary['total_requests']}")
+        print(f"Total Size: {summary['total_size_kb']:.2f} KB")
+        print(f"Total Duration: {summary['total_duration_ms']:.2f} ms")
+        print(f"Timestamp: {summary['timestamp']}\n")
 
     # Performance
-    perf = analysis['performance']
+    perf = analysis.get('performance')
     if perf:
         print("PERFORMANCE METRICS")
         print("-" * 80)
@@ -279,8 +2177,8 @@ def print_analysis(analysis: Dict[str, Any]):
         print(f"Receive Time: {perf.get('receive_time_ms', 0):.2f} ms\n")
 
     # Errors
-    errors = analysis['errors']
-    if errors['total_errors'] > 0:
+    errors = analysis.get('errors')
+    if errors and errors['total_errors'] > 0:
         print(f"ERRORS ({errors['total_errors']} total)")
         print("-" * 80)
         for error in errors['errors']:
@@ -288,7 +2186,7 @@ def print_analysis(analysis: Dict[str, Any]):
             print(f"  Type: {error['type']} - {error['status_text']}\n")
 
     # Slow Requests
-    slow = analysis['slow_requests']
+    slow = analysis.get('slow_requests')
     if slow:
         print(f"SLOW REQUESTS (>{1000}ms)")
         print("-" * 80)
@@ -296,8 +2194,81 @@ def print_analysis(analysis: Dict[str, Any]):
             print(f"{req['method']} {req['url']}")
             print(f"  Time: {req['time_ms']:.2f}ms | Size: {req['size_kb']:.2f}KB | Status: {req['status']}\n")
 
+    # Latency percentiles
+    latency = analysis.get('latency', {})
+    if latency.get('overall'):
+        print("LATENCY PERCENTILES (ms)")
+        print("-" * 80)
+        print(f"{'Phase':<10}{'Count':>8}{'p50':>10}{'p90':>10}{'p95':>10}{'p99':>10}{'Max':>12}")
+        for series, stats in latency['overall'].items():
+            print(_format_latency_row(series, stats))
+        print()
+
+        hosts = sorted(latency.get('by_host', {}).items(),
+                       key=lambda item: item[1].get('total', {}).get('count', 0), reverse=True)
+        if hosts:
+            print("Total time by host:")
+            for host, phases in hosts[:10]:
+                if 'total' in phases:
+                    print(_format_latency_row(host, phases['total'], width=30))
+            print()
+
+    # Timeline
+    timeline_section = analysis.get('timeline')
+    if timeline_section:
+        critical_path = timeline_section['critical_path']
+        print("TIMELINE")
+        print("-" * 80)
+        print(f"Wall Clock: {timeline_section['wall_clock_ms']:.2f} ms "
+              f"(summed request time {timeline_section['summed_request_time_ms']:.2f} ms)")
+        print(f"Network Busy: {timeline_section['busy_ms']:.2f} ms | Idle: {timeline_section['idle_ms']:.2f} ms")
+        print(f"Concurrency: peak {timeline_section['peak_concurrency']}, "
+              f"average {timeline_section['avg_concurrency']}")
+        print(f"Critical Path: {critical_path['requests']} requests, "
+              f"{critical_path['request_time_ms']:.2f} ms in requests, {critical_path['gap_ms']:.2f} ms between them")
+        for host, stats in sorted(timeline_section['by_host'].items(),
+                                  key=lambda item: item[1]['busy_ms'], reverse=True)[:5]:
+            print(f"  {host}: {stats['requests']} requests, peak {stats['peak_concurrency']} / "
+                  f"average {stats['avg_concurrency']} concurrent")
+        print()
+
+    # Connections and transfer
+    network = analysis.get('network')
+    if network and network['by_host']:
+        totals = network['totals']
+        print("CONNECTIONS & TRANSFER")
+        print("-" * 80)
+        print(f"Connections: {totals['new_connections']} new ({totals['new_tls']} TLS), "
+              f"{totals['reused_connections']} reused, {totals['unknown_connections']} without timings")
+        print(f"Transferred: {totals['transfer_bytes'] / 1024:.2f} KB | "
+              f"Saved by compression: {totals['compression_saved_bytes'] / 1024:.2f} KB")
+        for host, stats in sorted(network['by_host'].items(),
+                                  key=lambda item: item[1]['requests'], reverse=True)[:5]:
+            reuse = f"{stats['reuse_rate'] * 100:.0f}% reuse" if stats['reuse_rate'] is not None else 'reuse unknown'
+            print(f"  {host}: {stats['requests']} requests, {stats['new_connections']} new / "
+                  f"{stats['reused_connections']} reused ({reuse}), "
+                  f"{stats['transfer_bytes'] / 1024:.2f} KB")
+        for resource in network['uncompressed_resources'][:5]:
+            print(f"  Uncompressed: {resource['url']} ({resource['size_kb']:.2f} KB {resource['mime_type']})")
+        for duplicate in network['duplicate_downloads'][:5]:
+            print(f"  Downloaded {duplicate['count']}x: {duplicate['url']} ({duplicate['wasted_kb']:.2f} KB wasted)")
+        print()
+
+    # Endpoints
+    endpoints = analysis.get('endpoints', [])
+    if endpoints:
+        print("TOP ENDPOINTS (by total time)")
+        print("-" * 80)
+        for row in endpoints[:10]:
+            latency = row['latency']
+            print(f"{row['method']} {row['endpoint']}")
+            print(f"  Requests: {row['count']} | Errors: {row['error_rate'] * 100:.1f}% | "
+                  f"Time: {row['total_time_ms']:.2f}ms ({row['time_share'] * 100:.1f}%) | "
+                  f"p50/p95: {_or_default(latency.get('p50'), 0):.2f}/{_or_default(latency.get('p95'), 0):.2f}ms | "
+                  f"Size: {row['total_size_kb']:.2f}KB\n")
+
     # Resource Breakdown
-    resources = analysis['resource_breakdown']
+    resources = analysis.get('resource_breakdown')
     if resources:
         print("RESOURCE BREAKDOWN")
         print("-" * 80)
@@ -308,12 +2279,119 @@ def print_analysis(analysis: Dict[str, Any]):
     # Recommendations
     print("RECOMMENDATIONS")
     print("-" * 80)
-    for rec in analysis['recommendations']:
+    for rec in analysis.get('recommendations', []):
         print(f"{rec}\n")
 
     print("="*80 + "\n")
 
 
+def print_batch_analysis(batch: Dict[str, Any]):
+    """Print formatted batch analysis"""
+    aggregate = batch['aggregate']
+    print("\n" + "="*80)
+    print("KATALON HAR BATCH ANALYSIS")
+    print("="*80 + "\n")
+
+    print("AGGREGATE SUMMARY")
+    print("-" * 80)
+    print(f"Files Analyzed: {aggregate['files_analyzed']} ({aggregate['files_failed']} failed)")
+    print(f"Workers: {batch['workers']} | Wall Time: {batch['wall_time_s']:.2f}s")
+    print(f"Total Requests: {aggregate['total_requests']}")
+    print(f"Total Size: {aggregate['total_size_kb']:.2f} KB")
+    print(f"Total Errors: {aggregate['total_errors']} {aggregate['error_breakdown']}")
+    print(f"Slow Requests: {aggregate['slow_requests']}\n")
+
+    print("FILES")
+    print("-" * 80)
+    for row in batch['files']:
+        if 'error' in row:
+            print(f"{row['wall_time_s']:>8.3f}s  {row['file']}  ERROR: {row['error']}")
+        else:
+            print(f"{row['wall_time_s']:>8.3f}s  {row['file']}  "
+                  f"({row['total_requests']} requests, {row['total_errors']} errors)")
+    print()
+
+    if aggregate['slowest_requests']:
+        print(f"SLOWEST REQUESTS (>{SLOW_REQUEST_THRESHOLD_MS}ms, all files)")
+        print("-" * 80)
+        for req in aggregate['slowest_requests'][:10]:
+            print(f"{req['method']} {req['url']}")
+            print(f"  Time: {req['time_ms']:.2f}ms | Status: {req['status']} | File: {Path(req['file']).name}\n")
+
+    overall = aggregate['latency']['overall']
+    if overall:
+        print("MERGED LATENCY PERCENTILES (ms)")
+        print("-" * 80)
+        print(f"{'Phase':<10}{'Count':>8}{'p50':>10}{'p90':>10}{'p95':>10}{'p99':>10}{'Max':>12}")
+        for series, stats in overall.items():
+            print(_format_latency_row(series, stats))
+        print()
+
+    print("="*80 + "\n")
+
+
+def print_comparison(comparison: Dict[str, Any]):
+    """Print formatted baseline/candidate comparison"""
+    print("\n" + "="*80)
+    print("KATALON HAR COMPARISON")
+    print("="*80 + "\n")
+
+    limits = comparison['thresholds']
+    print(f"Baseline:  {len(comparison['baseline_files'])} file(s) | "
+          f"Candidate: {len(comparison['candidate_files'])} file(s)")
+    print(f"Thresholds: latency +{limits['latency_pct']:g}% and +{limits['latency_ms']:g}ms, "
+          f"size +{limits['size_pct']:g}% and +{limits['size_bytes']:g}B, alpha {limits['alpha']:g}\n")
+
+    def describe(label, metric, unit):
+        change = f"{metric['change_pct']:+.1f}%" if metric['change_pct'] is not None else 'new'
+        significance = 'untested' if metric['p_value'] is None else f"p={metric['p_value']:.3f}"
+        flag = 'REGRESSION ' if metric['regression'] else ''
+        return (f"  {flag}{label}: {metric['baseline_p50']}{unit} -> {metric['candidate_p50']}{unit} "
+                f"({change}, n={metric['samples'][0]}/{metric['samples'][1]}, {significance})")
+
+    if comparison['phases']:
+        print("TIMING PHASES (p50, all requests)")
+        print("-" * 80)
+        for phase, metric in comparison['phases'].items():
+            print(describe(phase, metric, 'ms'))
+        print()
+
+    changed = [row for row in comparison['endpoints'] if row['regression']]
+    print(f"ENDPOINT REGRESSIONS ({len(changed)})")
+    print("-" * 80)
+    for row in changed:
+        print(row['endpoint'])
+        for label, unit in (('time', 'ms'), ('size', 'B')):
+            if row[label] and row[label]['regression']:
+                print(describe(label, row[label], unit))
+        for phase, metric in row['phases'].items():
+            if metric['regression']:
+                print(describe(phase, metric, 'ms'))
+        worst = max(row['phases'].items(), key=lambda item: item[1]['delta'], default=None)
+        if worst and worst[1]['delta'] > 0:
+            print(f"  slowest-growing phase: {worst[0]} ({worst[1]['delta']:+}ms)")
+        print()
+
+    for title, endpoints in (('NEW ENDPOINTS', comparison['new_endpoints']),
+                             ('REMOVED ENDPOINTS', comparison['removed_endpoints'])):
+        if endpoints:
+            print(f"{title} ({len(endpoints)})")
+            print("-" * 80)
+            for endpoint in endpoints[:20]:
+                print(f"  {endpoint}")
+            print()
+
+    print("RESULT: " + ("✅ no regressions" if comparison['passed'] else
+                        f"❌ {len(comparison['regressions'])} endpoint and "
+                        f"{len(comparison['phase_regressions'])} phase regression(s)"))
+    print("="*80 + "\n")
+
+
+def _format_latency_row(label: str, stats: Dict[str, Any], width: int = 10) -> str:
+    values = ''.join(f"{stats[key]:>10.2f}" for key in ('p50', 'p90', 'p95', 'p99'))
+    return f"{label:<{width}}{stats['count']:>8}{values}{stats['max']:>12.2f}"
+
+
 def export_json(analysis: Dict[str, Any], output_file: str):
     """Export analysis to JSON"""
     with open(output_file, 'w') as f:
@@ -321,16 +2399,154 @@ def export_json(analysis: Dict[str, Any], output_file: str):
     print(f"✓ Analysis exported to {output_file}")
 
 
+def _option_value(flag: str, default: str) -> str:
+    """Value following a command-line flag, or default"""
+    if flag not in sys.argv:
+        return default
+    index = sys.argv.index(flag)
+    return sys.argv[index + 1] if len(sys.argv) > index + 1 else default
+
+
+def _positional_args(start: int, flags_with_values=('--json', '--workers')) -> List[str]:
+    """Positional arguments after sys.argv[start], skipping flags and their values"""
+    args = []
+    skip = False
+    for arg in sys.argv[start:]:
+        if skip:
+            skip = False
+        elif arg in flags_with_values:
+            skip = True
+        elif not arg.startswith('--'):
+            args.append(arg)
+    return args
+
+
+def _batch_file_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    """NDJSON record for one batch result (histograms are internal merge state)"""
+    return dict({'record': 'file'}, **{key: value for key, value in result.items() if key != 'histograms'})
+
+
+def run_batch():
+    inputs = _positional_args(2, flags_with_values=('--json', '--workers', '--ndjson'))
+    if not inputs:
+        print("Usage: python3 har-analyzer.py batch <dir|glob|har-file>... [--workers N] [--json output.json] "
+              "[--ndjson output.ndjson] [--stream] [--no-cache | --refresh]")
+        sys.exit(1)
+
+    workers = int(_option_value('--workers', '0')) or None
+    writer = None
+    if '--ndjson' in sys.argv:
+        writer = NdjsonWriter(_option_value('--ndjson', 'batch-analysis.ndjson'))
+        writer.write({'record': 'header', 'tool': 'har-analyzer', 'version': ANALYZER_VERSION,
+                      'mode': 'batch', 'inputs': inputs})
+    try:
+        batch = analyze_batch(inputs, workers=workers, stream='--stream' in sys.argv,
+                              use_cache='--no-cache' not in sys.argv, refresh='--refresh' in sys.argv,
+                              on_result=lambda result: writer.write(_batch_file_record(result)) if writer else None)
+        if writer is not None:
+            writer.write(dict({'record': 'aggregate', 'wall_time_s': batch['wall_time_s']}, **batch['aggregate']))
+    finally:
+        if writer is not None:
+            writer.close()
+    if not batch['files']:
+        print("No HAR files found", file=sys.stderr if writer is not None else sys.stdout)
+        sys.exit(1)
+
+    if writer is not None:
+        if not writer.to_stdout:
+            print(f"✓ {writer.count} records streamed to {_option_value('--ndjson', 'batch-analysis.ndjson')}")
+    elif '--json' in sys.argv:
+        export_json(batch, _option_value('--json', 'batch-analysis.json'))
+    else:
+        print_batch_analysis(batch)
+
+
+def run_compare():
+    flags = ('--json', '--max-latency-regression', '--min-latency-delta', '--max-size-regression',
+             '--min-size-delta', '--alpha')
+    inputs = _positional_args(2, flags_with_values=flags)
+    if len(inputs) != 2:
+        print("Usage: python3 har-analyzer.py compare <baseline> <candidate> [--json output.json] [--stream]")
+        print("       [--max-latency-regression PCT] [--min-latency-delta MS] [--max-size-regression PCT]")
+        print("       [--min-size-delta BYTES] [--alpha P]")
+        print("  baseline/candidate: a HAR file, a directory or a quoted glob (all matches are pooled)")
+        sys.exit(1)
+
+    thresholds = {
+        'latency_pct': float(_option_value('--max-latency-regression', COMPARE_THRESHOLDS['latency_pct'])),
+        'latency_ms': float(_option_value('--min-latency-delta', COMPARE_THRESHOLDS['latency_ms'])),
+        'size_pct': float(_option_value('--max-size-regression', COMPARE_THRESHOLDS['size_pct'])),
+        'size_bytes': float(_option_value('--min-size-delta', COMPARE_THRESHOLDS['size_bytes'])),
+        'alpha': float(_option_value('--alpha', COMPARE_THRESHOLDS['alpha']))
+    }
+    comparison = compare_hars([inputs[0]], [inputs[1]], thresholds, stream='--stream' in sys.argv)
+
+    if '--json' in sys.argv:
+        export_json(comparison, _option_value('--json', 'comparison.json'))
+    else:
+        print_comparison(comparison)
+    return comparison['passed']
+
+
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python3 har-analyzer.py <har-file> [--json output.json]")
+        print("Usage: python3 har-analyzer.py <har-file> [--json output.json | --ndjson output.ndjson] "
+              "[--stream] [--no-cache | --refresh] [--sections summary,errors,...]")
+        print("       python3 har-analyzer.py batch <dir|glob|har-file>... [--workers N] [--json output.json] "
+              "[--ndjson output.ndjson] [--stream] [--no-cache | --refresh]")
+        print("       python3 har-analyzer.py compare <baseline> <candidate> [--json output.json] "
+              "[threshold options]")
+        print("\n  --ndjson   Stream one JSON record per line (header, requests/errors or files, summary);")
+        print("             '-' writes to stdout")
+        print("  --stream   Read entries incrementally (requires ijson) for very large HAR files")
+        print(f"  --no-cache Neither read nor write the result cache (cache dir: ${CACHE_DIR_ENV}")
+        print("             or ~/.cache/katalon-har-analyzer)")
+        print("  --refresh  Recompute and replace the cached result")
+        print(f"  --sections Only compute these sections (default: all): {', '.join(HAR_SECTIONS)}")
+        print("  batch      Analyze many HAR files in parallel and merge the results")
+        print(f"  compare    Report per-endpoint regressions; exits {REGRESSION_EXIT_CODE} if any exceed the thresholds")
         sys.exit(1)
 
+    if sys.argv[1] == 'compare':
+        try:
+            passed = run_compare()
+        except Exception as e:
+            print(f"Error comparing HAR files: {e}")
+            sys.exit(1)
+        if not passed:
+            sys.exit(REGRESSION_EXIT_CODE)
+        return
+
+    if sys.argv[1] == 'batch':
+        try:
+            run_batch()
+        except Exception as e:
+            print(f"Error analyzing HAR files: {e}")
+            sys.exit(1)
+        return
+
     har_file = sys.argv[1]
 
     try:
-        analyzer = KatalonHarAnalyzer(har_file)
-        analysis = analyzer.analyze()
+        if not Path(har_file).exists():
+            raise FileNotFoundError(f"HAR file not found: {har_file}")
+        sections = HAR_SECTIONS
+        if '--sections' in sys.argv:
+            sections = [name.strip() for name in _option_value('--sections', '').split(',') if name.strip()]
+        if '--ndjson' in sys.argv:
+            # Records are produced while the entries are decoded, so the cache is bypassed
+            output_file = _option_value('--ndjson', 'analysis.ndjson')
+            analyzer = KatalonHarAnalyzer(har_file, stream='--stream' in sys.argv)
+            with NdjsonWriter(output_file) as writer:
+                writer.write_all(analyzer.iter_records(sections=sections))
+            if not writer.to_stdout:
+                print(f"✓ {writer.count} records streamed to {output_file}")
+            return
+
+        cache = None if '--no-cache' in sys.argv else HarAnalysisCache()
+        payload = analyze_with_cache(har_file, stream='--stream' in sys.argv, cache=cache,
+                                     refresh='--refresh' in sys.argv, sections=sections)
+        analysis = payload['analysis']
 
         # Check for JSON export
         if '--json' in sys.argv:
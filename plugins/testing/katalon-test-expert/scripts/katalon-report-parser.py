@@ -4,12 +4,648 @@ Katalon Report Parser
 Parses Katalon Studio generated reports (XML, JSON, HTML)
 """
 
+import fnmatch
+import hashlib
+import importlib.util
 import json
+import math
+import mmap
+import os
+import random
+import time
+import zlib
 import xml.etree.ElementTree as ET
+from collections import defaultdict, deque, Counter
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator
 import sys
 import re
+import sqlite3
+from array import array
+
+# ndjson_writer.py sits next to this script; importable however this file is loaded
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from ndjson_writer import NdjsonWriter
+
+# Session recording providers: result key -> (label, URL pattern).
+# Register more with register_session_provider().
+SESSION_URL_PROVIDERS = {
+    # LogRocket URLs (including query parameters)
+    'logrocket_url': ('LogRocket', r'https://app\.logrocket\.com/[a-zA-Z0-9/\-\?=&]+'),
+    'device_farm_url': ('AWS Device Farm', r'https://[a-z0-9\-]+\.console\.aws\.amazon\.com/devicefarm/[^\s]+'),
+    'browserstack_url': ('BrowserStack',
+                         r'https://(?:app-)?automate\.browserstack\.com/(?:dashboard/v2/)?(?:builds|sessions)/'
+                         r'[^\s"\'<>]+'),
+    'saucelabs_url': ('Sauce Labs', r'https://app\.(?:[a-z0-9\-]+\.)?saucelabs\.com/tests/[a-zA-Z0-9]+'),
+    'testgrid_url': ('TestGrid', r'https://[a-z0-9\-]+\.testgrid\.io/[^\s"\'<>]*session[^\s"\'<>]*'),
+}
+
+SCAN_CHUNK_BYTES = 1024 * 1024
+MAX_SESSION_URL_BYTES = 8192
+
+JUNIT_REPORT_NAME = 'JUnit_Report.xml'
+BATCH_TOP_LIMIT = 20
+FAILURE_MESSAGE_CHARS = 200
+# Katalon writes testsuite timestamps as 24-09-2025T16:50:38; other tools use ISO 8601
+SUITE_TIMESTAMP_FORMATS = ('%d-%m-%YT%H:%M:%S', '%Y-%m-%dT%H:%M:%S')
+REPORT_FOLDER_TIMESTAMP = re.compile(r'(\d{8}_\d{6})')
+
+# watch mode: a folder is complete once JUnit_Report.xml has not changed for
+# WATCH_SETTLE_SECONDS; scanning pauses while WATCH_BACKLOG_LIMIT folders wait
+WATCH_POLL_SECONDS = 2.0
+WATCH_SETTLE_SECONDS = 5.0
+WATCH_BACKLOG_LIMIT = 100
+WATCH_IN_FLIGHT_PER_WORKER = 2
+
+CATALOG_PATH_ENV = 'KATALON_REPORT_CATALOG'
+# Bump when the catalog schema changes; older catalogs are rebuilt
+CATALOG_SCHEMA_VERSION = 1
+TREND_RUNS = 30
+
+# Flaky and step-change detection over indexed history
+TREND_THRESHOLDS = {
+    'min_runs': 5,          # runs (non-skipped) before a test is ranked
+    'step_t': 4.0,          # t-statistic of the best mean-shift split
+    'step_pct': 20.0,       # and the shift must be this large relative...
+    'step_seconds': 0.5     # ...and absolute
+}
+STEP_MIN_SEGMENT = 3
+# Katalon reports durations in milliseconds; treat that as the noise floor
+DURATION_RESOLUTION_S = 0.001
+TEST_STATUS_CODES = {'PASSED': 0, 'FAILED': 1, 'ERROR': 2, 'SKIPPED': 3}
+
+# Failure clustering: near-duplicate signatures are found with MinHash/LSH
+FAILURE_CLUSTER_SIMILARITY = 0.7
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16              # 16 bands x 4 rows: candidates from ~50% similarity, then verified
+SIGNATURE_STACK_FRAMES = 3
+SIGNATURE_MESSAGE_LINES = 5
+CLUSTER_TEST_LIMIT = 10
+
+
+_LITERAL_TOKEN = re.compile(r'\\[^A-Za-z0-9]|[^\\.^$*+?{}\[\]|()]')
+
+
+def _common_literal_prefix(patterns: List[str]) -> str:
+    """Longest literal (token-aligned) prefix shared by every regex source"""
+    tokens = []
+    for pattern in patterns:
+        position, literal = 0, []
+        while position < len(pattern):
+            match = _LITERAL_TOKEN.match(pattern, position)
+            # A quantifier applies to the token before it, so that token is not a fixed literal
+            if not match or pattern[match.end():match.end() + 1] in ('*', '+', '?', '{'):
+                break
+            literal.append(match.group())
+            position = match.end()
+        tokens.append(literal)
+    prefix = []
+    for group in zip(*tokens):
+        if len(set(group)) != 1:
+            break
+        prefix.append(group[0])
+    return ''.join(prefix)
+
+
+def register_session_provider(key: str, label: str, pattern: str):
+    """Add (or replace) a session recording provider scanned by extract_session_urls()"""
+    re.compile(pattern)
+    SESSION_URL_PROVIDERS[key] = (label, pattern)
+    SessionUrlScanner._compiled.clear()
+
+
+class SessionUrlScanner:
+    """
+    Single-pass scanner for session recording URLs across report files.
+
+    All provider patterns are combined into one compiled alternation of named
+    groups and matched against each file through mmap (or fixed-size chunks
+    with overlap when a file cannot be mapped), without decoding it. Once a
+    provider's URL is found its pattern is dropped from the alternation, and
+    scanning stops as soon as every provider has been found. The first match
+    per provider wins, in the order files are scanned.
+    """
+
+    _compiled = {}
+
+    def __init__(self, providers: Dict[str, tuple] = None):
+        self.providers = dict(SESSION_URL_PROVIDERS if providers is None else providers)
+        self.found = {}
+
+    @property
+    def done(self) -> bool:
+        return len(self.found) == len(self.providers)
+
+    def _pattern(self):
+        remaining = tuple(key for key in self.providers if key not in self.found)
+        cache_key = tuple((key, self.providers[key][1]) for key in remaining)
+        pattern = self._compiled.get(cache_key)
+        if pattern is None:
+            sources = [self.providers[key][1] for key in remaining]
+            # Hoist the shared literal prefix (usually https://) out of the alternation so
+            # the regex engine can still skip ahead to candidate positions
+            prefix = _common_literal_prefix(sources)
+            alternation = '|'.join(f'(?P<g{n}>{source[len(prefix):]})' for n, source in enumerate(sources))
+            compiled = re.compile(f'{prefix}(?:{alternation})'.encode())
+            pattern = self._compiled[cache_key] = (compiled, remaining)
+        return pattern
+
+    def scan_buffer(self, buffer, final: bool = True) -> int:
+        """
+        Scan a bytes-like buffer. Returns the offset from which a non-final
+        chunk must be rescanned (a match may continue past its end).
+        """
+        position = 0
+        while not self.done:
+            pattern, keys = self._pattern()
+            match = pattern.search(buffer, position)
+            if match is None:
+                break
+            if not final and match.end() == len(buffer):
+                return match.start()
+            self.found[keys[int(match.lastgroup[1:])]] = match.group().decode('utf-8', errors='replace')
+            # Keep scanning from this match's start: a URL of another provider
+            # may begin inside it, as separate per-pattern searches would find
+            position = match.start() + 1
+        return len(buffer)
+
+    def scan_file(self, path):
+        """Scan one file for the providers not found yet"""
+        if self.done:
+            return
+        try:
+            with open(path, 'rb') as f:
+                try:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        self.scan_buffer(mapped)
+                        return
+                except (ValueError, OSError):
+                    # Empty, special or unmappable file: fall back to chunks
+                    f.seek(0)
+                self._scan_chunks(f)
+        except OSError:
+            return
+
+    def _scan_chunks(self, f):
+        tail = b''
+        while not self.done:
+            chunk = f.read(SCAN_CHUNK_BYTES)
+            buffer = tail + chunk
+            if not chunk:
+                self.scan_buffer(buffer)
+                return
+            resume = self.scan_buffer(buffer, final=False)
+            # Carry over an unfinished match, or enough bytes for a URL split at the boundary
+            tail = buffer[min(resume, max(len(buffer) - MAX_SESSION_URL_BYTES, 0)):]
+
+    def scan(self, paths) -> Dict[str, str]:
+        """Scan files in order, stopping once every provider has been found"""
+        for path in paths:
+            if self.done:
+                break
+            self.scan_file(path)
+        return {key: self.found[key] for key in self.providers if key in self.found}
+
+
+class ReportFileIndex:
+    """
+    Typed index of every file under a report folder, built with one walk.
+
+    Directories are read once with os.scandir (files of a directory before
+    its subdirectories, both in name order, like a recursive glob), and each
+    file path is filed by suffix and by exact name. Every lookup the parser
+    makes is then served from memory instead of another recursive glob, which
+    matters on network-mounted artifact stores with thousands of screenshots.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.by_suffix = defaultdict(list)
+        self.by_name = defaultdict(list)
+        self.file_count = 0
+        self._walk()
+
+    def _walk(self):
+        visited = set()
+        stack = [str(self.root)]
+        while stack:
+            directory = stack.pop()
+            try:
+                identity = os.stat(directory)
+                # Guard against symlink loops
+                key = (identity.st_dev, identity.st_ino)
+                if key in visited:
+                    continue
+                visited.add(key)
+                with os.scandir(directory) as scan:
+                    entries = sorted(scan, key=lambda entry: entry.name)
+            except OSError:
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if is_dir:
+                    subdirectories.append(entry.path)
+                else:
+                    self.by_suffix[os.path.splitext(entry.name)[1]].append(entry.path)
+                    self.by_name[entry.name].append(entry.path)
+                    self.file_count += 1
+            stack.extend(reversed(subdirectories))
+
+    def named(self, name: str) -> List[str]:
+        """Files with exactly this name"""
+        return self.by_name.get(name, [])
+
+    def with_suffix(self, *suffixes: str) -> List[str]:
+        """Files ending in any of the suffixes (e.g. '.png'), in walk order per suffix"""
+        found = []
+        for suffix in suffixes:
+            found.extend(self.by_suffix.get(suffix, []))
+        return found
+
+    def matching(self, pattern: str) -> List[str]:
+        """Files whose name matches a glob pattern such as 'execution*.json'"""
+        suffix = os.path.splitext(pattern)[1]
+        candidates = self.by_suffix.get(suffix, []) if '*' not in suffix else \
+            [path for paths in self.by_suffix.values() for path in paths]
+        return [path for path in candidates if fnmatch.fnmatchcase(os.path.basename(path), pattern)]
+
+
+def _parse_properties(testsuite: ET.Element) -> Dict[str, Any]:
+    """Parse test suite properties including AWS Device Farm URLs"""
+    props = {}
+    properties = testsuite.find('properties')
+    if properties is None:
+        return props
+
+    for prop in properties.findall('property'):
+        name = prop.get('name')
+        value = prop.get('value', '')
+
+        # Parse specific important properties
+        if name == 'sessionId':
+            props['session_id'] = value
+        elif name == 'logFolder':
+            props['log_folder'] = value
+        elif name == 'attachments':
+            props['attachments'] = [a.strip() for a in value.split(',') if a.strip()]
+        elif name == 'browser':
+            props['browser'] = value
+        elif name == 'remoteDriverUrl':
+            props['remote_driver'] = value
+        elif name == 'katalonVersion':
+            props['katalon_version'] = value
+        else:
+            props[name] = value
+
+    return props
+
+
+def _truncate(text: str, limit: int = None) -> str:
+    """Cut a stack trace to limit characters (None keeps it, 0 drops it)"""
+    if text is None or limit is None or len(text) <= limit:
+        return text
+    if limit == 0:
+        return None
+    return f"{text[:limit]}... [truncated {len(text) - limit} chars]"
+
+
+def _parse_test_case(testcase: ET.Element, stack_trace_limit: int = None) -> Dict[str, Any]:
+    """Parse one testcase element"""
+    case = {
+        'name': testcase.get('name'),
+        'classname': testcase.get('classname'),
+        'time': float(testcase.get('time', 0)),
+        'status': 'PASSED'
+    }
+
+    # Check for failures
+    failure = testcase.find('failure')
+    if failure is not None:
+        case['status'] = 'FAILED'
+        case['failure_message'] = failure.get('message', '')
+        case['failure_type'] = failure.get('type', '')
+        case['stack_trace'] = _truncate(failure.text, stack_trace_limit)
+
+    # Check for errors
+    error = testcase.find('error')
+    if error is not None:
+        case['status'] = 'ERROR'
+        case['error_message'] = error.get('message', '')
+        case['error_type'] = error.get('type', '')
+        case['stack_trace'] = _truncate(error.text, stack_trace_limit)
+
+    # Check for skipped
+    if testcase.find('skipped') is not None:
+        case['status'] = 'SKIPPED'
+
+    return case
+
+
+def _junit_summary(root: ET.Element) -> Dict[str, Any]:
+    """Summary from the root element's attributes"""
+    return {
+        'suite_name': root.get('name', ''),
+        'total_tests': int(root.get('tests', 0)),
+        'failures': int(root.get('failures', 0)),
+        'errors': int(root.get('errors', 0)),
+        'skipped': int(root.get('skipped', 0)),
+        'time_seconds': float(root.get('time', 0))
+    }
+
+
+class JUnitStreamParser:
+    """
+    Incremental JUnit XML reader built on ET.iterparse.
+
+    test_cases() yields each testcase as soon as its end tag is read and then
+    detaches the element, and suite-level system-out/system-err blocks are
+    dropped as they complete, so memory stays bounded however large the
+    report is. The summary (root attributes) and properties of the first
+    testsuite are filled in as the document is read, with the same values
+    parse_junit_xml() always returned.
+    """
+
+    def __init__(self, path, stack_trace_limit: int = None):
+        self.path = path
+        self.stack_trace_limit = stack_trace_limit
+        self.summary = {}
+        self.properties = {}
+        self.suite = {}
+
+    def test_cases(self) -> Iterator[Dict[str, Any]]:
+        parents = []
+        root = first_suite = None
+        for event, element in ET.iterparse(str(self.path), events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                    self.summary = _junit_summary(root)
+                elif first_suite is None and element.tag == 'testsuite':
+                    # Properties come from the first nested testsuite, as root.find('.//testsuite') had it
+                    first_suite = element
+                    self.suite = dict(element.attrib)
+                parents.append(element)
+                continue
+
+            parents.pop()
+            parent = parents[-1] if parents else None
+            if element.tag == 'testcase':
+                yield _parse_test_case(element, self.stack_trace_limit)
+            elif element.tag == 'properties' and parent is first_suite and not self.properties:
+                self.properties = _parse_properties(first_suite)
+                continue
+            elif element.tag not in ('system-out', 'system-err'):
+                continue
+
+            element.clear()
+            if parent is not None:
+                parent.remove(element)
+
+    def read_header(self) -> Dict[str, Any]:
+        """
+        Summary and first-testsuite properties, reading only the start of the
+        document: parsing stops at the end of those properties or at the first
+        testcase, so the cost does not grow with the report size.
+        """
+        root = first_suite = None
+        for event, element in ET.iterparse(str(self.path), events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = element
+                    self.summary = _junit_summary(root)
+                elif first_suite is None and element.tag == 'testsuite':
+                    first_suite = element
+                    self.suite = dict(element.attrib)
+                elif element.tag == 'testcase':
+                    break
+            elif element.tag == 'properties' and first_suite is not None and element in list(first_suite):
+                self.properties = _parse_properties(first_suite)
+                break
+        return dict(self.summary, properties=self.properties)
+
+
+# Katalon prefixes messages with "<test case> FAILED.\nReason:\n"
+_KATALON_FAILURE_PREAMBLE = re.compile(r'\A[^\n]*? (?:FAILED|ERROR)\.?[ \t]*\r?\nReason:[ \t]*\r?\n')
+_STACK_FRAME = re.compile(r'^\s*at\s')
+# Volatile tokens and their placeholders, matched in one pass (earlier
+# alternatives win). Numbers under four digits (HTTP status codes, small
+# counts) are kept since they usually distinguish root causes.
+_VOLATILE_TOKENS = [
+    ('uuid', r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b', '<uuid>'),
+    ('timestamp', r'\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?', '<timestamp>'),
+    ('date', r'\b\d{1,4}[-/]\d{1,2}[-/]\d{2,4}\b', '<date>'),
+    ('time', r'\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b', '<time>'),
+    ('address', r'\b0[xX][0-9a-fA-F]+\b|@[0-9a-fA-F]{4,}\b', '<hex>'),
+    ('hex', r'\b[0-9a-fA-F]{8,}\b', '<hex>'),
+    ('line', r':\d+\)|\b[Ll]ine \d+', '<line>'),
+    ('number', r'\d{4,}', '<n>'),
+]
+_VOLATILE_PATTERN = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern, _ in _VOLATILE_TOKENS))
+_VOLATILE_PLACEHOLDERS = {name: placeholder for name, _, placeholder in _VOLATILE_TOKENS}
+
+
+def _placeholder(match) -> str:
+    token = match.group()
+    kind = match.lastgroup
+    if kind == 'hex' and (token.isdigit() or token.isalpha()):
+        # Plain words (e.g. "deadline") and long numbers are not hex IDs
+        return '<n>' if token.isdigit() else token
+    if kind == 'line':
+        return ':<line>)' if token.startswith(':') else token[:5] + '<line>'
+    if kind == 'address' and token.startswith('@'):
+        return '@<hex>'
+    return _VOLATILE_PLACEHOLDERS[kind]
+
+
+_MERSENNE_61 = (1 << 61) - 1
+_MINHASH_SEEDS = [(random.Random(seed).randrange(1, _MERSENNE_61), random.Random(-seed).randrange(_MERSENNE_61))
+                  for seed in range(1, MINHASH_PERMUTATIONS + 1)]
+
+
+def failure_reason(case: Dict[str, Any]) -> str:
+    """Failure or error message of a test case without Katalon's test-name preamble"""
+    message = case.get('failure_message') or case.get('error_message') or ''
+    return _KATALON_FAILURE_PREAMBLE.sub('', message, count=1).strip()
+
+
+def failure_signature(case: Dict[str, Any], cache: Dict[str, str] = None) -> str:
+    """
+    Normalized fingerprint text of a failure: the exception/message lines
+    and the top stack frames, with volatile tokens (IDs, timestamps, hex
+    addresses, line numbers) replaced by placeholders. cache memoizes
+    normalized lines, which repeat heavily across failures (stack frames).
+    """
+    if cache is None:
+        cache = {}
+    message, frames = [], []
+    # Katalon embeds the stack in the message; other reports keep it in the element text
+    for text in (failure_reason(case), case.get('stack_trace') or ''):
+        for line in text.splitlines():
+            if _STACK_FRAME.match(line):
+                frames.append(line.strip())
+                if len(frames) == SIGNATURE_STACK_FRAMES:
+                    break
+            elif not frames and line.strip() and len(message) < SIGNATURE_MESSAGE_LINES:
+                message.append(' '.join(line.split()))
+        if frames:
+            break
+    normalized = []
+    for line in message + frames:
+        result = cache.get(line)
+        if result is None:
+            result = cache[line] = _VOLATILE_PATTERN.sub(_placeholder, line)
+        normalized.append(result)
+    return '\n'.join(normalized)
+
+
+def _minhash(signature: str) -> List[int]:
+    tokens = re.findall(r'\w+', signature)
+    shingles = {' '.join(tokens[i:i + 3]) for i in range(max(1, len(tokens) - 2))}
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingles]
+    return [min((a * value + b) % _MERSENNE_61 for value in hashes) for a, b in _MINHASH_SEEDS]
+
+
+def _estimated_similarity(first: List[int], second: List[int]) -> float:
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def cluster_failures(test_cases: List[Dict[str, Any]],
+                     similarity: float = FAILURE_CLUSTER_SIMILARITY) -> List[Dict[str, Any]]:
+    """
+    Group failed/errored test cases by root cause, largest cluster first.
+
+    Failures are bucketed by exact normalized signature first, then distinct
+    signatures are merged when their MinHash-estimated Jaccard similarity
+    (word 3-gram shingles) reaches `similarity`. LSH banding means each
+    signature is only compared with the head of the buckets it lands in, so
+    the stage stays near-linear in the number of failures.
+    """
+    groups = {}
+    cache = {}
+    for case in test_cases:
+        if case.get('status') in ('FAILED', 'ERROR'):
+            groups.setdefault(failure_signature(case, cache), []).append(case)
+    signatures = list(groups)
+
+    parent = list(range(len(signatures)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    if len(signatures) > 1:
+        sketches = [_minhash(signature) for signature in signatures]
+        rows = MINHASH_PERMUTATIONS // LSH_BANDS
+        for band in range(LSH_BANDS):
+            heads = {}
+            for index, sketch in enumerate(sketches):
+                head = heads.setdefault(tuple(sketch[band * rows:(band + 1) * rows]), index)
+                if head != index and find(head) != find(index) \
+                        and _estimated_similarity(sketches[head], sketch) >= similarity:
+                    parent[find(index)] = find(head)
+
+    members = defaultdict(list)
+    for index in range(len(signatures)):
+        members[find(index)].append(index)
+
+    clusters = []
+    for indices in members.values():
+        indices.sort(key=lambda index: -len(groups[signatures[index]]))
+        signature = signatures[indices[0]]
+        cases = [case for index in indices for case in groups[signatures[index]]]
+        representative = groups[signature][0]
+        names = list(dict.fromkeys(case['name'] for case in cases))
+        clusters.append({
+            'count': len(cases),
+            'fingerprint': hashlib.sha1(signature.encode()).hexdigest()[:12],
+            'signature': signature,
+            'variants': len(indices),
+            'representative': {
+                'name': representative['name'],
+                'status': representative['status'],
+                'message': failure_reason(representative).split('\n', 1)[0][:FAILURE_MESSAGE_CHARS]
+            },
+            'tests': names[:CLUSTER_TEST_LIMIT],
+            'test_count': len(names)
+        })
+    clusters.sort(key=lambda cluster: (-cluster['count'], cluster['fingerprint']))
+    return clusters
+
+
+# Sections of parse(); 'summary' (JUnit totals and properties only) is
+# available on request but not part of the default result
+PARSE_SECTIONS = ('junit_xml', 'failure_clusters', 'execution_json', 'test_suite', 'artifacts', 'session_urls')
+REPORT_SECTIONS = ('summary',) + PARSE_SECTIONS
+
+
+class ParsedReport(Mapping):
+    """
+    Result of KatalonReportParser.report(): a read-only mapping whose
+    sections are computed on first access and memoized, so callers that only
+    read the summary never walk the artifacts or scan PDFs for session URLs.
+    to_dict() computes every selected section (what parse() returns).
+    """
+
+    def __init__(self, parser: 'KatalonReportParser', stack_trace_limit: int = None, sections=None):
+        if sections is None:
+            sections = PARSE_SECTIONS
+        unknown = [name for name in sections if name not in REPORT_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown report section(s): {', '.join(unknown)} "
+                             f"(choose from {', '.join(REPORT_SECTIONS)})")
+        self._parser = parser
+        self._stack_trace_limit = stack_trace_limit
+        self._sections = tuple(dict.fromkeys(sections))
+        self._values = {}
+
+    def __getitem__(self, name: str):
+        if name not in self._sections:
+            raise KeyError(name)
+        if name not in self._values:
+            self._values[name] = self._compute(name)
+        return self._values[name]
+
+    def __iter__(self):
+        return iter(self._sections)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    @property
+    def computed(self) -> List[str]:
+        """Sections computed so far"""
+        return [name for name in self._sections if name in self._values]
+
+    def _compute(self, name: str):
+        parser = self._parser
+        if name == 'summary':
+            return parser.parse_junit_summary()
+        if name == 'junit_xml':
+            return parser.parse_junit_xml(self._stack_trace_limit)
+        if name == 'failure_clusters':
+            junit = self['junit_xml'] if 'junit_xml' in self._sections \
+                else parser.parse_junit_xml(self._stack_trace_limit)
+            return cluster_failures(junit.get('test_cases', []))
+        if name == 'execution_json':
+            return parser.parse_execution_json()
+        if name == 'test_suite':
+            return parser.parse_test_suite()
+        if name == 'artifacts':
+            return parser.find_artifacts()
+        return parser.extract_session_urls()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: self[name] for name in self._sections}
 
 
 class KatalonReportParser:
@@ -17,111 +653,112 @@ class KatalonReportParser:
         self.report_folder = Path(report_folder)
         if not self.report_folder.exists():
             raise FileNotFoundError(f"Report folder not found: {report_folder}")
+        self._files = None
 
-    def parse(self) -> Dict[str, Any]:
-        """Parse all Katalon reports in the folder"""
-        return {
-            'junit_xml': self.parse_junit_xml(),
-            'execution_json': self.parse_execution_json(),
-            'test_suite': self.parse_test_suite(),
-            'artifacts': self.find_artifacts(),
-            'session_urls': self.extract_session_urls()
-        }
+    @property
+    def files(self) -> ReportFileIndex:
+        """Index of the report folder's files, walked once on first use"""
+        if self._files is None:
+            self._files = ReportFileIndex(self.report_folder)
+        return self._files
 
-    def parse_junit_xml(self) -> Dict[str, Any]:
-        """Parse JUnit XML report"""
-        junit_files = list(self.report_folder.glob('**/JUnit_Report.xml'))
-        if not junit_files:
-            return {}
+    def parse(self, stack_trace_limit: int = None, sections=None) -> Dict[str, Any]:
+        """
+        Parse all Katalon reports in the folder, or only the given sections
+        (see REPORT_SECTIONS)
+        """
+        return self.report(stack_trace_limit, sections).to_dict()
 
+    def report(self, stack_trace_limit: int = None, sections=None) -> ParsedReport:
+        """Lazy parse(): each section is computed when first accessed"""
+        return ParsedReport(self, stack_trace_limit, sections)
+
+    def iter_records(self, stack_trace_limit: int = None) -> Iterator[Dict[str, Any]]:
+        """
+        NDJSON records for the folder: a header with the JUnit summary, one
+        'test_case' record per test case as it is parsed, one
+        'failure_cluster' per root cause, then 'artifact' and 'session_url'
+        records. Only failed test cases are kept (for clustering), so memory
+        does not grow with the number of passing tests.
+        """
+        yield dict({
+            'record': 'header',
+            'tool': 'katalon-report-parser',
+            'report_folder': str(self.report_folder),
+            'execution_uuid': self.execution_uuid(),
+            'started_at': self.run_timestamp()
+        }, **self.parse_junit_summary())
+
+        failed = []
+        for case in self.iter_test_cases(stack_trace_limit):
+            yield dict({'record': 'test_case'}, **case)
+            if case['status'] in ('FAILED', 'ERROR'):
+                failed.append(case)
+        for cluster in cluster_failures(failed):
+            yield dict({'record': 'failure_cluster'}, **cluster)
+        del failed
+
+        for kind, paths in self.find_artifacts().items():
+            for path in paths:
+                yield {'record': 'artifact', 'kind': kind, 'path': path}
+        for provider, url in (self.extract_session_urls() or {}).items():
+            yield {'record': 'session_url', 'provider': provider, 'url': url}
+
+    def _junit_file(self) -> str:
+        """JUnit_Report.xml path; Katalon writes it at the folder root, so try that before walking"""
+        direct = self.report_folder / JUNIT_REPORT_NAME
+        if self._files is None and direct.is_file():
+            return str(direct)
+        junit_files = self.files.named(JUNIT_REPORT_NAME)
+        return junit_files[0] if junit_files else None
+
+    def parse_junit_summary(self) -> Dict[str, Any]:
+        """JUnit totals and suite properties without reading the test cases"""
+        junit_file = self._junit_file()
+        if junit_file is None:
+            return {}
         try:
-            tree = ET.parse(junit_files[0])
-            root = tree.getroot()
+            return JUnitStreamParser(junit_file).read_header()
+        except Exception as e:
+            return {'error': str(e)}
 
-            # Get test suite element (contains properties)
-            testsuite = root.find('.//testsuite')
-            properties = self._parse_properties(testsuite) if testsuite is not None else {}
+    def parse_junit_xml(self, stack_trace_limit: int = None) -> Dict[str, Any]:
+        """
+        Parse JUnit XML report.
 
-            return {
-                'suite_name': root.get('name', ''),
-                'total_tests': int(root.get('tests', 0)),
-                'failures': int(root.get('failures', 0)),
-                'errors': int(root.get('errors', 0)),
-                'skipped': int(root.get('skipped', 0)),
-                'time_seconds': float(root.get('time', 0)),
-                'properties': properties,
-                'test_cases': self._parse_test_cases(root)
-            }
+        The file is read incrementally (see JUnitStreamParser), so memory stays
+        bounded by the test case list rather than the whole document tree.
+        stack_trace_limit truncates stack traces to that many characters
+        (0 drops them); None keeps them whole.
+        """
+        junit_file = self._junit_file()
+        if junit_file is None:
+            return {}
+
+        try:
+            stream = JUnitStreamParser(junit_file, stack_trace_limit=stack_trace_limit)
+            test_cases = list(stream.test_cases())
+            return dict(stream.summary, properties=stream.properties, test_cases=test_cases)
         except Exception as e:
             return {'error': str(e)}
 
+    def iter_test_cases(self, stack_trace_limit: int = None) -> Iterator[Dict[str, Any]]:
+        """Yield JUnit test cases one at a time without building the list"""
+        junit_file = self._junit_file()
+        if junit_file is not None:
+            yield from JUnitStreamParser(junit_file, stack_trace_limit=stack_trace_limit).test_cases()
+
     def _parse_properties(self, testsuite: ET.Element) -> Dict[str, Any]:
         """Parse test suite properties including AWS Device Farm URLs"""
-        props = {}
-        properties = testsuite.find('properties')
-        if properties is None:
-            return props
-
-        for prop in properties.findall('property'):
-            name = prop.get('name')
-            value = prop.get('value', '')
-
-            # Parse specific important properties
-            if name == 'sessionId':
-                props['session_id'] = value
-            elif name == 'logFolder':
-                props['log_folder'] = value
-            elif name == 'attachments':
-                props['attachments'] = [a.strip() for a in value.split(',') if a.strip()]
-            elif name == 'browser':
-                props['browser'] = value
-            elif name == 'remoteDriverUrl':
-                props['remote_driver'] = value
-            elif name == 'katalonVersion':
-                props['katalon_version'] = value
-            else:
-                props[name] = value
-
-        return props
+        return _parse_properties(testsuite)
 
     def _parse_test_cases(self, root: ET.Element) -> List[Dict[str, Any]]:
         """Parse individual test cases from XML"""
-        test_cases = []
-        for testcase in root.findall('.//testcase'):
-            case = {
-                'name': testcase.get('name'),
-                'classname': testcase.get('classname'),
-                'time': float(testcase.get('time', 0)),
-                'status': 'PASSED'
-            }
-
-            # Check for failures
-            failure = testcase.find('failure')
-            if failure is not None:
-                case['status'] = 'FAILED'
-                case['failure_message'] = failure.get('message', '')
-                case['failure_type'] = failure.get('type', '')
-                case['stack_trace'] = failure.text
-
-            # Check for errors
-            error = testcase.find('error')
-            if error is not None:
-                case['status'] = 'ERROR'
-                case['error_message'] = error.get('message', '')
-                case['error_type'] = error.get('type', '')
-                case['stack_trace'] = error.text
-
-            # Check for skipped
-            if testcase.find('skipped') is not None:
-                case['status'] = 'SKIPPED'
-
-            test_cases.append(case)
-
-        return test_cases
+        return [_parse_test_case(testcase) for testcase in root.findall('.//testcase')]
 
     def parse_execution_json(self) -> Dict[str, Any]:
         """Parse execution JSON if available"""
-        json_files = list(self.report_folder.glob('**/execution*.json'))
+        json_files = self.files.matching('execution*.json')
         if not json_files:
             return {}
 
@@ -135,7 +772,7 @@ class KatalonReportParser:
     def parse_test_suite(self) -> Dict[str, Any]:
         """Parse test suite information"""
         # Look for test suite XML or HTML reports
-        suite_files = list(self.report_folder.glob('**/*.html'))
+        suite_files = self.files.with_suffix('.html')
         if not suite_files:
             return {}
 
@@ -153,96 +790,826 @@ class KatalonReportParser:
         except Exception as e:
             return {'error': str(e)}
 
+    def execution_uuid(self) -> str:
+        """Katalon's execution.uuid for this run, or None"""
+        uuid_files = self.files.named('execution.uuid')
+        if not uuid_files:
+            return None
+        try:
+            with open(uuid_files[0], 'r') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def run_timestamp(self) -> str:
+        """ISO start time of the run (see _run_timestamp)"""
+        suite = {}
+        junit_file = self._junit_file()
+        if junit_file is not None:
+            stream = JUnitStreamParser(junit_file)
+            try:
+                stream.read_header()
+            except ET.ParseError:
+                pass
+            suite = stream.suite
+        return _run_timestamp(self.report_folder, suite)
+
+    def save_to_catalog(self, catalog: 'ReportCatalog', parsed_data: Dict[str, Any] = None) -> int:
+        """Upsert this folder's parsed output into a ReportCatalog; returns the execution id"""
+        if parsed_data is None:
+            parsed_data = self.parse(stack_trace_limit=0, sections=('junit_xml', 'artifacts', 'session_urls'))
+        return catalog.upsert(self.report_folder, parsed_data, execution_uuid=self.execution_uuid(),
+                              started_at=self.run_timestamp())
+
     def find_artifacts(self) -> Dict[str, List[str]]:
         """Find all test artifacts"""
-        # Note: glob doesn't support {mp4,webm} syntax, need separate searches
-        videos = list(self.report_folder.glob('**/*.mp4'))
-        videos.extend(self.report_folder.glob('**/*.webm'))
-
         return {
-            'screenshots': [str(f) for f in self.report_folder.glob('**/*.png')],
-            'videos': [str(f) for f in videos],
-            'har_files': [str(f) for f in self.report_folder.glob('**/*.har')],
-            'logs': [str(f) for f in self.report_folder.glob('**/*.log')]
+            'screenshots': self.files.with_suffix('.png'),
+            'videos': self.files.with_suffix('.mp4', '.webm'),
+            'har_files': self.files.with_suffix('.har'),
+            'logs': self.files.with_suffix('.log')
         }
 
-    def extract_session_urls(self) -> Dict[str, str]:
-        """Extract LogRocket or AWS Device Farm session URLs from logs and XML"""
-        urls = {}
+    def extract_session_urls(self, providers: Dict[str, tuple] = None) -> Dict[str, str]:
+        """
+        Extract session recording URLs (LogRocket, AWS Device Farm and any
+        registered provider) from the JUnit XML, then logs, then HTML, PDF
+        and CSV reports, stopping as soon as every provider is found.
+        """
+        # JUnit XML first (contains both LogRocket and AWS Device Farm URLs), logs as fallback
+        paths = self.files.named('JUnit_Report.xml')[:1]
+        paths += self.files.with_suffix('.log')
+        paths += self.files.with_suffix('.html', '.pdf', '.csv')
 
-        # Pattern for LogRocket URLs (including query parameters)
-        logrocket_pattern = r'https://app\.logrocket\.com/[a-zA-Z0-9/\-\?=&]+'
+        urls = SessionUrlScanner(providers).scan(paths)
+        return urls if urls else None
 
-        # Pattern for AWS Device Farm URLs
-        device_farm_pattern = r'https://[a-z0-9\-]+\.console\.aws\.amazon\.com/devicefarm/[^\s]+'
 
-        # Check JUnit XML first (contains both LogRocket and AWS Device Farm URLs)
-        junit_files = list(self.report_folder.glob('**/JUnit_Report.xml'))
-        if junit_files:
+def find_report_folders(inputs: List[str]) -> List[Path]:
+    """
+    Report folders (directories holding a JUnit_Report.xml) under the inputs.
+    A report folder's own subdirectories (screenshots, requests) are not walked.
+    """
+    found = {}
+    for item in inputs:
+        stack = [item]
+        while stack:
+            directory = stack.pop()
             try:
-                with open(junit_files[0], 'r') as f:
-                    content = f.read()
-
-                # Check for LogRocket in MESSAGE logs
-                logrocket_match = re.search(logrocket_pattern, content)
-                if logrocket_match:
-                    urls['logrocket_url'] = logrocket_match.group(0)
-
-                # Check for AWS Device Farm
-                device_farm_match = re.search(device_farm_pattern, content)
-                if device_farm_match:
-                    urls['device_farm_url'] = device_farm_match.group(0)
-            except:
-                pass
+                with os.scandir(directory) as scan:
+                    entries = list(scan)
+            except OSError:
+                continue
+            if any(entry.name == JUNIT_REPORT_NAME and entry.is_file() for entry in entries):
+                found.setdefault(os.path.realpath(directory), Path(directory))
+                continue
+            stack.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+    return sorted(found.values(), key=str)
+
+
+def _run_timestamp(folder: Path, suite: Dict[str, str]) -> str:
+    """Start time of a run: the testsuite timestamp, else a YYYYMMDD_HHMMSS folder name, else mtime"""
+    value = suite.get('timestamp')
+    for fmt in SUITE_TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).isoformat()
+        except (TypeError, ValueError):
+            continue
+    match = REPORT_FOLDER_TIMESTAMP.search(str(folder))
+    if match:
+        return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').isoformat()
+    return datetime.fromtimestamp(os.path.getmtime(folder)).isoformat(timespec='seconds')
+
+
+def _failure_message(case: Dict[str, Any]) -> str:
+    return failure_reason(case).split('\n', 1)[0][:FAILURE_MESSAGE_CHARS]
+
+
+def parse_junit_for_batch(folder: str) -> Dict[str, Any]:
+    """Parse one folder's JUnit report in a worker process (CPU-bound)"""
+    try:
+        stream = JUnitStreamParser(Path(folder) / JUNIT_REPORT_NAME, stack_trace_limit=0)
+        test_cases = [dict({'name': case['name'], 'time': case['time'], 'status': case['status']},
+                           **({'message': _failure_message(case)} if case['status'] in ('FAILED', 'ERROR') else {}))
+                      for case in stream.test_cases()]
+        summary = stream.summary
+        return dict(summary,
+                    passed=summary['total_tests'] - summary['failures'] - summary['errors'] - summary['skipped'],
+                    timestamp=_run_timestamp(Path(folder), stream.suite),
+                    test_cases=test_cases)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def scan_artifacts_for_batch(folder: str) -> Dict[str, Any]:
+    """Count artifacts and find session URLs of one folder in a worker thread (I/O-bound)"""
+    try:
+        parser = KatalonReportParser(folder)
+        artifacts = parser.find_artifacts()
+        return {
+            'artifacts': {kind: len(paths) for kind, paths in artifacts.items()},
+            'har_files': artifacts['har_files'],
+            'session_urls': parser.extract_session_urls()
+        }
+    except Exception as e:
+        return {'artifact_error': str(e)}
+
+
+def iter_batch_results(folders: List[Path], workers: int = None, threads: int = None) -> Iterator[Dict[str, Any]]:
+    """
+    Parse report folders concurrently and yield one record per folder as it
+    completes: JUnit parsing runs in a process pool, artifact and session URL
+    scanning in a thread pool.
+    """
+    if not folders:
+        return
+    workers = max(1, min(workers or os.cpu_count() or 1, len(folders)))
+    threads = max(1, min(threads or 4 * workers, len(folders)))
+    partial = {}
+    with ProcessPoolExecutor(max_workers=workers) as processes, ThreadPoolExecutor(max_workers=threads) as pool:
+        futures = {}
+        for folder in folders:
+            futures[processes.submit(parse_junit_for_batch, str(folder))] = str(folder)
+            futures[pool.submit(scan_artifacts_for_batch, str(folder))] = str(folder)
+        for future in as_completed(futures):
+            folder = futures[future]
+            parts = partial.setdefault(folder, [])
+            parts.append(future.result())
+            if len(parts) == 2:
+                del partial[folder]
+                record = {'folder': folder}
+                for part in parts:
+                    record.update(part)
+                yield record
+
+
+class BatchAggregate:
+    """Running aggregate over per-folder batch records"""
+
+    def __init__(self, limit: int = BATCH_TOP_LIMIT):
+        self.limit = limit
+        self.runs = 0
+        self.failed_folders = []
+        self.days = defaultdict(lambda: {'runs': 0, 'tests': 0, 'passed': 0, 'failed': 0})
+        self.durations = defaultdict(lambda: [0, 0.0, 0.0])  # runs, total, max
+        self.messages = Counter()
+        self.message_tests = defaultdict(list)
+
+    def add(self, record: Dict[str, Any]):
+        if 'error' in record:
+            self.failed_folders.append({'folder': record['folder'], 'error': record['error']})
+            return
+        self.runs += 1
+        day = self.days[record['timestamp'][:10]]
+        day['runs'] += 1
+        day['tests'] += record['total_tests']
+        day['passed'] += record['passed']
+        day['failed'] += record['failures'] + record['errors']
+
+        for case in record['test_cases']:
+            stats = self.durations[case['name']]
+            stats[0] += 1
+            stats[1] += case['time']
+            stats[2] = max(stats[2], case['time'])
+            if 'message' in case:
+                self.messages[case['message']] += 1
+                if len(self.message_tests[case['message']]) < 3 and case['name'] not in self.message_tests[case['message']]:
+                    self.message_tests[case['message']].append(case['name'])
+
+    def result(self) -> Dict[str, Any]:
+        pass_rate = []
+        for date in sorted(self.days):
+            day = self.days[date]
+            pass_rate.append(dict(day, date=date,
+                                  pass_rate=round(day['passed'] / day['tests'], 4) if day['tests'] else None))
+        slowest = sorted(self.durations.items(), key=lambda item: item[1][1] / item[1][0], reverse=True)
+        return {
+            'runs': self.runs,
+            'failed_folders': self.failed_folders,
+            'pass_rate_over_time': pass_rate,
+            'slowest_test_cases': [{
+                'name': name,
+                'runs': runs,
+                'mean_seconds': round(total / runs, 3),
+                'max_seconds': longest
+            } for name, (runs, total, longest) in slowest[:self.limit]],
+            'top_failure_messages': [{
+                'message': message,
+                'count': count,
+                'tests': self.message_tests[message]
+            } for message, count in self.messages.most_common(self.limit)]
+        }
+
+
+def parse_batch(inputs: List[str], jsonl_output: 'NdjsonWriter' = None, workers: int = None) -> Dict[str, Any]:
+    """Parse every report folder under inputs, streaming records to jsonl_output, and aggregate them"""
+    start = time.perf_counter()
+    folders = find_report_folders(inputs)
+    aggregate = BatchAggregate()
+    for record in iter_batch_results(folders, workers=workers):
+        if jsonl_output is not None:
+            jsonl_output.write(record)
+        aggregate.add(record)
+    return dict(aggregate.result(), folders=len(folders), wall_time_s=round(time.perf_counter() - start, 3))
+
+
+class ReportCatalog:
+    """
+    Persistent SQLite catalog of parsed report folders.
+
+    Each folder is one row in executions, with its test cases, failures,
+    artifacts and session URLs in child tables. A folder is re-parsed only
+    when its execution.uuid or JUnit report mtime differs from the indexed
+    row, so trend queries run against indexed tables instead of re-parsing
+    the whole report history.
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS executions (
+            id INTEGER PRIMARY KEY,
+            folder TEXT NOT NULL UNIQUE,
+            execution_uuid TEXT,
+            junit_mtime_ns INTEGER,
+            started_at TEXT,
+            suite_name TEXT,
+            total_tests INTEGER,
+            passed INTEGER,
+            failures INTEGER,
+            errors INTEGER,
+            skipped INTEGER,
+            duration REAL,
+            properties TEXT,
+            indexed_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS executions_started_at ON executions (started_at);
+        CREATE TABLE IF NOT EXISTS test_cases (
+            execution_id INTEGER NOT NULL REFERENCES executions (id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            classname TEXT,
+            status TEXT,
+            time REAL
+        );
+        CREATE INDEX IF NOT EXISTS test_cases_name ON test_cases (name, execution_id);
+        CREATE INDEX IF NOT EXISTS test_cases_execution ON test_cases (execution_id);
+        CREATE TABLE IF NOT EXISTS failures (
+            execution_id INTEGER NOT NULL REFERENCES executions (id) ON DELETE CASCADE,
+            test_name TEXT NOT NULL,
+            kind TEXT,
+            type TEXT,
+            message TEXT
+        );
+        CREATE INDEX IF NOT EXISTS failures_execution ON failures (execution_id);
+        CREATE TABLE IF NOT EXISTS artifacts (
+            execution_id INTEGER NOT NULL REFERENCES executions (id) ON DELETE CASCADE,
+            kind TEXT,
+            path TEXT
+        );
+        CREATE INDEX IF NOT EXISTS artifacts_execution ON artifacts (execution_id);
+        CREATE TABLE IF NOT EXISTS session_urls (
+            execution_id INTEGER NOT NULL REFERENCES executions (id) ON DELETE CASCADE,
+            provider TEXT,
+            url TEXT
+        );
+        CREATE INDEX IF NOT EXISTS session_urls_execution ON session_urls (execution_id);
+    '''
+
+    TABLES = ('session_urls', 'artifacts', 'failures', 'test_cases', 'executions')
+
+    def __init__(self, path: str = None):
+        if path is None:
+            path = os.environ.get(CATALOG_PATH_ENV) or \
+                Path.home() / '.cache' / 'katalon-report-parser' / 'catalog.sqlite3'
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.path))
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self._migrate()
+
+    def _migrate(self):
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version == CATALOG_SCHEMA_VERSION:
+            return
+        with self.connection:
+            # The catalog is derived from report folders, so older schemas are rebuilt
+            for table in self.TABLES:
+                self.connection.execute(f'DROP TABLE IF EXISTS {table}')
+            self.connection.executescript(self.SCHEMA)
+            self.connection.execute(f'PRAGMA user_version = {CATALOG_SCHEMA_VERSION}')
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _key(folder) -> str:
+        return os.path.realpath(str(folder))
+
+    @staticmethod
+    def _junit_mtime_ns(folder) -> int:
+        try:
+            return os.stat(os.path.join(str(folder), JUNIT_REPORT_NAME)).st_mtime_ns
+        except OSError:
+            return None
+
+    def is_current(self, folder, execution_uuid: str = None) -> bool:
+        """True if folder is indexed with the same execution.uuid and JUnit report mtime"""
+        row = self.connection.execute(
+            'SELECT execution_uuid, junit_mtime_ns FROM executions WHERE folder = ?',
+            (self._key(folder),)).fetchone()
+        return row is not None and row == (execution_uuid, self._junit_mtime_ns(folder))
+
+    def upsert(self, folder, parsed_data: Dict[str, Any], execution_uuid: str = None,
+               started_at: str = None) -> int:
+        """Replace the catalog rows for a folder with its parsed output"""
+        junit = parsed_data.get('junit_xml') or {}
+        if 'error' in junit:
+            raise ValueError(f"Cannot index {folder}: {junit['error']}")
+        test_cases = junit.get('test_cases', [])
+        total = junit.get('total_tests', 0)
+
+        with self.connection:
+            self.connection.execute('DELETE FROM executions WHERE folder = ?', (self._key(folder),))
+            execution_id = self.connection.execute(
+                'INSERT INTO executions (folder, execution_uuid, junit_mtime_ns, started_at, suite_name, '
+                'total_tests, passed, failures, errors, skipped, duration, properties, indexed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (self._key(folder), execution_uuid, self._junit_mtime_ns(folder), started_at,
+                 junit.get('suite_name'), total,
+                 total - junit.get('failures', 0) - junit.get('errors', 0) - junit.get('skipped', 0),
+                 junit.get('failures', 0), junit.get('errors', 0), junit.get('skipped', 0),
+                 junit.get('time_seconds', 0.0), json.dumps(junit.get('properties', {})),
+                 datetime.now().isoformat(timespec='seconds'))
+            ).lastrowid
+
+            self.connection.executemany(
+                'INSERT INTO test_cases (execution_id, name, classname, status, time) VALUES (?, ?, ?, ?, ?)',
+                [(execution_id, case['name'], case.get('classname'), case['status'], case['time'])
+                 for case in test_cases])
+            self.connection.executemany(
+                'INSERT INTO failures (execution_id, test_name, kind, type, message) VALUES (?, ?, ?, ?, ?)',
+                [(execution_id, case['name'], kind, case.get(f'{kind}_type'), case.get(f'{kind}_message'))
+                 for case in test_cases for kind in ('failure', 'error') if f'{kind}_message' in case])
+            self.connection.executemany(
+                'INSERT INTO artifacts (execution_id, kind, path) VALUES (?, ?, ?)',
+                [(execution_id, kind, path)
+                 for kind, paths in (parsed_data.get('artifacts') or {}).items() for path in paths])
+            self.connection.executemany(
+                'INSERT INTO session_urls (execution_id, provider, url) VALUES (?, ?, ?)',
+                [(execution_id, provider, url)
+                 for provider, url in (parsed_data.get('session_urls') or {}).items()])
+        return execution_id
+
+    def execution_count(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM executions').fetchone()[0]
+
+    def indexed_reports(self) -> Dict[str, int]:
+        """Indexed folder -> JUnit report mtime_ns"""
+        return dict(self.connection.execute('SELECT folder, junit_mtime_ns FROM executions'))
+
+    def history(self, runs: int = None) -> 'TestHistory':
+        """TestHistory of the last `runs` executions (all if None), oldest first"""
+        query = ('SELECT executions.id, executions.started_at, name, status, time '
+                 'FROM test_cases JOIN executions ON executions.id = test_cases.execution_id ')
+        params = ()
+        if runs:
+            query += ('WHERE executions.id IN (SELECT id FROM executions '
+                      'ORDER BY started_at DESC, id DESC LIMIT ?) ')
+            params = (runs,)
+        query += 'ORDER BY executions.started_at, executions.id'
+
+        history = TestHistory()
+        current = None
+        for execution_id, started_at, name, status, duration in self.connection.execute(query, params):
+            if execution_id != current:
+                current = execution_id
+                history.start_run(started_at)
+            history.add(name, status, duration)
+        return history
+
+    def slower_tests(self, runs: int = TREND_RUNS, limit: int = BATCH_TOP_LIMIT,
+                     min_samples: int = 2) -> List[Dict[str, Any]]:
+        """
+        Tests that got slower over the last `runs` executions: mean duration in
+        the newer half of those runs against the older half, largest increase first.
+        """
+        recent_runs = max(1, runs // 2)
+        rows = self.connection.execute(
+            '''
+            WITH window_runs AS (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY started_at DESC, id DESC) AS age
+                FROM executions ORDER BY started_at DESC, id DESC LIMIT ?
+            )
+            SELECT name, COUNT(*) AS samples,
+                   AVG(CASE WHEN age > ? THEN time END) AS earlier,
+                   AVG(CASE WHEN age <= ? THEN time END) AS recent
+            FROM test_cases JOIN window_runs ON window_runs.id = test_cases.execution_id
+            WHERE status != 'SKIPPED'
+            GROUP BY name
+            HAVING earlier IS NOT NULL AND recent IS NOT NULL AND recent > earlier AND samples >= ?
+            ORDER BY recent - earlier DESC, name
+            LIMIT ?
+            ''', (runs, recent_runs, recent_runs, min_samples, limit)).fetchall()
+        return [{
+            'name': name,
+            'samples': samples,
+            'earlier_mean_seconds': round(earlier, 3),
+            'recent_mean_seconds': round(recent, 3),
+            'delta_seconds': round(recent - earlier, 3),
+            'change_pct': round((recent - earlier) / earlier * 100, 1) if earlier else None
+        } for name, samples, earlier, recent in rows]
+
+
+def _step_change(durations: List[float]):
+    """
+    Best single mean shift in a duration series: (split, before_mean,
+    after_mean, t) where split is the number of runs before the shift and t
+    the two-sample t-statistic of the split, or None if the series is too
+    short. Prefix sums make every candidate split O(1).
+    """
+    n = len(durations)
+    if n < 2 * STEP_MIN_SEGMENT:
+        return None
+    total = math.fsum(durations)
+    total_sq = math.fsum(value * value for value in durations)
+    floor = DURATION_RESOLUTION_S * DURATION_RESOLUTION_S
+    best = None
+    left = left_sq = 0.0
+    for count, value in enumerate(durations[:n - STEP_MIN_SEGMENT], 1):
+        left += value
+        left_sq += value * value
+        if count < STEP_MIN_SEGMENT:
+            continue
+        right_count = n - count
+        before = left / count
+        after = (total - left) / right_count
+        squares = (left_sq - count * before * before) + (total_sq - left_sq - right_count * after * after)
+        variance = max(squares / (n - 2), floor)
+        t = abs(after - before) / math.sqrt(variance * (1.0 / count + 1.0 / right_count))
+        if best is None or t > best[3]:
+            best = (count, before, after, t)
+    return best
 
-        # Also check log files as fallback
-        log_files = list(self.report_folder.glob('**/*.log'))
-        for log_file in log_files:
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    return sorted_values[max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)]
+
+
+class TestHistory:
+    """
+    Columnar history of test case results across executions.
+
+    Rows are appended run by run (oldest first) into parallel arrays of
+    interned test ids, run indices, status codes and durations, so 100k rows
+    take a few MB and analyze() is one stable sort plus one grouped pass
+    instead of per-query dict walks.
+    """
+
+    __test__ = False  # not a unittest/pytest test class
+
+    def __init__(self):
+        self.names = []
+        self._name_ids = {}
+        self.run_labels = []
+        self.test = array('I')
+        self.run = array('I')
+        self.status = array('b')
+        self.time = array('d')
+
+    def __len__(self) -> int:
+        return len(self.test)
+
+    def start_run(self, label: str) -> int:
+        """Begin the next (chronologically later) run; returns its index"""
+        self.run_labels.append(label)
+        return len(self.run_labels) - 1
+
+    def add(self, name: str, status: str, duration: float):
+        """Append one test case result to the current run"""
+        test_id = self._name_ids.get(name)
+        if test_id is None:
+            test_id = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        self.test.append(test_id)
+        self.run.append(len(self.run_labels) - 1)
+        self.status.append(TEST_STATUS_CODES.get(status, TEST_STATUS_CODES['SKIPPED']))
+        self.time.append(duration or 0.0)
+
+    def add_run(self, label: str, test_cases: List[Dict[str, Any]]):
+        """Append a run from parse_junit_xml()['test_cases']"""
+        self.start_run(label)
+        for case in test_cases:
+            self.add(case['name'], case['status'], case['time'])
+
+    def test_stats(self, thresholds: Dict[str, float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Per-test statistics in one pass over the rows grouped by test.
+
+        flip_rate is the share of consecutive outcomes that switch between
+        passed and failed (ERROR counts as failed, SKIPPED is ignored).
+        Duration statistics and step changes use passed runs only, since
+        failing runs usually abort early.
+        """
+        thresholds = dict(TREND_THRESHOLDS, **(thresholds or {}))
+        order = sorted(range(len(self.test)), key=self.test.__getitem__)
+        test, run, status, time = self.test, self.run, self.status, self.time
+        skipped = TEST_STATUS_CODES['SKIPPED']
+
+        start = 0
+        while start < len(order):
+            test_id = test[order[start]]
+            end = start
+            while end < len(order) and test[order[end]] == test_id:
+                end += 1
+            rows = order[start:end]
+            start = end
+
+            outcomes = [status[row] != 0 for row in rows if status[row] != skipped]
+            if not outcomes:
+                continue
+            failed = sum(outcomes)
+            flips = sum(1 for previous, current in zip(outcomes, outcomes[1:]) if previous != current)
+            passed_rows = [row for row in rows if status[row] == 0]
+            durations = [time[row] for row in passed_rows]
+
+            stats = {
+                'name': self.names[test_id],
+                'runs': len(outcomes),
+                'passed': len(outcomes) - failed,
+                'failed': failed,
+                'flips': flips,
+                'flip_rate': round(flips / (len(outcomes) - 1), 4) if len(outcomes) > 1 else 0.0,
+                'last_run': self.run_labels[run[rows[-1]]],
+                'mean_seconds': None,
+                'stddev_seconds': None,
+                'p95_seconds': None,
+                'step_change': None
+            }
+            if durations:
+                mean = math.fsum(durations) / len(durations)
+                variance = math.fsum((value - mean) ** 2 for value in durations) / len(durations)
+                stats.update(mean_seconds=round(mean, 3), stddev_seconds=round(math.sqrt(variance), 3),
+                             p95_seconds=round(_percentile(sorted(durations), 95), 3))
+
+            step = _step_change(durations)
+            if step is not None:
+                split, before, after, t = step
+                delta = after - before
+                if (t >= thresholds['step_t'] and abs(delta) >= thresholds['step_seconds']
+                        and abs(delta) >= before * thresholds['step_pct'] / 100.0):
+                    stats['step_change'] = {
+                        'first_run': self.run_labels[run[passed_rows[split]]],
+                        'before_seconds': round(before, 3),
+                        'after_seconds': round(after, 3),
+                        'delta_seconds': round(delta, 3),
+                        'change_pct': round(delta / before * 100, 1) if before else None,
+                        't': round(t, 1)
+                    }
+            yield stats
+
+    def analyze(self, limit: int = BATCH_TOP_LIMIT, thresholds: Dict[str, float] = None) -> Dict[str, Any]:
+        """Ranked flaky tests (by flip rate) and regressing tests (by duration step-up)"""
+        min_runs = dict(TREND_THRESHOLDS, **(thresholds or {}))['min_runs']
+        flaky, regressing = [], []
+        for stats in self.test_stats(thresholds):
+            if stats['runs'] < min_runs:
+                continue
+            if stats['flips']:
+                flaky.append(stats)
+            if stats['step_change'] and stats['step_change']['delta_seconds'] > 0:
+                regressing.append(stats)
+        flaky.sort(key=lambda stats: (-stats['flip_rate'], -stats['failed'], stats['name']))
+        regressing.sort(key=lambda stats: (-stats['step_change']['delta_seconds'], stats['name']))
+        return {
+            'runs': len(self.run_labels),
+            'rows': len(self.test),
+            'tests': len(self.names),
+            'flaky': flaky[:limit],
+            'regressing': regressing[:limit]
+        }
+
+
+def index_reports(inputs: List[str], catalog: ReportCatalog, force: bool = False) -> Dict[str, Any]:
+    """Parse and upsert every report folder under inputs that is new or changed since it was indexed"""
+    result = {'indexed': [], 'unchanged': 0, 'errors': []}
+    for folder in find_report_folders(inputs):
+        try:
+            parser = KatalonReportParser(str(folder))
+            if not force and catalog.is_current(folder, parser.execution_uuid()):
+                result['unchanged'] += 1
+                continue
+            parser.save_to_catalog(catalog)
+            result['indexed'].append(str(folder))
+        except Exception as e:
+            result['errors'].append({'folder': str(folder), 'error': str(e)})
+    return result
+
+
+class ReportWatcher:
+    """
+    Finds report folders that have finished writing by polling the inputs.
+
+    Directory listings are cached by directory mtime, so a poll costs one
+    stat per directory and only re-lists directories whose entries changed.
+    A folder is complete once its JUnit_Report.xml (written by Katalon at the
+    end of the execution) is settle_seconds old; it is handed out once, and
+    again only if the report is rewritten. handled (folder -> JUnit
+    mtime_ns) seeds the folders already processed, e.g. from the catalog.
+    """
+
+    def __init__(self, inputs: List[str], settle_seconds: float = WATCH_SETTLE_SECONDS,
+                 handled: Dict[str, int] = None):
+        self.inputs = list(inputs)
+        self.settle_seconds = settle_seconds
+        self.handled = dict(handled or {})
+        self._listings = {}  # directory -> (mtime_ns, subdirectories, has JUnit report)
+
+    def _listing(self, directory: str):
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._listings.pop(directory, None)
+            return [], False
+        cached = self._listings.get(directory)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1], cached[2]
+        try:
+            with os.scandir(directory) as scan:
+                entries = list(scan)
+        except OSError:
+            return [], False
+        has_junit = any(entry.name == JUNIT_REPORT_NAME and entry.is_file() for entry in entries)
+        subdirectories = [] if has_junit else [entry.path for entry in entries
+                                               if entry.is_dir(follow_symlinks=False)]
+        self._listings[directory] = (mtime_ns, subdirectories, has_junit)
+        return subdirectories, has_junit
+
+    def poll(self, now: float = None) -> List[str]:
+        """Report folders completed since the last poll, oldest report first"""
+        now = time.time() if now is None else now
+        ready = []
+        stack = list(self.inputs)
+        while stack:
+            directory = stack.pop()
+            subdirectories, has_junit = self._listing(directory)
+            if not has_junit:
+                stack.extend(subdirectories)
+                continue
             try:
-                with open(log_file, 'r') as f:
-                    content = f.read()
-
-                # Check for LogRocket (if not already found)
-                if 'logrocket_url' not in urls:
-                    logrocket_match = re.search(logrocket_pattern, content)
-                    if logrocket_match:
-                        urls['logrocket_url'] = logrocket_match.group(0)
-
-                # Check for AWS Device Farm (if not already found)
-                if 'device_farm_url' not in urls:
-                    device_farm_match = re.search(device_farm_pattern, content)
-                    if device_farm_match:
-                        urls['device_farm_url'] = device_farm_match.group(0)
-            except:
+                stat = os.stat(os.path.join(directory, JUNIT_REPORT_NAME))
+            except OSError:
                 continue
+            key = os.path.realpath(directory)
+            if self.handled.get(key) == stat.st_mtime_ns or now - stat.st_mtime < self.settle_seconds:
+                continue
+            self.handled[key] = stat.st_mtime_ns
+            ready.append((stat.st_mtime_ns, directory))
+        return [directory for _, directory in sorted(ready)]
 
-        # Also check HTML, PDF, CSV reports
-        for ext in ['html', 'pdf', 'csv']:
-            report_files = list(self.report_folder.glob(f'**/*.{ext}'))
-            for report_file in report_files:
-                try:
-                    with open(report_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-
-                    # Check for LogRocket (if not already found)
-                    if 'logrocket_url' not in urls:
-                        logrocket_match = re.search(logrocket_pattern, content)
-                        if logrocket_match:
-                            urls['logrocket_url'] = logrocket_match.group(0)
-
-                    # Check for AWS Device Farm (if not already found)
-                    if 'device_farm_url' not in urls:
-                        device_farm_match = re.search(device_farm_pattern, content)
-                        if device_farm_match:
-                            urls['device_farm_url'] = device_farm_match.group(0)
-
-                    # Break if we found both
-                    if 'logrocket_url' in urls and 'device_farm_url' in urls:
-                        break
-                except:
-                    continue
 
-        return urls if urls else None
+_har_analyzer = None
+
+
+def _load_har_analyzer():
+    """The sibling har-analyzer.py module, or None when haralyzer is not installed"""
+    global _har_analyzer
+    if _har_analyzer is None and importlib.util.find_spec('haralyzer') is not None:
+        spec = importlib.util.spec_from_file_location('har_analyzer', str(Path(__file__).with_name('har-analyzer.py')))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _har_analyzer = module
+    return _har_analyzer
+
+
+def analyze_folder_for_watch(folder: str, analyze_har: bool = True) -> Dict[str, Any]:
+    """Parse one completed report folder and analyze its HAR files in a worker process"""
+    start = time.perf_counter()
+    try:
+        parser = KatalonReportParser(folder)
+        parsed = parser.parse(stack_trace_limit=0,
+                              sections=('junit_xml', 'failure_clusters', 'artifacts', 'session_urls'))
+        if 'error' in parsed['junit_xml']:
+            return {'folder': folder, 'error': parsed['junit_xml']['error']}
+        result = {'folder': folder, 'execution_uuid': parser.execution_uuid(),
+                  'started_at': parser.run_timestamp(), 'parsed': parsed, 'har_files': []}
+
+        har_files = parsed['artifacts']['har_files'] if analyze_har else []
+        har = _load_har_analyzer() if har_files else None
+        if har_files and har is None:
+            result['har_error'] = 'haralyzer not installed (pip3 install haralyzer)'
+        elif har_files:
+            # Each folder is analyzed once, so the HAR result cache would only add writes;
+            # the records carry no latency, so the histograms are not built either
+            result['har_files'] = [
+                {key: value for key, value in har.analyze_for_batch(
+                    path, stream=har.ijson is not None, use_cache=False,
+                    sections=('summary', 'errors', 'slow_requests')).items()
+                 if key != 'histograms'}
+                for path in har_files]
+        result['wall_time_s'] = round(time.perf_counter() - start, 3)
+        return result
+    except Exception as e:
+        return {'folder': folder, 'error': str(e)}
+
+
+def watch_record(result: Dict[str, Any]) -> Dict[str, Any]:
+    """NDJSON record for one watched folder (same test case fields as batch records)"""
+    if 'error' in result:
+        return {'record': 'report', 'folder': result['folder'], 'error': result['error']}
+    parsed = result['parsed']
+    junit = parsed['junit_xml']
+    summary = {key: junit.get(key) for key in ('suite_name', 'total_tests', 'failures', 'errors', 'skipped',
+                                               'time_seconds')}
+    record = dict({'record': 'report', 'folder': result['folder'], 'execution_uuid': result['execution_uuid'],
+                   'started_at': result['started_at']}, **summary)
+    record.update(
+        passed=junit['total_tests'] - junit['failures'] - junit['errors'] - junit['skipped'],
+        test_cases=[dict({'name': case['name'], 'time': case['time'], 'status': case['status']},
+                         **({'message': _failure_message(case)} if case['status'] in ('FAILED', 'ERROR') else {}))
+                    for case in junit.get('test_cases', [])],
+        failure_clusters=parsed['failure_clusters'],
+        artifacts={kind: len(paths) for kind, paths in parsed['artifacts'].items()},
+        session_urls=parsed['session_urls'],
+        har_files=result['har_files'],
+        wall_time_s=result['wall_time_s'])
+    if 'har_error' in result:
+        record['har_error'] = result['har_error']
+    return record
+
+
+def watch_reports(inputs: List[str], catalog: ReportCatalog = None, ndjson_output: 'NdjsonWriter' = None,
+                  workers: int = None, interval: float = WATCH_POLL_SECONDS,
+                  settle_seconds: float = WATCH_SETTLE_SECONDS, backlog_limit: int = WATCH_BACKLOG_LIMIT,
+                  analyze_har: bool = True, once: bool = False, on_record=None) -> Dict[str, Any]:
+    """
+    Parse report folders as they complete, appending one record per folder
+    to ndjson_output and upserting it into the catalog.
+
+    Work is bounded: a process pool of `workers` (default half the CPUs)
+    holds at most WATCH_IN_FLIGHT_PER_WORKER folders per worker, completed
+    folders wait in a FIFO backlog, and the inputs are not scanned again
+    while backlog_limit folders are waiting, so a burst of finishing jobs
+    queues up instead of flooding the machine. Folders already in the
+    catalog are skipped. Catalog writes happen in this process only.
+    With once=True, returns after the folders complete at the first poll.
+    """
+    workers = max(1, workers or (os.cpu_count() or 2) // 2)
+    watcher = ReportWatcher(inputs, settle_seconds,
+                            handled=catalog.indexed_reports() if catalog is not None else None)
+    backlog = deque()
+    in_flight = {}
+    stats = {'processed': 0, 'errors': 0, 'har_files': 0}
+    next_poll = 0.0
+    polled = False
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            now = time.monotonic()
+            if now >= next_poll and len(backlog) < backlog_limit and not (once and polled):
+                backlog.extend(watcher.poll())
+                next_poll = now + interval
+                polled = True
+            while backlog and len(in_flight) < workers * WATCH_IN_FLIGHT_PER_WORKER:
+                folder = backlog.popleft()
+                in_flight[executor.submit(analyze_folder_for_watch, folder, analyze_har)] = folder
+
+            if not in_flight:
+                if once:
+                    break
+                time.sleep(max(0.0, next_poll - time.monotonic()))
+                continue
+
+            # Nothing to scan until a folder finishes: block on the pool instead of spinning
+            timeout = None if once or len(backlog) >= backlog_limit else max(0.0, next_poll - time.monotonic())
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                folder = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'folder': folder, 'error': str(e)}
+                if 'error' not in result and catalog is not None:
+                    try:
+                        catalog.upsert(folder, result['parsed'], execution_uuid=result['execution_uuid'],
+                                       started_at=result['started_at'])
+                    except Exception as e:
+                        result = {'folder': folder, 'error': str(e)}
+                record = watch_record(result)
+                if 'error' in record:
+                    stats['errors'] += 1
+                else:
+                    stats['processed'] += 1
+                    stats['har_files'] += len(record['har_files'])
+                if ndjson_output is not None:
+                    ndjson_output.write(record)
+                if on_record is not None:
+                    on_record(record)
+    return stats
 
 
 def print_report(parsed_data: Dict[str, Any]):
@@ -251,8 +1618,8 @@ def print_report(parsed_data: Dict[str, Any]):
     print("KATALON REPORT ANALYSIS")
     print("="*80 + "\n")
 
-    # JUnit XML Summary
-    junit = parsed_data.get('junit_xml', {})
+    # JUnit XML Summary (the summary section alone has no test cases)
+    junit = parsed_data.get('junit_xml') or parsed_data.get('summary') or {}
     if junit and 'total_tests' in junit:
         print("TEST EXECUTION SUMMARY")
         print("-" * 80)
@@ -284,12 +1651,18 @@ def print_report(parsed_data: Dict[str, Any]):
         if failed_tests:
             print(f"FAILED TESTS ({len(failed_tests)})")
             print("-" * 80)
-            for test in failed_tests:
-                print(f"\n{test['name']}")
-                print(f"  Status: {test['status']}")
-                print(f"  Duration: {test['time']:.2f}s")
-                if 'failure_message' in test:
-                    print(f"  Error: {test['failure_message']}")
+            clusters = parsed_data.get('failure_clusters')
+            if clusters is None:
+                clusters = cluster_failures(failed_tests)
+            print(f"{len(clusters)} distinct failure cause(s)")
+            for cluster in clusters:
+                representative = cluster['representative']
+                print(f"\n[{cluster['count']}x] {representative['message']}")
+                print(f"  Example: {representative['name']} ({representative['status']})")
+                others = cluster['test_count'] - 1
+                if others:
+                    shown = [name for name in cluster['tests'] if name != representative['name']]
+                    print(f"  Also: {', '.join(shown)}" + (f" and {others - len(shown)} more" if others > len(shown) else ''))
             print()
 
     # Session URLs
@@ -297,10 +1670,9 @@ def print_report(parsed_data: Dict[str, Any]):
     if session_urls:
         print("SESSION RECORDING LINKS")
         print("-" * 80)
-        if 'logrocket_url' in session_urls:
-            print(f"LogRocket: {session_urls['logrocket_url']}")
-        if 'device_farm_url' in session_urls:
-            print(f"AWS Device Farm: {session_urls['device_farm_url']}")
+        for key, url in session_urls.items():
+            label = SESSION_URL_PROVIDERS.get(key, (key,))[0]
+            print(f"{label}: {url}")
         print()
 
     # Artifacts
@@ -322,16 +1694,283 @@ def print_report(parsed_data: Dict[str, Any]):
     print("="*80 + "\n")
 
 
+def print_batch_report(aggregate: Dict[str, Any]):
+    """Print formatted batch aggregate"""
+    print("\n" + "="*80)
+    print("KATALON REPORT BATCH ANALYSIS")
+    print("="*80 + "\n")
+
+    print(f"Report Folders: {aggregate['folders']} ({len(aggregate['failed_folders'])} failed to parse)")
+    print(f"Wall Time: {aggregate['wall_time_s']:.2f}s\n")
+
+    if aggregate['pass_rate_over_time']:
+        print("PASS RATE OVER TIME")
+        print("-" * 80)
+        for day in aggregate['pass_rate_over_time']:
+            rate = f"{day['pass_rate'] * 100:.1f}%" if day['pass_rate'] is not None else 'n/a'
+            print(f"{day['date']}  {rate:>7}  ({day['passed']}/{day['tests']} tests, {day['runs']} runs)")
+        print()
+
+    if aggregate['slowest_test_cases']:
+        print("SLOWEST TEST CASES (mean)")
+        print("-" * 80)
+        for case in aggregate['slowest_test_cases'][:10]:
+            print(f"{case['mean_seconds']:>9.2f}s  (max {case['max_seconds']:.2f}s, {case['runs']} runs)  {case['name']}")
+        print()
+
+    if aggregate['top_failure_messages']:
+        print("MOST FREQUENT FAILURES")
+        print("-" * 80)
+        for failure in aggregate['top_failure_messages'][:10]:
+            print(f"{failure['count']:>5}x  {failure['message']}")
+            print(f"        e.g. {', '.join(failure['tests'])}")
+        print()
+
+    for failed in aggregate['failed_folders']:
+        print(f"ERROR: {failed['folder']}: {failed['error']}")
+
+    print("="*80 + "\n")
+
+
+def _option(flag: str, default=None):
+    """Value following a command line flag, or default"""
+    index = sys.argv.index(flag) if flag in sys.argv else -1
+    return sys.argv[index + 1] if 0 <= index < len(sys.argv) - 1 else default
+
+
+def run_batch():
+    """batch <Reports-dir>... [--jsonl results.jsonl] [--json aggregate.json] [--workers N]"""
+    flags_with_values = ('--jsonl', '--json', '--workers')
+    inputs = []
+    skip = False
+    for arg in sys.argv[2:]:
+        if skip:
+            skip = False
+        elif arg in flags_with_values:
+            skip = True
+        elif not arg.startswith('--'):
+            inputs.append(arg)
+    if not inputs:
+        print("Usage: python3 katalon-report-parser.py batch <reports-dir>... [--jsonl results.jsonl] "
+              "[--json aggregate.json] [--workers N]")
+        sys.exit(1)
+
+    workers = int(_option('--workers', '0')) or None
+    jsonl_path = _option('--jsonl')
+    if jsonl_path:
+        with NdjsonWriter(jsonl_path, flush_every=1) as jsonl_output:
+            aggregate = parse_batch(inputs, jsonl_output, workers=workers)
+    else:
+        aggregate = parse_batch(inputs, workers=workers)
+    if not aggregate['folders']:
+        print("No report folders (containing JUnit_Report.xml) found")
+        sys.exit(1)
+
+    if jsonl_path:
+        print(f"✓ Per-folder results streamed to {jsonl_path}")
+    if '--json' in sys.argv:
+        output_file = _option('--json', 'report-batch.json')
+        with open(output_file, 'w') as f:
+            json.dump(aggregate, f, indent=2)
+        print(f"✓ Aggregate exported to {output_file}")
+    else:
+        print_batch_report(aggregate)
+
+
+def run_index():
+    """index <Reports-dir>... [--catalog catalog.sqlite3] [--force]"""
+    inputs = [arg for i, arg in enumerate(sys.argv[2:], 2)
+              if not arg.startswith('--') and sys.argv[i - 1] != '--catalog']
+    if not inputs:
+        print("Usage: python3 katalon-report-parser.py index <reports-dir>... "
+              "[--catalog catalog.sqlite3] [--force]")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    with ReportCatalog(_option('--catalog')) as catalog:
+        result = index_reports(inputs, catalog, force='--force' in sys.argv)
+        print(f"✓ Indexed {len(result['indexed'])} report folders, {result['unchanged']} unchanged "
+              f"({time.perf_counter() - start:.2f}s)")
+        print(f"  Catalog: {catalog.path} ({catalog.execution_count()} executions)")
+    for failed in result['errors']:
+        print(f"ERROR: {failed['folder']}: {failed['error']}")
+
+
+def run_slower():
+    """slower [--runs N] [--limit N] [--catalog catalog.sqlite3] [--json output.json]"""
+    runs = int(_option('--runs', TREND_RUNS))
+    with ReportCatalog(_option('--catalog')) as catalog:
+        slower = catalog.slower_tests(runs=runs, limit=int(_option('--limit', BATCH_TOP_LIMIT)))
+
+    if '--json' in sys.argv:
+        output_file = _option('--json', 'slower-tests.json')
+        with open(output_file, 'w') as f:
+            json.dump(slower, f, indent=2)
+        print(f"✓ Slower tests exported to {output_file}")
+        return
+
+    print(f"\nTESTS THAT GOT SLOWER (last {runs} runs, newer half vs older half)")
+    print("-" * 80)
+    if not slower:
+        print("No test got slower")
+    for test in slower:
+        # No percentage when the earlier runs took 0s
+        change = f"{test['change_pct']:+.0f}%" if test['change_pct'] is not None else 'n/a'
+        print(f"{test['earlier_mean_seconds']:>8.2f}s -> {test['recent_mean_seconds']:>8.2f}s  "
+              f"(+{test['delta_seconds']:.2f}s, {change})  {test['name']}")
+    print()
+
+
+def print_trends(trends: Dict[str, Any]):
+    """Print ranked flaky and regressing tests"""
+    print("\n" + "="*80)
+    print("TEST HISTORY TRENDS")
+    print("="*80 + "\n")
+    print(f"Runs: {trends['runs']}  Tests: {trends['tests']}  Results: {trends['rows']}\n")
+
+    print("FLAKY TESTS (pass/fail flip rate)")
+    print("-" * 80)
+    if not trends['flaky']:
+        print("No flaky tests")
+    for test in trends['flaky']:
+        print(f"{test['flip_rate'] * 100:>5.0f}%  ({test['failed']}/{test['runs']} failed, "
+              f"{test['flips']} flips)  {test['name']}")
+    print()
+
+    print("REGRESSING TESTS (duration step change)")
+    print("-" * 80)
+    if not trends['regressing']:
+        print("No duration regressions")
+    for test in trends['regressing']:
+        step = test['step_change']
+        print(f"{step['before_seconds']:>8.2f}s -> {step['after_seconds']:>8.2f}s  since {step['first_run']}  "
+              f"(p95 {test['p95_seconds']:.2f}s)  {test['name']}")
+    print("\n" + "="*80 + "\n")
+
+
+def run_trends():
+    """trends [--runs N] [--limit N] [--catalog catalog.sqlite3] [--json output.json]"""
+    runs = int(_option('--runs', 0)) or None
+    with ReportCatalog(_option('--catalog')) as catalog:
+        history = catalog.history(runs)
+    trends = history.analyze(limit=int(_option('--limit', BATCH_TOP_LIMIT)))
+
+    if '--json' in sys.argv:
+        output_file = _option('--json', 'test-trends.json')
+        with open(output_file, 'w') as f:
+            json.dump(trends, f, indent=2)
+        print(f"✓ Trends exported to {output_file}")
+    else:
+        print_trends(trends)
+
+
+def run_watch():
+    """watch <Reports-dir>... [--jsonl results.jsonl] [--catalog catalog.sqlite3 | --no-catalog] [--workers N]
+    [--interval S] [--settle S] [--no-har] [--once]"""
+    flags_with_values = ('--jsonl', '--catalog', '--workers', '--interval', '--settle')
+    inputs = [arg for i, arg in enumerate(sys.argv[2:], 2)
+              if not arg.startswith('--') and sys.argv[i - 1] not in flags_with_values]
+    if not inputs:
+        print("Usage: python3 katalon-report-parser.py watch <reports-dir>... [--jsonl results.jsonl] "
+              "[--catalog catalog.sqlite3 | --no-catalog] [--workers N] [--interval 2] [--settle 5] "
+              "[--no-har] [--once]")
+        sys.exit(1)
+
+    def report_line(record):
+        if 'error' in record:
+            print(f"ERROR: {record['folder']}: {record['error']}")
+            return
+        print(f"✓ {record['folder']}: {record['passed']}/{record['total_tests']} passed, "
+              f"{len(record['har_files'])} HAR files ({record['wall_time_s']:.2f}s)", flush=True)
+
+    jsonl_path = _option('--jsonl', 'report-watch.jsonl')
+    catalog = None if '--no-catalog' in sys.argv else ReportCatalog(_option('--catalog'))
+    print(f"Watching {', '.join(inputs)} (results appended to {jsonl_path}"
+          f"{'' if catalog is None else ', catalog ' + str(catalog.path)}; Ctrl+C to stop)", flush=True)
+    stats = None
+    try:
+        with NdjsonWriter(jsonl_path, flush_every=1, append=True) as jsonl_output:
+            stats = watch_reports(inputs, catalog, jsonl_output,
+                                  workers=int(_option('--workers', '0')) or None,
+                                  interval=float(_option('--interval', WATCH_POLL_SECONDS)),
+                                  settle_seconds=float(_option('--settle', WATCH_SETTLE_SECONDS)),
+                                  analyze_har='--no-har' not in sys.argv,
+                                  once='--once' in sys.argv, on_record=report_line)
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        if catalog is not None:
+            catalog.close()
+    if stats is not None:
+        print(f"✓ Processed {stats['processed']} report folders ({stats['har_files']} HAR files), "
+              f"{stats['errors']} errors")
+
+
+COMMANDS = {'batch': run_batch, 'index': run_index, 'slower': run_slower, 'trends': run_trends,
+            'watch': run_watch}
+
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        try:
+            COMMANDS[sys.argv[1]]()
+        except Exception as e:
+            print(f"Error parsing Katalon reports: {e}")
+            sys.exit(1)
+        return
+
     if len(sys.argv) < 2:
-        print("Usage: python3 katalon-report-parser.py <report-folder> [--json output.json]")
+        print("Usage: python3 katalon-report-parser.py <report-folder> [--json output.json] "
+              "[--stack-trace-limit N] [--sections summary,artifacts,...]")
+        print("       python3 katalon-report-parser.py <report-folder> --ndjson output.ndjson "
+              "[--stack-trace-limit N]")
+        print("       python3 katalon-report-parser.py batch <reports-dir>... [--jsonl results.jsonl] "
+              "[--json aggregate.json] [--workers N]")
+        print("       python3 katalon-report-parser.py index <reports-dir>... [--catalog catalog.sqlite3] [--force]")
+        print("       python3 katalon-report-parser.py slower [--runs 30] [--catalog catalog.sqlite3] "
+              "[--json output.json]")
+        print("       python3 katalon-report-parser.py trends [--runs N] [--catalog catalog.sqlite3] "
+              "[--json output.json]")
+        print("       python3 katalon-report-parser.py watch <reports-dir>... [--jsonl results.jsonl] "
+              "[--catalog catalog.sqlite3 | --no-catalog] [--workers N] [--once]")
+        print("\n  --stack-trace-limit N  Truncate stack traces to N characters (0 drops them)")
+        print(f"  --sections LIST        Only compute these sections: {', '.join(REPORT_SECTIONS)}")
+        print("  --ndjson FILE          Stream a header, test cases, failure clusters, artifacts and")
+        print("                         session URLs as one JSON record per line ('-' for stdout)")
+        print("  batch                  Parse every report folder under the directories in parallel")
+        print("                         and print an aggregate; --jsonl also streams per-folder JSON Lines")
+        print("  index                  Upsert new or changed report folders into the SQLite catalog")
+        print("                         (default ~/.cache/katalon-report-parser/catalog.sqlite3)")
+        print("  slower                 Tests whose duration grew over the last N indexed runs")
+        print("  trends                 Flaky tests (pass/fail flip rate) and duration step changes")
+        print("                         across indexed runs")
+        print("  watch                  Parse report folders (and their HAR files) as they complete,")
+        print("                         appending to the JSON Lines file and the catalog")
         sys.exit(1)
 
     report_folder = sys.argv[1]
 
     try:
+        stack_trace_limit = None
+        if '--stack-trace-limit' in sys.argv:
+            limit_index = sys.argv.index('--stack-trace-limit')
+            stack_trace_limit = int(sys.argv[limit_index + 1]) if len(sys.argv) > limit_index + 1 else 0
+
+        sections = None
+        if '--sections' in sys.argv:
+            sections = [name.strip() for name in _option('--sections', '').split(',') if name.strip()]
+
         parser = KatalonReportParser(report_folder)
-        parsed_data = parser.parse()
+        if '--ndjson' in sys.argv:
+            output_file = _option('--ndjson', 'report.ndjson')
+            with NdjsonWriter(output_file) as writer:
+                for record in parser.iter_records(stack_trace_limit):
+                    writer.write(record)
+            if not writer.to_stdout:
+                print(f"✓ {writer.count} records streamed to {output_file}")
+            return
+
+        parsed_data = parser.parse(stack_trace_limit, sections)
 
         # Session URLs are already in parsed_data from parse()
 
@@ -0,0 +1,58 @@
+"""
+NDJSON output shared by har-analyzer.py and katalon-report-parser.py.
+Standard library only, so the report parser does not need haralyzer just
+to write NDJSON.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Any
+
+NDJSON_FLUSH_RECORDS = 256
+
+
+class NdjsonWriter:
+    """
+    Newline-delimited JSON output, one compact record per line.
+
+    Lines are flushed every NDJSON_FLUSH_RECORDS records so a consumer
+    tailing the file (jq, DuckDB, a log shipper) sees results while the run
+    is still going. output is a path, '-' for stdout, or an open text file
+    (left open on close()); append=True adds to an existing file instead of
+    replacing it. Values JSON cannot encode are written with str().
+    """
+
+    def __init__(self, output, flush_every: int = NDJSON_FLUSH_RECORDS, append: bool = False):
+        self.to_stdout = output == '-'
+        self._owned = isinstance(output, (str, Path)) and not self.to_stdout
+        if self.to_stdout:
+            self.file = sys.stdout
+        elif self._owned:
+            self.file = open(output, 'a' if append else 'w')
+        else:
+            self.file = output
+        self.flush_every = flush_every
+        self.count = 0
+
+    def write(self, record: Dict[str, Any]):
+        self.file.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+        self.count += 1
+        if self.count % self.flush_every == 0:
+            self.file.flush()
+
+    def write_all(self, records) -> int:
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self):
+        self.file.flush()
+        if self._owned:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Katalon HAR Analyzer
+Compares the sections the analyzer used to compute with one scan each
+against the same sections computed from the columnar entry store, on a
+synthetic HAR with 100k entries. Decoding the entries into the store is
+reported on its own, since every section shares it, followed by the
+default analyze() end to end, the on-request sections and the store's
+memory footprint. Fails if the store path or analyze() (decoding
+included) is slower than one scan per section.
+
+Usage:
+    python3 tests/bench_har_analyzer.py [entry-count]
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import importlib.util
+spec = importlib.util.spec_from_file_location(
+    "har_analyzer",
+    str(Path(__file__).parent.parent / 'scripts' / 'har-analyzer.py')
+)
+har_analyzer = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(har_analyzer)
+
+MIME_TYPES = ['application/json', 'text/html', 'text/css', 'image/png',
+              'application/javascript', 'font/woff2', 'video/mp4', 'text/plain']
+STATUSES = [200] * 90 + [204, 301, 304, 401, 403, 404, 500, 502, 503, 0]
+
+
+def build_synthetic_har(entry_count: int, seed: int = 7) -> dict:
+    """Build a HAR document with realistic-looking entries"""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(entry_count):
+        timings = {
+            'blocked': rng.choice([-1, rng.randint(0, 30)]),
+            'dns': rng.choice([-1, rng.randint(0, 80)]),
+            'connect': rng.choice([-1, rng.randint(0, 120)]),
+            'ssl': rng.choice([-1, rng.randint(0, 150)]),
+            'send': rng.randint(0, 5),
+            'wait': int(rng.lognormvariate(4.5, 1.0)),
+            'receive': rng.randint(0, 400),
+        }
+        total = sum(v for v in timings.values() if v > 0)
+        seconds, millis = divmod(i * 37, 1000)
+        entries.append({
+            'pageref': 'page_1',
+            'startedDateTime': f"2025-09-24T16:{(seconds // 60) % 60:02d}:{seconds % 60:02d}.{millis:03d}Z",
+            'time': total,
+            'request': {
+                'method': rng.choice(['GET', 'GET', 'GET', 'POST', 'PUT']),
+                'url': f"https://api{i % 4}.example.com/api/quotes/{rng.randint(1, 50000)}?t={i}",
+            },
+            'response': {
+                'status': rng.choice(STATUSES),
+                'statusText': '',
+                'bodySize': rng.randint(0, 200000),
+                'content': {'size': rng.randint(0, 400000), 'mimeType': rng.choice(MIME_TYPES)},
+            },
+            'timings': timings,
+        })
+    return {
+        'log': {
+            'version': '1.2',
+            'pages': [{'id': 'page_1', 'startedDateTime': '2025-09-24T16:00:00.000Z',
+                       'pageTimings': {'onContentLoad': 1200, 'onLoad': 2400}}],
+            'entries': entries,
+        }
+    }
+
+
+def multi_pass_analysis(entries: list) -> dict:
+    """Reference implementation of the previous one-scan-per-section analysis"""
+    def errors():
+        found, counts = [], defaultdict(int)
+        for entry in entries:
+            status = entry.get('response', {}).get('status', 0)
+            if status >= 400:
+                error_type = har_analyzer._classify_error(status)
+                found.append({'url': entry.get('request', {}).get('url', 'unknown'), 'status': status,
+                              'status_text': entry.get('response', {}).get('statusText', ''),
+                              'type': error_type, 'time': entry.get('startedDateTime')})
+                counts[error_type] += 1
+        return {'total_errors': len(found), 'error_breakdown': dict(counts), 'errors': found[:10]}
+
+    def slow():
+        rows = [{'url': e.get('request', {}).get('url', 'unknown'),
+                 'method': e.get('request', {}).get('method', 'unknown'),
+                 'time_ms': e.get('time', 0),
+                 'size_kb': e.get('response', {}).get('bodySize', 0) / 1024,
+                 'status': e.get('response', {}).get('status', 0)}
+                for e in entries if e.get('time', 0) > 1000]
+        return sorted(rows, key=lambda x: x['time_ms'], reverse=True)
+
+    def resources():
+        stats = defaultdict(lambda: {'count': 0, 'size_kb': 0})
+        for e in entries:
+            kind = har_analyzer._get_resource_type(e.get('response', {}).get('content', {}).get('mimeType', 'unknown'))
+            stats[kind]['count'] += 1
+            stats[kind]['size_kb'] += e.get('response', {}).get('bodySize', 0) / 1024
+        return dict(stats)
+
+    def performance():
+        # haralyzer's HarPage exposed one property (and one scan) per timing phase
+        return {f'{phase}_time_ms': sum(e['timings'][phase] for e in entries
+                                        if e.get('timings', {}).get(phase, -1) > 0)
+                for phase in har_analyzer.TIMING_PHASES}
+
+    result = {
+        'summary': {'total_requests': len(entries),
+                    'total_size_kb': sum(e.get('response', {}).get('bodySize', 0) for e in entries) / 1024,
+                    'total_duration_ms': sum(e.get('time', 0) for e in entries)},
+        'performance': performance(),
+        'errors': errors(),
+        'slow_requests': slow(),
+        'failed_requests': [{'url': e.get('request', {}).get('url', 'unknown'),
+                             'method': e.get('request', {}).get('method', 'unknown'),
+                             'status': e.get('response', {}).get('status', 0),
+                             'error': e.get('response', {}).get('statusText', 'Unknown error'),
+                             'time': e.get('startedDateTime')}
+                            for e in entries
+                            if e.get('response', {}).get('status', 0) == 0
+                            or e.get('response', {}).get('status', 0) >= 400],
+        'resource_breakdown': resources(),
+        'timing_waterfall': [dict(e.get('timings', {}), url=e.get('request', {}).get('url', 'unknown'))
+                             for e in entries[:20]],
+    }
+    # generate_recommendations() used to re-run these sections
+    performance()
+    slow()
+    errors()
+    return result
+
+
+def store_sections(store, pages: list) -> dict:
+    """The sections of multi_pass_analysis() computed from a columnar entry store"""
+    urls, status_texts = store.urls, store.status_texts
+    error_indices = store.error_indices()
+    counts = defaultdict(int)
+    for i in error_indices:
+        counts[har_analyzer._classify_error(store.status[i])] += 1
+    resources = defaultdict(lambda: {'count': 0, 'size_kb': 0})
+    for mime_type, count, size in zip(store.mime_types.values, *store.mime_totals()):
+        stats = resources[har_analyzer._get_resource_type(mime_type)]
+        stats['count'] += count
+        stats['size_kb'] += size / 1024
+    return {
+        'summary': {'total_requests': len(store), 'total_size_kb': sum(store.body_size) / 1024,
+                    'total_duration_ms': sum(store.time)},
+        'performance': har_analyzer._page_performance(store, pages),
+        'errors': {'total_errors': len(error_indices), 'error_breakdown': dict(counts),
+                   'errors': [{'url': urls[store.url[i]], 'status': store.status[i],
+                               'status_text': status_texts[store.status_text[i]] or '',
+                               'type': har_analyzer._classify_error(store.status[i]),
+                               'time': store.started[i]} for i in error_indices[:10]]},
+        'slow_requests': har_analyzer.slow_request_rows(store, 1000),
+        'failed_requests': [{'url': urls[store.url[i]], 'status': store.status[i]}
+                            for i in store.failed_indices()],
+        'resource_breakdown': dict(resources),
+        'timing_waterfall': har_analyzer.waterfall_rows(store, 20),
+    }
+
+
+def store_size_bytes(store) -> int:
+    """Approximate memory held by a HarEntryStore"""
+    columns = [store.status, store.time, store.body_size, store.url, store.method,
+               store.mime, store.status_text, store.pageref, *store.timings.values(),
+               store.headers_size, store.content_size, store.compression, store.transfer_size,
+               store.encoding, store.server_ip, store.connection]
+    size = sum(c.buffer_info()[1] * c.itemsize for c in columns)
+    # Start times and host ids are cached on the store by the first analysis
+    columns += [column for column in (store._start_ms, store._host_ids) if column is not None]
+    size = sum(c.buffer_info()[1] * c.itemsize for c in columns)
+    size += sys.getsizeof(store.started) + sum(sys.getsizeof(s) for s in store.started if s)
+    tables = [store.urls, store.methods, store.mime_types, store.status_texts, store.pagerefs,
+              store.encodings, store.server_ips, store.connections]
+    if store._host_ids is not None:
+        tables.append(store.hosts)
+        size += sys.getsizeof(store._url_hosts)
+    for table in tables:
+        size += sum(sys.getsizeof(v) for v in table.values)
+    return size
+
+
+def best_of(runs: int, func, *args) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    entry_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Building synthetic HAR with {entry_count:,} entries...")
+    har = build_synthetic_har(entry_count)
+
+    log = har['log']
+    entries, pages = log['entries'], log['pages']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        har_path = Path(tmp) / 'synthetic.har'
+        har_path.write_text(json.dumps(har))
+        analyzer = har_analyzer.KatalonHarAnalyzer(str(har_path))
+
+    def full_analysis():
+        analyzer._har_data = har
+        analyzer._store = None
+        analyzer._values = {}
+        analyzer._histograms = None
+        analyzer._with_transfer = False
+        analyzer.analyze()
+
+    def parse_start_times(store):
+        store._start_ms = None
+        store.start_times()
+
+    # Interleaved, so machine load affects the reference and the store path alike
+    multi = decode = full = float('inf')
+    for _ in range(5):
+        multi = min(multi, best_of(1, multi_pass_analysis, entries))
+        decode = min(decode, best_of(1, har_analyzer.HarEntryStore.from_entries, entries, False))
+        full = min(full, best_of(1, full_analysis))
+
+    store = analyzer.store
+    # Start times are parsed on first use; count them as decoding
+    parse = best_of(3, parse_start_times, store)
+    columnar = best_of(3, store_sections, store, pages)
+    store_path = decode + parse + columnar
+    transfer = best_of(3, har_analyzer.HarEntryStore.from_entries, entries) - decode
+    transfer_store = har_analyzer.HarEntryStore.from_entries(entries)
+    store_kb = store_size_bytes(store) / 1024
+    on_request = [
+        ('timeline', lambda: har_analyzer.timeline(store)),
+        ('network', lambda: har_analyzer.network_efficiency(transfer_store)),
+        ('endpoints', lambda: har_analyzer.endpoint_rows(store)),
+        ('latency histograms', lambda: har_analyzer.latency_histograms(store)),
+    ]
+
+    print(f"Legacy sections, one scan each:   {multi * 1000:8.1f} ms")
+    print(f"Decode entries into the store:    {(decode + parse) * 1000:8.1f} ms  (shared by every section)")
+    print(f"Legacy sections from the store:   {columnar * 1000:8.1f} ms  "
+          f"({multi / columnar:.2f}x, {multi / store_path:.2f}x with decoding)")
+    print(f"Default analyze(), decode included: {full * 1000:6.1f} ms  ({multi / full:.2f}x)")
+    print("On request:")
+    print(f"  {'transfer columns:':20s}           {transfer * 1000:8.1f} ms  (decoded for network only)")
+    for name, func in on_request:
+        print(f"  {name + ':':20s}           {best_of(3, func) * 1000:8.1f} ms")
+    print(f"Entry store footprint after analyze(): {store_kb:8.0f} KB "
+          f"({store_kb * 1024 / entry_count:.0f} bytes/entry)")
+
+    assert store_path <= multi, (f"store path ({store_path * 1000:.1f} ms with decoding) is slower than "
+                                 f"one scan per section ({multi * 1000:.1f} ms)")
+    assert full <= multi, (f"analyze() ({full * 1000:.1f} ms) is slower than "
+                           f"one scan per section ({multi * 1000:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
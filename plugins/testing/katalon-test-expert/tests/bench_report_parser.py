@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Katalon Report Parser artifact discovery and test history
+Compares the previous one-recursive-glob-per-lookup discovery against the
+single os.scandir walk (ReportFileIndex) on a synthetic report tree with
+50k files, full parse() against a summary-only parse of that tree, and times TestHistory.analyze() on 100k test case results
+against a per-test scan over result dicts.
+
+Usage:
+    python3 tests/bench_report_parser.py [file-count] [history-rows]
+"""
+
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import importlib.util
+spec = importlib.util.spec_from_file_location(
+    "katalon_report_parser",
+    str(Path(__file__).parent.parent / 'scripts' / 'katalon-report-parser.py')
+)
+katalon_report_parser = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(katalon_report_parser)
+
+# Share of each artifact type in a long Katalon run: mostly screenshots
+FILE_MIX = [('.png', 80), ('.har', 8), ('.log', 4), ('.json', 3), ('.html', 2), ('.mp4', 1), ('.txt', 2)]
+FILES_PER_DIRECTORY = 100
+HISTORY_TESTS = 500
+
+
+def build_report_tree(root: Path, file_count: int):
+    """Create a nested report folder with file_count small files"""
+    suffixes = [suffix for suffix, weight in FILE_MIX for _ in range(weight)]
+    root.mkdir(parents=True, exist_ok=True)
+    (root / 'JUnit_Report.xml').write_text('<testsuites name="bench" tests="0"/>')
+    (root / 'execution0.log').write_text('')
+    for n in range(file_count):
+        directory = root / f'suite_{n // 5000}' / f'case_{n // FILES_PER_DIRECTORY}'
+        if n % FILES_PER_DIRECTORY == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        (directory / f'artifact_{n}{suffixes[n % len(suffixes)]}').touch()
+
+
+def legacy_discovery(folder: Path) -> dict:
+    """The previous lookups: one recursive glob per file type, some repeated"""
+    junit = list(folder.glob('**/JUnit_Report.xml'))
+    execution = list(folder.glob('**/execution*.json'))
+    suites = list(folder.glob('**/*.html'))
+    videos = list(folder.glob('**/*.mp4')) + list(folder.glob('**/*.webm'))
+    artifacts = {
+        'screenshots': [str(f) for f in folder.glob('**/*.png')],
+        'videos': [str(f) for f in videos],
+        'har_files': [str(f) for f in folder.glob('**/*.har')],
+        'logs': [str(f) for f in folder.glob('**/*.log')]
+    }
+    # extract_session_urls() globbed again
+    junit = list(folder.glob('**/JUnit_Report.xml'))
+    logs = list(folder.glob('**/*.log'))
+    reports = [list(folder.glob(f'**/*.{ext}')) for ext in ('html', 'pdf', 'csv')]
+    return {'junit': junit, 'execution': execution, 'suites': suites, 'artifacts': artifacts,
+            'logs': logs, 'reports': reports}
+
+
+def indexed_discovery(folder: Path) -> dict:
+    """The same lookups served by one ReportFileIndex walk"""
+    parser = katalon_report_parser.KatalonReportParser(str(folder))
+    files = parser.files
+    return {'junit': files.named('JUnit_Report.xml'), 'execution': files.matching('execution*.json'),
+            'suites': files.with_suffix('.html'), 'artifacts': parser.find_artifacts(),
+            'logs': files.with_suffix('.log'),
+            'reports': [files.with_suffix(f'.{ext}') for ext in ('html', 'pdf', 'csv')]}
+
+
+def build_history_rows(row_count: int, seed: int = 7) -> list:
+    """Result dicts for row_count // HISTORY_TESTS runs of HISTORY_TESTS tests, oldest run first"""
+    rng = random.Random(seed)
+    run_count = max(1, row_count // HISTORY_TESTS)
+    rows = []
+    for run in range(run_count):
+        for test in range(HISTORY_TESTS):
+            flaky = test % 50 == 0 and rng.random() < 0.3
+            slower = test % 100 == 1 and run > run_count * 2 // 3
+            rows.append({'run': f'run-{run:05d}', 'name': f'Test Cases/suite/test_{test}',
+                         'status': 'FAILED' if flaky else 'PASSED',
+                         'time': 2 + test % 7 + (3 if slower else 0) + rng.gauss(0, 0.1)})
+    return rows
+
+
+def dict_walk_trends(rows: list) -> dict:
+    """Per-test queries that re-walk every result dict: flip rate, mean and stddev"""
+    result = {}
+    for name in {row['name'] for row in rows}:
+        history = [row for row in rows if row['name'] == name]
+        outcomes = [row['status'] != 'PASSED' for row in history]
+        durations = [row['time'] for row in history if row['status'] == 'PASSED']
+        result[name] = {
+            'flips': sum(1 for a, b in zip(outcomes, outcomes[1:]) if a != b),
+            'mean': statistics.mean(durations) if durations else None,
+            'stddev': statistics.pstdev(durations) if durations else None
+        }
+    return result
+
+
+def columnar_trends(rows: list) -> dict:
+    """The same rows loaded into a TestHistory and analyzed in one grouped pass"""
+    history = katalon_report_parser.TestHistory()
+    current = None
+    for row in rows:
+        if row['run'] != current:
+            current = row['run']
+            history.start_run(current)
+        history.add(row['name'], row['status'], row['time'])
+    return history.analyze()
+
+
+def best_of(runs: int, func, *args) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / 'Reports'
+        print(f"Building report tree with {file_count:,} files...")
+        build_report_tree(root, file_count)
+
+        legacy = legacy_discovery(root)
+        indexed = indexed_discovery(root)
+        for kind in legacy['artifacts']:
+            assert sorted(legacy['artifacts'][kind]) == sorted(indexed['artifacts'][kind]), kind
+
+        legacy_time = best_of(3, legacy_discovery, root)
+        indexed_time = best_of(3, indexed_discovery, root)
+
+        def full_parse():
+            katalon_report_parser.KatalonReportParser(str(root)).parse()
+
+        def summary_parse():
+            katalon_report_parser.KatalonReportParser(str(root)).parse(sections=['summary'])
+
+        full_time = best_of(3, full_parse)
+        summary_time = best_of(3, summary_parse)
+
+    print(f"Recursive glob per lookup: {legacy_time * 1000:8.1f} ms")
+    print(f"Single scandir walk:       {indexed_time * 1000:8.1f} ms  ({legacy_time / indexed_time:.1f}x)")
+    print(f"Full parse():              {full_time * 1000:8.1f} ms")
+    print(f"parse(sections=['summary']): {summary_time * 1000:6.1f} ms  ({full_time / summary_time:.0f}x)")
+
+    row_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    rows = build_history_rows(row_count)
+    trends = columnar_trends(rows)
+    dict_time = best_of(1, dict_walk_trends, rows)
+    columnar_time = best_of(3, columnar_trends, rows)
+    print(f"\nTest history with {len(rows):,} results ({len(trends['flaky'])} flaky, "
+          f"{len(trends['regressing'])} regressing):")
+    print(f"Per-test dict walks:       {dict_time * 1000:8.1f} ms")
+    print(f"TestHistory load+analyze:  {columnar_time * 1000:8.1f} ms  ({dict_time / columnar_time:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
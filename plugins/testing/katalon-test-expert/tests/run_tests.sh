@@ -37,7 +37,7 @@ echo -e "${BLUE}Running unit tests...${NC}"
 echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
 cd "$SCRIPT_DIR"
 
-if python3 test_katalon_parser.py; then
+if python3 -m unittest discover -s . -p "test_*.py" -v; then
     echo ""
     echo -e "${GREEN}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
     echo -e "${GREEN}✓ All tests passed!${NC}"
@@ -0,0 +1,729 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Katalon HAR Analyzer
+Tests the store-backed analysis sections against sample and generated HAR files
+"""
+
+import unittest
+import os
+import sys
+import json
+import math
+import tempfile
+import shutil
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+# Import by running the script module (exits if haralyzer is missing)
+import importlib.util
+spec = importlib.util.spec_from_file_location(
+    "har_analyzer",
+    str(Path(__file__).parent.parent / 'scripts' / 'har-analyzer.py')
+)
+har_analyzer = importlib.util.module_from_spec(spec)
+# Registered so batch-mode worker functions can be pickled by module name
+sys.modules['har_analyzer'] = har_analyzer
+try:
+    spec.loader.exec_module(har_analyzer)
+    HARALYZER_AVAILABLE = True
+except SystemExit:
+    HARALYZER_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+
+def make_entry(url, status=200, time_ms=100, body_size=1024, mime_type='application/json',
+               started='2025-09-24T16:52:13.278Z', method='GET', pageref='page_1', timings=None):
+    """Build a minimal HAR entry"""
+    return {
+        'pageref': pageref,
+        'startedDateTime': started,
+        'time': time_ms,
+        'request': {'method': method, 'url': url},
+        'response': {
+            'status': status,
+            'statusText': 'Unauthorized' if status == 401 else '',
+            'bodySize': body_size,
+            'content': {'size': body_size, 'mimeType': mime_type}
+        },
+        'timings': timings or {'blocked': -1, 'dns': 10, 'connect': 20, 'ssl': 5,
+                               'send': 1, 'wait': time_ms - 37, 'receive': 1}
+    }
+
+
+def write_har(path, entries, pages=None):
+    path.write_text(json.dumps({'log': {'version': '1.2', 'pages': pages or [], 'entries': entries}}))
+    return path
+
+
+@unittest.skipUnless(HARALYZER_AVAILABLE, "haralyzer not installed")
+class TestKatalonHarAnalyzer(unittest.TestCase):
+    """Test suite for Katalon HAR Analyzer"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up test fixtures"""
+        cls.sample_har = (Path(__file__).parent.parent / 'resources' / '401ErrorReportDir'
+                          / 'requests' / 'main' / 'Get-Quote-Data_0.har')
+        cls.temp_dir = Path(tempfile.mkdtemp())
+
+        entries = [
+            make_entry('https://api.example.com/api/quotes/1', time_ms=120),
+            make_entry('https://api.example.com/api/quotes/2', status=500, time_ms=2500),
+            make_entry('https://cdn.example.com/app.css', mime_type='text/css', time_ms=1500),
+            make_entry('https://api.example.com/api/login', status=401, time_ms=80, method='POST'),
+            make_entry('https://api.example.com/api/ping', status=0, time_ms=0, body_size=0),
+        ]
+        pages = [{'id': 'page_1', 'startedDateTime': '2025-09-24T16:52:00.000Z',
+                  'pageTimings': {'onContentLoad': 1800, 'onLoad': 3500}}]
+        cls.generated_har = write_har(cls.temp_dir / 'generated.har', entries, pages)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test fixtures"""
+        if cls.temp_dir.exists():
+            shutil.rmtree(cls.temp_dir)
+
+    def test_invalid_file(self):
+        """Test analyzer raises error for missing HAR file"""
+        with self.assertRaises(FileNotFoundError):
+            har_analyzer.KatalonHarAnalyzer("/nonexistent/file.har")
+
+    def test_sample_har_analysis(self):
+        """Test analysis of the sample 401 HAR file"""
+        analysis = har_analyzer.KatalonHarAnalyzer(str(self.sample_har)).analyze()
+
+        self.assertEqual(analysis['summary']['total_requests'], 1)
+        self.assertEqual(analysis['summary']['total_duration_ms'], 473)
+        self.assertEqual(analysis['summary']['timestamp'], '2025-09-24T16:52:13.278Z')
+        self.assertEqual(analysis['errors']['total_errors'], 1)
+        self.assertEqual(analysis['errors']['error_breakdown'], {'Client Error': 1})
+        self.assertEqual(analysis['performance'], {})
+        self.assertEqual(len(analysis['failed_requests']), 1)
+        self.assertEqual(analysis['failed_requests'][0]['status'], 401)
+
+    def test_all_sections_present(self):
+        """Test analyze() returns the default sections, and every section on request"""
+        analyzer = har_analyzer.KatalonHarAnalyzer(str(self.generated_har))
+        self.assertEqual(list(analyzer.analyze()), list(har_analyzer.ANALYZE_SECTIONS) + ['recommendations'])
+        analysis = analyzer.analyze(sections=har_analyzer.HAR_SECTIONS)
+        for section in ['summary', 'performance', 'errors', 'slow_requests', 'failed_requests',
+                        'resource_breakdown', 'timing_waterfall', 'latency', 'endpoints', 'timeline',
+                        'network', 'recommendations']:
+            self.assertIn(section, analysis)
+
+    def test_lazy_report_memoizes_accessed_sections(self):
+        """Test sections are computed on first access only and unknown ones are rejected"""
+        analyzer = har_analyzer.KatalonHarAnalyzer(str(self.generated_har))
+        report = analyzer.report()
+        self.assertEqual(list(report), list(har_analyzer.ANALYZE_SECTIONS))
+        self.assertEqual(report.computed, [])
+
+        errors = report['errors']
+        self.assertEqual(report.computed, ['errors'])
+        self.assertIs(report['errors'], errors)
+        self.assertEqual(report.get('latency', 'absent'), 'absent')
+        self.assertIsNone(analyzer._histograms)
+
+        analysis = analyzer.analyze(sections=['latency', 'errors'])
+        self.assertEqual(list(analysis), ['latency', 'errors', 'recommendations'])
+        self.assertIs(analysis['errors'], errors)
+        with self.assertRaises(ValueError):
+            analyzer.analyze(sections=['summary', 'latencies'])
+
+    def test_single_pass_sections(self):
+        """Test section values computed from the entry store"""
+        analysis = har_analyzer.KatalonHarAnalyzer(str(self.generated_har)).analyze()
+
+        self.assertEqual(analysis['summary']['total_requests'], 5)
+        self.assertEqual(analysis['summary']['pages'], 1)
+        self.assertEqual(analysis['errors']['total_errors'], 2)
+        self.assertEqual(analysis['errors']['error_breakdown'], {'Server Error': 1, 'Client Error': 1})
+        self.assertEqual(len(analysis['failed_requests']), 3)
+
+        slow = analysis['slow_requests']
+        self.assertEqual([r['time_ms'] for r in slow], [2500, 1500])
+        self.assertEqual(analysis['resource_breakdown']['CSS']['count'], 1)
+        self.assertEqual(analysis['resource_breakdown']['JavaScript']['count'], 4)
+        self.assertEqual(len(analysis['timing_waterfall']), 5)
+
+    def test_page_performance(self):
+        """Test first-page performance metrics"""
+        perf = har_analyzer.KatalonHarAnalyzer(str(self.generated_har)).analyze_performance()
+
+        self.assertEqual(perf['page_load_time_ms'], 3500)
+        self.assertEqual(perf['on_content_load_ms'], 1800)
+        self.assertEqual(perf['dns_time_ms'], 50)
+        self.assertEqual(perf['connect_time_ms'], 100)
+
+    def test_custom_slow_threshold(self):
+        """Test find_slow_requests honours a non-default threshold"""
+        analyzer = har_analyzer.KatalonHarAnalyzer(str(self.generated_har))
+        self.assertEqual(len(analyzer.find_slow_requests()), 2)
+        self.assertEqual(len(analyzer.find_slow_requests(threshold_ms=100)), 3)
+
+    def test_entry_store_columns(self):
+        """Test entries are decoded once into typed columns and interned tables"""
+        store = har_analyzer.KatalonHarAnalyzer(str(self.generated_har)).store
+
+        self.assertEqual(len(store), 5)
+        self.assertEqual(list(store.status), [200, 500, 200, 401, 0])
+        self.assertEqual(store.time[1], 2500)
+        self.assertEqual(store.timings['dns'][0], 10)
+        self.assertEqual(store.timings['blocked'][0], -1)
+        self.assertEqual(len(store.methods), 2)
+        self.assertEqual(store.methods[store.method[3]], 'POST')
+        self.assertEqual(store.mime_types[store.mime[2]], 'text/css')
+        self.assertEqual(store.slow_indices(1000), [1, 2])
+        self.assertEqual(store.phase_total('connect', 'page_1'), 100)
+
+    def test_entry_store_null_timings(self):
+        """Test explicit null timing values are stored as -1"""
+        entries = [make_entry('https://api.example.com/a'), make_entry('https://api.example.com/b')]
+        entries[1]['timings']['dns'] = None
+        store = har_analyzer.HarEntryStore.from_entries(entries)
+
+        self.assertEqual(list(store.timings['dns']), [10, -1])
+        self.assertEqual(store.urls.get_id('https://api.example.com/b'), 1)
+
+    def test_transfer_columns_decoded_on_request(self):
+        """Test the default analysis skips the transfer columns and network adds them from the file"""
+        analyzer = har_analyzer.KatalonHarAnalyzer(str(self.generated_har))
+        analyzer.analyze()
+        self.assertFalse(analyzer.store.transfer)
+        self.assertEqual(len(analyzer.store.headers_size), 0)
+
+        network = analyzer.analyze_network()
+        self.assertTrue(analyzer.store.transfer)
+        self.assertEqual(len(analyzer.store.connection), 5)
+        expected = har_analyzer.KatalonHarAnalyzer(str(self.generated_har)).analyze(sections=['network'])
+        self.assertEqual(network, expected['network'])
+
+    def test_start_times_fallback_matches_bulk_parse(self):
+        """Test start times are the same whether or not another entry forces the per-value parse"""
+        started = ['2025-09-24T16:52:00.250Z', '2025-09-24T18:52:00.250+02:00', '2025-09-24T11:52:00.250-0500']
+        entries = [make_entry('https://api.example.com/a', started=value) for value in started]
+        bulk = har_analyzer.HarEntryStore.from_entries(entries, transfer=False).start_times()
+        self.assertEqual(list(bulk), [1758732720250.0] * 3)
+
+        entries += [make_entry('https://api.example.com/b', started=value)
+                    for value in (None, 'garbage', '2025-09-24T16:52:00.250')]
+        mixed = har_analyzer.HarEntryStore.from_entries(entries, transfer=False).start_times()
+        self.assertEqual(list(mixed[:3]), list(bulk))
+        self.assertTrue(math.isnan(mixed[3]) and math.isnan(mixed[4]))
+        self.assertEqual(mixed[5], 1758732720250.0)
+
+    def test_document_released_after_decode(self):
+        """Test the parsed document is dropped once the store is built, yet still readable, and the store is reused"""
+        analyzer = har_analyzer.KatalonHarAnalyzer(str(self.generated_har))
+        analysis = analyzer.analyze()
+        self.assertIsNone(analyzer._har_data)
+        # The public document attributes still work, read back from disk
+        self.assertEqual(len(analyzer.har_data['log']['entries']), 5)
+        self.assertEqual(len(analyzer.pages), 1)
+
+        records = list(analyzer.iter_records())
+        self.assertEqual([record['record'] for record in records].count('request'), 5)
+        self.assertEqual([record['record'] for record in records].count('error'), 3)
+        self.assertEqual(records[-1]['summary'], analysis['summary'])
+
+    def test_epoch_ms(self):
+        """Test startedDateTime parsing, including the cached-prefix fast path"""
+        epoch_ms = har_analyzer._epoch_ms
+        expected = 1758732720250.0  # 2025-09-24T16:52:00.250Z
+        self.assertEqual(epoch_ms('2025-09-24T16:52:00.250Z'), expected)
+        self.assertEqual(epoch_ms('2025-09-24T16:52:00.250Z'), expected)
+        self.assertEqual(epoch_ms('2025-09-24T16:52:07Z'), expected + 6750)
+        self.assertEqual(epoch_ms('2025-09-24T18:52:00.250+02:00'), expected)
+        self.assertEqual(epoch_ms('2025-09-24T18:52:00.250+02:00'), expected)
+        self.assertEqual(epoch_ms('2025-09-24T11:52:00.250-0500'), expected)
+        self.assertTrue(math.isnan(epoch_ms('2025-09-24T16:52:x0.250Z')))
+        self.assertTrue(math.isnan(epoch_ms('2025-09-24T16:52:00.Z')))
+        self.assertTrue(math.isnan(epoch_ms(None)))
+
+    def test_latency_percentiles(self):
+        """Test per-phase latency percentiles overall, per host and per resource type"""
+        latency = har_analyzer.KatalonHarAnalyzer(str(self.generated_har)).analyze(sections=['latency'])['latency']
+
+        self.assertEqual(set(latency['overall']), {'dns', 'connect', 'ssl', 'send', 'wait', 'receive', 'total'})
+        self.assertEqual(latency['overall']['total']['count'], 5)
+        self.assertEqual(latency['overall']['total']['max'], 2500)
+        self.assertAlmostEqual(latency['overall']['total']['p50'], 120, delta=120 * 0.02)
+        self.assertIn('api.example.com', latency['by_host'])
+        self.assertEqual(latency['by_host']['cdn.example.com']['total']['count'], 1)
+        self.assertEqual(latency['by_resource_type']['CSS']['total']['count'], 1)
+
+    def test_latency_breakdown_exact_bounds(self):
+        """Test per-host and per-type minimum and maximum are the observed values"""
+        store = har_analyzer.HarEntryStore.from_entries([
+            make_entry('https://a.example.com/1', time_ms=120),
+            make_entry('https://a.example.com/2', time_ms=100),
+            make_entry('https://b.example.com/3', time_ms=900, mime_type='text/css'),
+        ])
+        histograms = har_analyzer.latency_histograms(store)
+
+        total = histograms['by_host']['a.example.com']['total']
+        self.assertEqual((total.min, total.max), (100, 120))
+        self.assertEqual(total.summary()['max'], 120)
+        css = histograms['by_resource_type']['CSS']['total']
+        self.assertEqual((css.min, css.max), (900, 900))
+        self.assertEqual((histograms['overall']['total'].min, histograms['overall']['total'].max), (100, 900))
+
+    def test_endpoint_aggregation(self):
+        """Test requests are grouped per method and endpoint template"""
+        endpoints = har_analyzer.KatalonHarAnalyzer(str(self.generated_har)).analyze_endpoints()
+
+        quotes = endpoints[0]
+        self.assertEqual((quotes['method'], quotes['endpoint']), ('GET', 'api.example.com/api/quotes/{id}'))
+        self.assertEqual(quotes['count'], 2)
+        self.assertEqual(quotes['errors'], 1)
+        self.assertEqual(quotes['error_rate'], 0.5)
+        self.assertEqual(quotes['total_time_ms'], 2620)
+        self.assertEqual(quotes['total_size_kb'], 2)
+        self.assertEqual(quotes['latency']['max'], 2500)
+        self.assertEqual(quotes['time_share'], round(2620 / 4200, 4))
+        self.assertEqual(len(endpoints), 4)
+        self.assertEqual(endpoints[-1]['endpoint'], 'api.example.com/api/ping')
+
+    def test_normalize_url(self):
+        """Test ID-like path segments are templated and volatile params dropped"""
+        cases = {
+            'https://api.example.com/api/user/123?t=169&page=2&_=1': 'api.example.com/api/user/{id}?page',
+            'https://API.example.com/u/550e8400-e29b-41d4-a716-446655440000/x': 'api.example.com/u/{uuid}/x',
+            'https://baseiso.example.com/api/quotes/689afe8cedf7e': 'baseiso.example.com/api/quotes/{hash}',
+            'https://cdn.example.com/static/app.3f9a8b7c6d.js#top': 'cdn.example.com/static/app.{hash}.js',
+            'https://api.example.com/v2/s/eyJhbGciOiJIUzI1NiIsInR5cCI6Ik1': 'api.example.com/v2/s/{token}',
+            'https://api.example.com': 'api.example.com/',
+        }
+        for url, expected in cases.items():
+            self.assertEqual(har_analyzer.normalize_url(url), expected)
+
+    def test_timeline_concurrency(self):
+        """Test wall clock, concurrency and critical path from overlapping requests"""
+        entries = [
+            make_entry('https://a.example.com/slow', time_ms=1000, started='2025-09-24T16:52:13.000Z'),
+            make_entry('https://a.example.com/fast', time_ms=400, started='2025-09-24T16:52:13.100Z'),
+            make_entry('https://b.example.com/next', time_ms=300, started='2025-09-24T18:52:14.200+02:00'),
+            make_entry('https://b.example.com/beacon', time_ms=0, started='2025-09-24T16:52:14.2Z'),
+            make_entry('https://b.example.com/unparseable', time_ms=50, started=None),
+        ]
+        store = har_analyzer.HarEntryStore.from_entries(entries)
+        timeline = har_analyzer.timeline(store)
+
+        self.assertEqual(timeline['wall_clock_ms'], 1500)
+        self.assertEqual(timeline['summed_request_time_ms'], 1700)
+        self.assertEqual(timeline['busy_ms'], 1300)
+        self.assertEqual(timeline['idle_ms'], 200)
+        self.assertEqual(timeline['peak_concurrency'], 2)
+        self.assertEqual(timeline['by_host']['a.example.com']['avg_concurrency'], 1.4)
+        self.assertEqual(timeline['by_host']['b.example.com']['peak_concurrency'], 2)
+
+        path = timeline['critical_path']
+        self.assertEqual([step['url'] for step in path['steps']],
+                         ['https://a.example.com/slow', 'https://b.example.com/next'])
+        self.assertEqual(path['steps'][1]['gap_before_ms'], 200)
+        self.assertEqual(path['gap_ms'], 200)
+
+        analysis = har_analyzer.KatalonHarAnalyzer(str(self.generated_har)).analyze()
+        self.assertEqual(analysis['summary']['wall_clock_ms'], 2500)
+        self.assertEqual(analysis['timing_waterfall'][0]['start_offset_ms'], 0)
+
+    def test_network_efficiency(self):
+        """Test connection reuse, compression savings, uncompressed text and duplicate downloads"""
+        reused = {'blocked': -1, 'dns': -1, 'connect': -1, 'ssl': -1, 'send': 1, 'wait': 50, 'receive': 5}
+        entries = [
+            make_entry('https://a.example.com/app.js', body_size=20000, mime_type='text/javascript'),
+            make_entry('https://a.example.com/app.js', body_size=20000, mime_type='text/javascript',
+                       timings=reused),
+            make_entry('https://a.example.com/api', body_size=3000, timings=reused),
+            make_entry('https://b.example.com/logo.png', body_size=50000, mime_type='image/png'),
+        ]
+        entries[0]['serverIPAddress'] = '10.0.0.1'
+        entries[0]['connection'] = '101'
+        entries[1]['connection'] = '101'
+        entries[2]['response']['content']['size'] = 12000
+        entries[2]['response']['headers'] = [{'name': 'Content-Encoding', 'value': 'gzip'}]
+        entries[3]['response']['_transferSize'] = 50300
+        network = har_analyzer.network_efficiency(har_analyzer.HarEntryStore.from_entries(entries))
+
+        host = network['by_host']['a.example.com']
+        self.assertEqual((host['requests'], host['new_connections'], host['reused_connections']), (3, 1, 2))
+        self.assertEqual(host['new_tls'], 1)
+        self.assertEqual(host['distinct_connections'], 1)
+        self.assertEqual(host['server_ips'], ['10.0.0.1'])
+        self.assertEqual(host['compression_saved_bytes'], 9000)
+        self.assertEqual(network['by_host']['b.example.com']['transfer_bytes'], 50300)
+
+        self.assertEqual([r['url'] for r in network['uncompressed_resources']],
+                         ['https://a.example.com/app.js'] * 2)
+        self.assertEqual(network['duplicate_downloads'],
+                         [{'url': 'https://a.example.com/app.js', 'count': 2, 'wasted_kb': 20000 / 1024}])
+        self.assertEqual(network['totals']['duplicate_download_bytes'], 20000)
+
+    def test_network_efficiency_without_timings(self):
+        """Test entries without timings count as unknown, not as reused connections"""
+        reused = {'blocked': -1, 'dns': -1, 'connect': -1, 'ssl': -1, 'send': 1, 'wait': 50, 'receive': 5}
+        entries = [
+            make_entry('https://a.example.com/api'),
+            make_entry('https://a.example.com/api', timings=reused),
+            make_entry('https://a.example.com/api'),
+            make_entry('https://b.example.com/api'),
+        ]
+        del entries[2]['timings']
+        del entries[3]['timings']
+        network = har_analyzer.network_efficiency(har_analyzer.HarEntryStore.from_entries(entries))
+
+        host = network['by_host']['a.example.com']
+        self.assertEqual((host['new_connections'], host['reused_connections'], host['unknown_connections']),
+                         (1, 1, 1))
+        self.assertEqual(host['reuse_rate'], 0.5)
+        self.assertIsNone(network['by_host']['b.example.com']['reuse_rate'])
+        self.assertEqual((network['totals']['reused_connections'], network['totals']['unknown_connections']),
+                         (1, 2))
+
+    def test_recommendations(self):
+        """Test recommendations read the computed sections"""
+        recommendations = har_analyzer.KatalonHarAnalyzer(str(self.generated_har)).generate_recommendations()
+
+        self.assertTrue(any('Page load time is 3500ms' in r for r in recommendations))
+        self.assertTrue(any('Found 2 slow requests' in r for r in recommendations))
+        self.assertTrue(any('Found 2 failed requests' in r for r in recommendations))
+
+
+@unittest.skipUnless(HARALYZER_AVAILABLE, "haralyzer not installed")
+class TestBatchAnalysis(unittest.TestCase):
+    """Test multi-HAR batch analysis"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = Path(tempfile.mkdtemp())
+        (cls.temp_dir / 'run1' / 'requests').mkdir(parents=True)
+        (cls.temp_dir / 'run2').mkdir()
+        write_har(cls.temp_dir / 'run1' / 'requests' / 'a.har', [
+            make_entry('https://api.example.com/api/quotes/1', time_ms=1200),
+            make_entry('https://api.example.com/api/quotes/2', status=500, time_ms=300),
+        ])
+        write_har(cls.temp_dir / 'run2' / 'b.har', [
+            make_entry('https://api.example.com/api/quotes/3', time_ms=3000),
+            make_entry('https://cdn.example.com/app.js', status=404, time_ms=50),
+            make_entry('https://cdn.example.com/app.css', status=401, time_ms=60),
+        ])
+        (cls.temp_dir / 'run2' / 'broken.har').write_text('not json')
+        (cls.temp_dir / 'run2' / 'notes.txt').write_text('ignored')
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.temp_dir.exists():
+            shutil.rmtree(cls.temp_dir)
+
+    def test_find_har_files(self):
+        """Test directories, globs and files expand to unique HAR paths"""
+        found = har_analyzer.find_har_files([
+            str(self.temp_dir),
+            str(self.temp_dir / '**' / 'a.har'),
+            str(self.temp_dir / 'run2' / 'b.har'),
+        ])
+        self.assertEqual([p.name for p in found], ['a.har', 'b.har', 'broken.har'])
+
+    def test_batch_merges_results(self):
+        """Test per-file results are merged into an aggregate report"""
+        batch = har_analyzer.analyze_batch([str(self.temp_dir)], workers=2, use_cache=False)
+        aggregate = batch['aggregate']
+
+        self.assertEqual(len(batch['files']), 3)
+        self.assertTrue(all('wall_time_s' in row for row in batch['files']))
+        self.assertEqual(aggregate['files_analyzed'], 2)
+        self.assertEqual(aggregate['files_failed'], 1)
+        self.assertEqual(aggregate['total_requests'], 5)
+        self.assertEqual(aggregate['error_breakdown'], {'Server Error': 1, 'Client Error': 2})
+        self.assertEqual([r['time_ms'] for r in aggregate['slowest_requests']], [3000, 1200])
+        self.assertEqual(Path(aggregate['slowest_requests'][0]['file']).name, 'b.har')
+        self.assertEqual(aggregate['latency']['overall']['total']['count'], 5)
+        self.assertEqual(aggregate['latency']['by_host']['cdn.example.com']['total']['count'], 2)
+
+
+@unittest.skipUnless(HARALYZER_AVAILABLE, "haralyzer not installed")
+class TestHarAnalysisCache(unittest.TestCase):
+    """Test the on-disk analysis result cache"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.cache = har_analyzer.HarAnalysisCache(self.temp_dir / 'cache')
+        self.har_path = write_har(self.temp_dir / 'run.har', [
+            make_entry('https://api.example.com/api/quotes/1', time_ms=1200),
+        ])
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_repeat_analysis_served_from_cache(self):
+        """Test a second analysis is read from the cache"""
+        first = har_analyzer.analyze_with_cache(str(self.har_path), cache=self.cache)
+        self.assertIsNotNone(self.cache.get(str(self.har_path)))
+
+        original = har_analyzer.KatalonHarAnalyzer
+        har_analyzer.KatalonHarAnalyzer = None  # would fail if analysis re-ran
+        try:
+            second = har_analyzer.analyze_with_cache(str(self.har_path), cache=self.cache)
+        finally:
+            har_analyzer.KatalonHarAnalyzer = original
+        self.assertEqual(first['analysis']['summary'], second['analysis']['summary'])
+
+    def test_changed_content_invalidates(self):
+        """Test rewriting the HAR produces a new key and a fresh analysis"""
+        har_analyzer.analyze_with_cache(str(self.har_path), cache=self.cache)
+        key = self.cache.key(str(self.har_path))
+
+        write_har(self.har_path, [make_entry('https://api.example.com/a'), make_entry('https://api.example.com/b')])
+        self.assertNotEqual(self.cache.key(str(self.har_path)), key)
+        payload = har_analyzer.analyze_with_cache(str(self.har_path), cache=self.cache)
+        self.assertEqual(payload['analysis']['summary']['total_requests'], 2)
+
+    def test_refresh_recomputes(self):
+        """Test refresh (--refresh) bypasses a stale cached result"""
+        har_analyzer.analyze_with_cache(str(self.har_path), cache=self.cache)
+        self.cache.put(str(self.har_path), {'analysis': {'stale': True}, 'histograms': {}})
+
+        payload = har_analyzer.analyze_with_cache(str(self.har_path), cache=self.cache, refresh=True)
+        self.assertIn('summary', payload['analysis'])
+        self.assertIn('summary', self.cache.get(str(self.har_path))['analysis'])
+
+    def test_sections_cached_separately(self):
+        """Test a section selection is cached under its own key, with histograms only for latency"""
+        payload = har_analyzer.analyze_with_cache(str(self.har_path), cache=self.cache, sections=['summary'])
+        self.assertEqual(list(payload['analysis']), ['summary', 'recommendations'])
+        self.assertNotIn('histograms', payload)
+        self.assertIsNone(self.cache.get(str(self.har_path)))
+        self.assertIsNotNone(self.cache.get(str(self.har_path), ('summary',)))
+
+        payload = har_analyzer.analyze_with_cache(str(self.har_path), cache=self.cache, sections=['summary', 'latency'])
+        self.assertIn('total', payload['histograms']['overall'])
+        self.assertEqual(payload['analysis']['latency']['overall']['total']['count'], 1)
+
+    def test_no_cache_neither_reads_nor_writes(self):
+        """Test cache=None (--no-cache) analyzes without touching the cache directory"""
+        payload = har_analyzer.analyze_with_cache(str(self.har_path), cache=None)
+        self.assertEqual(payload['analysis']['summary']['total_requests'], 1)
+        self.assertFalse((self.temp_dir / 'cache').exists())
+
+    def test_unwritable_cache_falls_back(self):
+        """Test an unwritable cache directory degrades to uncached analysis"""
+        blocker = self.temp_dir / 'blocker'
+        blocker.write_text('not a directory')
+        cache = har_analyzer.HarAnalysisCache(blocker / 'cache')
+
+        self.assertIsNone(cache.get(str(self.har_path)))
+        self.assertFalse(cache.put(str(self.har_path), {'analysis': {}, 'histograms': {}}))
+        payload = har_analyzer.analyze_with_cache(str(self.har_path), cache=cache)
+        self.assertEqual(payload['analysis']['summary']['total_requests'], 1)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entries are evicted beyond max_entries"""
+        cache = har_analyzer.HarAnalysisCache(self.temp_dir / 'small', max_entries=2)
+        paths = []
+        for i in range(3):
+            path = write_har(self.temp_dir / f'{i}.har', [make_entry(f'https://api.example.com/{i}')])
+            paths.append(str(path))
+            cache.put(path, {'analysis': {'n': i}, 'histograms': {}})
+            entry = cache.entries_dir / (cache.key(path) + '.json')
+            os.utime(entry, (1000 + i, 1000 + i))
+
+        cache.evict()
+        self.assertEqual(len(list(cache.entries_dir.glob('*.json'))), 2)
+        self.assertIsNone(cache.get(paths[0]))
+        self.assertEqual(cache.get(paths[2])['analysis']['n'], 2)
+
+
+@unittest.skipUnless(HARALYZER_AVAILABLE, "haralyzer not installed")
+class TestHarComparison(unittest.TestCase):
+    """Test baseline/candidate regression detection"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_run(self, name, quote_times, extra_urls=()):
+        entries = [make_entry(f'https://api.example.com/api/quotes/{i}', time_ms=t)
+                   for i, t in enumerate(quote_times)]
+        entries += [make_entry(f'https://api.example.com/api/users/{i}', time_ms=100 + i) for i in range(8)]
+        entries += [make_entry(url) for url in extra_urls]
+        return str(write_har(self.temp_dir / name, entries))
+
+    def test_detects_significant_regression(self):
+        """Test a consistently slower endpoint is a significant regression"""
+        baseline = self.write_run('base.har', [200 + i for i in range(10)], ['https://api.example.com/old'])
+        candidate = self.write_run('cand.har', [300 + i for i in range(10)], ['https://api.example.com/new/7'])
+        comparison = har_analyzer.compare_hars([baseline], [candidate])
+
+        self.assertFalse(comparison['passed'])
+        self.assertEqual(comparison['regressions'], ['GET api.example.com/api/quotes/{id}'])
+        quotes = comparison['endpoints'][0]['time']
+        self.assertEqual((quotes['baseline_p50'], quotes['candidate_p50']), (204.5, 304.5))
+        self.assertTrue(quotes['significant'])
+        self.assertLess(quotes['p_value'], 0.001)
+        self.assertEqual(comparison['new_endpoints'], ['GET api.example.com/new/{id}'])
+        self.assertEqual(comparison['removed_endpoints'], ['GET api.example.com/old'])
+
+    def test_endpoint_phase_regression(self):
+        """Test a regressed phase flags its endpoint even when the total time is unchanged"""
+        def run(name, wait, receive):
+            entries = [make_entry(f'https://api.example.com/api/quotes/{i}', time_ms=200 + i,
+                                  timings={'blocked': -1, 'dns': -1, 'connect': -1, 'ssl': -1,
+                                           'send': 0, 'wait': wait + i, 'receive': receive})
+                       for i in range(10)]
+            return str(write_har(self.temp_dir / name, entries))
+
+        comparison = har_analyzer.compare_hars([run('base.har', 50, 150)], [run('cand.har', 150, 50)])
+        quotes = comparison['endpoints'][0]
+
+        self.assertFalse(quotes['time']['regression'])
+        self.assertTrue(quotes['phases']['wait']['regression'])
+        self.assertTrue(quotes['regression'])
+        self.assertEqual(comparison['regressions'], ['GET api.example.com/api/quotes/{id}'])
+        self.assertFalse(comparison['passed'])
+
+    def test_thresholds_and_identical_runs(self):
+        """Test identical runs pass and thresholds are configurable"""
+        baseline = self.write_run('base.har', [200 + i for i in range(10)])
+        self.assertTrue(har_analyzer.compare_hars([baseline], [baseline])['passed'])
+
+        candidate = self.write_run('cand.har', [300 + i for i in range(10)])
+        comparison = har_analyzer.compare_hars([baseline], [candidate], {'latency_pct': 60})
+        self.assertTrue(comparison['passed'])
+
+    def test_small_samples_use_thresholds_only(self):
+        """Test endpoints with too few samples are judged by thresholds, untested"""
+        baseline = self.write_run('base.har', [200])
+        candidate = self.write_run('cand.har', [400])
+        quotes = har_analyzer.compare_hars([baseline], [candidate])['endpoints'][0]['time']
+
+        self.assertIsNone(quotes['p_value'])
+        self.assertTrue(quotes['regression'])
+
+    def test_mann_whitney(self):
+        """Test the Mann-Whitney p-value on separated and identical samples"""
+        self.assertLess(har_analyzer.mann_whitney_p(list(range(10)), list(range(100, 110))), 0.001)
+        self.assertEqual(har_analyzer.mann_whitney_p([5] * 6, [5] * 6), 1.0)
+        self.assertIsNone(har_analyzer.mann_whitney_p([1, 2], [3, 4]))
+
+
+@unittest.skipUnless(HARALYZER_AVAILABLE, "haralyzer not installed")
+class TestLatencyHistogram(unittest.TestCase):
+    """Test the mergeable latency histogram"""
+
+    def test_percentiles_within_relative_error(self):
+        """Test percentiles stay within the configured relative error"""
+        histogram = har_analyzer.LatencyHistogram()
+        values = list(range(1, 10001))
+        for value in values:
+            histogram.record(value)
+
+        for pct in (50, 90, 95, 99):
+            exact = values[int(len(values) * pct / 100) - 1]
+            self.assertAlmostEqual(histogram.percentile(pct), exact, delta=exact * 0.02)
+        self.assertEqual(histogram.summary()['max'], 10000)
+        self.assertEqual(histogram.count, 10000)
+
+    def test_zero_and_missing_values(self):
+        """Test zero samples are counted and negative (missing) samples ignored"""
+        histogram = har_analyzer.LatencyHistogram()
+        for value in [0, 0, 0, -1, 100]:
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.percentile(50), 0)
+        self.assertAlmostEqual(histogram.percentile(99), 100, delta=2)
+
+    def test_merge_and_round_trip(self):
+        """Test histograms merge and survive a to_dict/from_dict round trip"""
+        first, second = har_analyzer.LatencyHistogram(), har_analyzer.LatencyHistogram()
+        for value in range(1, 501):
+            first.record(value)
+        for value in range(501, 1001):
+            second.record(value)
+
+        merged = har_analyzer.LatencyHistogram.from_dict(json.loads(json.dumps(first.to_dict())))
+        merged.merge(second)
+        self.assertEqual(merged.count, 1000)
+        self.assertEqual(merged.min, 1)
+        self.assertEqual(merged.max, 1000)
+        self.assertAlmostEqual(merged.percentile(50), 500, delta=10)
+
+
+@unittest.skipUnless(HARALYZER_AVAILABLE and IJSON_AVAILABLE, "haralyzer or ijson not installed")
+class TestStreamingHarAnalyzer(unittest.TestCase):
+    """Test --stream mode matches the in-memory analysis"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = Path(tempfile.mkdtemp())
+        entries = []
+        for i in range(50):
+            entry = make_entry(f'https://api.example.com/api/quotes/{i}', status=500 if i % 7 == 0 else 200,
+                               time_ms=100 + i * 40)
+            entry['response']['content']['text'] = 'QUJD' * 2000
+            entry['response']['content']['encoding'] = 'base64'
+            entry['request']['postData'] = {'mimeType': 'application/json', 'text': '{"quote": %d}' % i}
+            entries.append(entry)
+        # Pages after entries are still picked up
+        har = {'log': {'version': '1.2', 'entries': entries,
+                       'pages': [{'id': 'page_1', 'startedDateTime': '2025-09-24T16:52:00.000Z',
+                                  'pageTimings': {'onContentLoad': 900, 'onLoad': 1900}}]}}
+        cls.har_path = cls.temp_dir / 'bodies.har'
+        cls.har_path.write_text(json.dumps(har))
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.temp_dir.exists():
+            shutil.rmtree(cls.temp_dir)
+
+    def test_stream_matches_in_memory(self):
+        """Test streaming analysis produces identical output"""
+        expected = har_analyzer.KatalonHarAnalyzer(str(self.har_path)).analyze()
+        actual = har_analyzer.KatalonHarAnalyzer(str(self.har_path), stream=True).analyze()
+        self.assertEqual(json.dumps(expected, default=str), json.dumps(actual, default=str))
+
+    def test_stream_drops_bodies(self):
+        """Test streamed entries have no response or request bodies"""
+        reader = har_analyzer.StreamingHarReader(self.har_path)
+        entries = list(reader.entries())
+
+        self.assertEqual(len(entries), 50)
+        self.assertEqual(len(reader.pages), 1)
+        for entry in entries:
+            self.assertNotIn('text', entry['response']['content'])
+            self.assertNotIn('text', entry['request']['postData'])
+            self.assertEqual(entry['response']['content']['encoding'], 'base64')
+
+    def test_ndjson_records(self):
+        """Test NDJSON output streams one record per request and error, then the summary"""
+        output = self.temp_dir / 'analysis.ndjson'
+        analyzer = har_analyzer.KatalonHarAnalyzer(str(self.har_path), stream=True)
+        with har_analyzer.NdjsonWriter(str(output), flush_every=7) as writer:
+            writer.write_all(analyzer.iter_records(chunk_size=16))
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+
+        self.assertEqual(records[0]['record'], 'header')
+        self.assertEqual(records[-1]['record'], 'summary')
+        requests = [record for record in records if record['record'] == 'request']
+        errors = [record for record in records if record['record'] == 'error']
+        self.assertEqual([record['index'] for record in requests], list(range(50)))
+        self.assertEqual([record['index'] for record in errors], list(range(0, 50, 7)))
+        self.assertEqual(requests[1]['timings']['dns'], 10)
+
+        expected = har_analyzer.KatalonHarAnalyzer(str(self.har_path)).analyze()
+        for name in har_analyzer.NDJSON_PER_REQUEST_SECTIONS:
+            expected.pop(name)
+        self.assertEqual(json.dumps(dict(expected, record='summary'), sort_keys=True, default=str),
+                         json.dumps(records[-1], sort_keys=True))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
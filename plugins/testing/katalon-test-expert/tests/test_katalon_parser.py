@@ -5,10 +5,15 @@ Tests report parsing, URL extraction, HAR analysis, and data structuring
 """
 
 import unittest
+from unittest import mock
+import contextlib
+import io
 import sys
 import json
+import os
 import tempfile
 import shutil
+import time
 from pathlib import Path
 
 # Add parent directory to path to import the parser
@@ -21,6 +26,8 @@ spec = importlib.util.spec_from_file_location(
     str(Path(__file__).parent.parent / 'scripts' / 'katalon-report-parser.py')
 )
 katalon_report_parser = importlib.util.module_from_spec(spec)
+# Registered so batch mode's process pool can pickle its worker functions
+sys.modules['katalon_report_parser'] = katalon_report_parser
 spec.loader.exec_module(katalon_report_parser)
 KatalonReportParser = katalon_report_parser.KatalonReportParser
 
@@ -173,6 +180,55 @@ class TestKatalonReportParser(unittest.TestCase):
         self.assertEqual(len(artifacts['videos']), 1)
         self.assertEqual(len(artifacts['har_files']), 2)
 
+    def test_file_index_single_walk(self):
+        """Test every lookup is served from one indexed walk of the folder"""
+        parser = KatalonReportParser(str(self.sample_report_dir))
+        parser.parse()
+        files = parser.files
+
+        self.assertIs(parser.files, files)
+        self.assertEqual(len(files.named('JUnit_Report.xml')), 1)
+        self.assertEqual(sorted(files.with_suffix('.har')), sorted(parser.find_artifacts()['har_files']))
+
+        expected = sorted(str(p) for p in self.sample_report_dir.glob('**/*') if p.is_file())
+        indexed = sorted(path for paths in files.by_suffix.values() for path in paths)
+        self.assertEqual(indexed, expected)
+        self.assertEqual(files.file_count, len(expected))
+
+    def test_streaming_junit_matches_tree_parse(self):
+        """Test the iterparse reader matches a full-tree parse"""
+        junit_file = next(self.sample_report_dir.glob('**/JUnit_Report.xml'))
+        root = katalon_report_parser.ET.parse(junit_file).getroot()
+        parser = KatalonReportParser(str(self.sample_report_dir))
+
+        self.assertEqual(parser.parse_junit_xml()['test_cases'], parser._parse_test_cases(root))
+        self.assertEqual(list(parser.iter_test_cases()), parser._parse_test_cases(root))
+
+    def test_streaming_junit_large_report(self):
+        """Test streaming a generated report with suite output and bounded stack traces"""
+        report_dir = self.temp_dir / 'streaming'
+        report_dir.mkdir()
+        cases = ''.join(f'<testcase name="t{i}" time="1"><failure message="m">{"at Step.run()" * 10}</failure>'
+                        f'<system-out>{"x" * 100}</system-out></testcase>' for i in range(50))
+        (report_dir / 'JUnit_Report.xml').write_text(
+            '<testsuites name="big" tests="50" failures="0" errors="0" time="50">'
+            '<testsuite name="s"><properties><property name="browser" value="Chrome"/></properties>'
+            f'{cases}<system-out>suite log</system-out></testsuite></testsuites>')
+
+        stream = katalon_report_parser.JUnitStreamParser(report_dir / 'JUnit_Report.xml')
+        self.assertEqual(sum(1 for _ in stream.test_cases()), 50)
+        self.assertEqual(stream.summary['total_tests'], 50)
+        self.assertEqual(stream.properties, {'browser': 'Chrome'})
+
+        result = KatalonReportParser(str(report_dir)).parse_junit_xml(stack_trace_limit=20)
+        self.assertEqual(result['suite_name'], 'big')
+        self.assertEqual(len(result['test_cases']), 50)
+        self.assertEqual(result['test_cases'][0]['stack_trace'], 'at Step.run()at Step... [truncated 110 chars]')
+
+        dropped = KatalonReportParser(str(report_dir)).parse_junit_xml(stack_trace_limit=0)
+        self.assertIsNone(dropped['test_cases'][0]['stack_trace'])
+        self.assertEqual(dropped['test_cases'][0]['status'], 'FAILED')
+
     def test_har_file_paths(self):
         """Test HAR files are in correct location"""
         parser = KatalonReportParser(str(self.sample_report_dir))
@@ -406,6 +462,497 @@ Test Case 1,PASSED,10.5,https://app.logrocket.com/test/project/s/csv-session-456
         )
 
 
+class TestSessionUrlScanner(unittest.TestCase):
+    """Test the single-pass multi-provider session URL scanner"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.providers = dict(katalon_report_parser.SESSION_URL_PROVIDERS)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        katalon_report_parser.SESSION_URL_PROVIDERS.clear()
+        katalon_report_parser.SESSION_URL_PROVIDERS.update(self.providers)
+
+    def test_extra_providers(self):
+        """Test built-in and registered providers are found in one scan"""
+        katalon_report_parser.register_session_provider(
+            'custom_url', 'Custom Grid', r'https://grid\.example\.com/session/[0-9a-f]+')
+        (self.temp_dir / 'JUnit_Report.xml').write_text('<testsuites name="s"/>')
+        (self.temp_dir / 'run.log').write_text(
+            'Sauce: https://app.saucelabs.com/tests/0123abcd\n'
+            'Grid: https://grid.example.com/session/beef01 BrowserStack '
+            'https://automate.browserstack.com/dashboard/v2/builds/abc/sessions/def\n')
+
+        urls = KatalonReportParser(str(self.temp_dir)).extract_session_urls()
+        self.assertEqual(urls, {
+            'browserstack_url': 'https://automate.browserstack.com/dashboard/v2/builds/abc/sessions/def',
+            'saucelabs_url': 'https://app.saucelabs.com/tests/0123abcd',
+            'custom_url': 'https://grid.example.com/session/beef01'
+        })
+
+    def test_first_match_per_provider_and_short_circuit(self):
+        """Test the earliest file wins and scanning stops once all providers are found"""
+        providers = {key: self.providers[key] for key in ('logrocket_url', 'device_farm_url')}
+        first = self.temp_dir / 'a.log'
+        first.write_text('https://us-east-1.console.aws.amazon.com/devicefarm/run/1 '
+                         'https://app.logrocket.com/org/app/s/first')
+        second = self.temp_dir / 'b.log'
+        second.write_text('https://app.logrocket.com/org/app/s/second')
+
+        scanner = katalon_report_parser.SessionUrlScanner(providers)
+        urls = scanner.scan([first, self.temp_dir / 'missing.log', second])
+        self.assertEqual(urls['logrocket_url'], 'https://app.logrocket.com/org/app/s/first')
+        self.assertTrue(scanner.done)
+
+    def test_chunked_scan_across_boundary(self):
+        """Test a URL split across read chunks is still matched whole"""
+        url = 'https://app.logrocket.com/dtizdl/portal/s/6-01997ca3/0?t=1758732696544'
+        data = ('x' * 90 + ' ' + url + ' trailing').encode()
+        original = katalon_report_parser.SCAN_CHUNK_BYTES
+        katalon_report_parser.SCAN_CHUNK_BYTES = 32
+        try:
+            scanner = katalon_report_parser.SessionUrlScanner()
+            scanner._scan_chunks(io.BytesIO(data))
+        finally:
+            katalon_report_parser.SCAN_CHUNK_BYTES = original
+        self.assertEqual(scanner.found, {'logrocket_url': url})
+
+
+class TestBatchParsing(unittest.TestCase):
+    """Test parallel parsing of many report folders into an aggregate"""
+
+    JUNIT = (
+        '<testsuites name="s" time="{total}" tests="2" failures="{failures}" errors="0">'
+        '<testsuite name="s" tests="2" failures="{failures}" errors="0" skipped="0" time="{total}"{timestamp}>'
+        '<testcase name="Test Cases/Login" time="{login}" status="PASSED"/>'
+        '<testcase name="Test Cases/Checkout" time="2.0" status="{status}">{failure}</testcase>'
+        '</testsuite></testsuites>'
+    )
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def make_report(self, relative, login='1.0', failed=False, timestamp=None):
+        folder = self.temp_dir / relative
+        folder.mkdir(parents=True)
+        (folder / 'JUnit_Report.xml').write_text(self.JUNIT.format(
+            total=float(login) + 2.0, login=login,
+            failures=int(failed), status='FAILED' if failed else 'PASSED',
+            failure='<failure message="Element not found&#10;at line 3"/>' if failed else '',
+            timestamp=f' timestamp="{timestamp}"' if timestamp else ''))
+        (folder / 'screenshot.png').touch()
+        (folder / 'execution0.log').write_text('https://app.logrocket.com/org/app/s/' + relative.replace('/', '-'))
+        return folder
+
+    def test_find_report_folders(self):
+        """Test report folders are discovered without descending into them"""
+        first = self.make_report('Reports/20250924_164932/Suite/20250924_164932')
+        self.make_report('Reports/20250924_164932/Suite/20250924_164932/nested')
+        second = self.make_report('Other/run')
+        (self.temp_dir / 'Reports' / 'empty').mkdir()
+
+        folders = katalon_report_parser.find_report_folders([str(self.temp_dir / 'Reports'), str(self.temp_dir)])
+        self.assertEqual(folders, sorted([first, second], key=str))
+
+    def test_batch_results_and_aggregate(self):
+        """Test per-folder JSON Lines and the pass rate, slowest tests and failure aggregate"""
+        self.make_report('Reports/20250924_100000/Suite/20250924_100000', login='1.0')
+        self.make_report('Reports/20250924_120000/Suite/20250924_120000', login='3.0', failed=True)
+        self.make_report('Reports/run', login='5.0', failed=True, timestamp='25-09-2025T08:15:00')
+        broken = self.temp_dir / 'Reports' / 'broken'
+        broken.mkdir()
+        (broken / 'JUnit_Report.xml').write_text('<testsuites')
+
+        output = io.StringIO()
+        aggregate = katalon_report_parser.parse_batch([str(self.temp_dir)], katalon_report_parser.NdjsonWriter(output),
+                                                      workers=2)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        self.assertEqual(len(records), 4)
+        by_folder = {Path(record['folder']).name: record for record in records}
+        self.assertIn('error', by_folder['broken'])
+        run = by_folder['run']
+        self.assertEqual(run['timestamp'], '2025-09-25T08:15:00')
+        self.assertEqual(run['passed'], 1)
+        self.assertEqual(run['artifacts']['screenshots'], 1)
+        self.assertEqual(run['session_urls']['logrocket_url'], 'https://app.logrocket.com/org/app/s/Reports-run')
+        self.assertEqual(by_folder['20250924_100000']['timestamp'], '2025-09-24T10:00:00')
+
+        self.assertEqual(aggregate['folders'], 4)
+        self.assertEqual(aggregate['runs'], 3)
+        self.assertEqual(len(aggregate['failed_folders']), 1)
+        self.assertEqual([(day['date'], day['passed'], day['tests']) for day in aggregate['pass_rate_over_time']],
+                         [('2025-09-24', 3, 4), ('2025-09-25', 1, 2)])
+        slowest = aggregate['slowest_test_cases'][0]
+        self.assertEqual((slowest['name'], slowest['mean_seconds'], slowest['max_seconds']),
+                         ('Test Cases/Login', 3.0, 5.0))
+        self.assertEqual(aggregate['top_failure_messages'], [
+            {'message': 'Element not found', 'count': 2, 'tests': ['Test Cases/Checkout']}])
+
+    def test_batch_command_writes_jsonl_only_when_asked(self):
+        """Test the batch command only writes the JSON Lines file when --jsonl is given"""
+        self.make_report('Reports/run')
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            for extra in ([], ['--jsonl', 'results.jsonl']):
+                argv = ['katalon-report-parser.py', 'batch', 'Reports', '--workers', '1', '--json', 'aggregate.json']
+                with mock.patch.object(sys, 'argv', argv + extra), contextlib.redirect_stdout(io.StringIO()):
+                    katalon_report_parser.main()
+                self.assertEqual(sorted(path.name for path in self.temp_dir.glob('*.json*')),
+                                 ['aggregate.json'] + ['results.jsonl'] * bool(extra))
+        finally:
+            os.chdir(cwd)
+
+
+class TestReportCatalog(unittest.TestCase):
+    """Test the incremental SQLite report catalog"""
+
+    JUNIT = TestBatchParsing.JUNIT
+    make_report = TestBatchParsing.make_report
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.catalog = katalon_report_parser.ReportCatalog(self.temp_dir / 'catalog.sqlite3')
+
+    def tearDown(self):
+        self.catalog.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_incremental_index(self):
+        """Test only new or changed folders are parsed and child rows are replaced on upsert"""
+        first = self.make_report('Reports/20250924_100000', failed=True)
+        self.make_report('Reports/20250925_100000')
+        (first / 'execution.uuid').write_text('uuid-1\n')
+
+        result = katalon_report_parser.index_reports([str(self.temp_dir / 'Reports')], self.catalog)
+        self.assertEqual((len(result['indexed']), result['unchanged']), (2, 0))
+        result = katalon_report_parser.index_reports([str(self.temp_dir / 'Reports')], self.catalog)
+        self.assertEqual((len(result['indexed']), result['unchanged']), (0, 2))
+
+        (first / 'execution.uuid').write_text('uuid-2\n')
+        result = katalon_report_parser.index_reports([str(self.temp_dir / 'Reports')], self.catalog)
+        self.assertEqual(result['indexed'], [str(first)])
+
+        db = self.catalog.connection
+        self.assertEqual(db.execute('SELECT COUNT(*) FROM executions').fetchone()[0], 2)
+        self.assertEqual(db.execute('SELECT COUNT(*) FROM test_cases').fetchone()[0], 4)
+        self.assertEqual(db.execute('SELECT execution_uuid, started_at, passed FROM executions '
+                                    'ORDER BY started_at').fetchall()[0],
+                         ('uuid-2', '2025-09-24T10:00:00', 1))
+        self.assertEqual(db.execute('SELECT test_name, kind, message FROM failures').fetchall(),
+                         [('Test Cases/Checkout', 'failure', 'Element not found\nat line 3')])
+        self.assertEqual(db.execute('SELECT COUNT(*) FROM artifacts WHERE kind = ?', ('screenshots',)).fetchone()[0], 2)
+        self.assertEqual(db.execute('SELECT COUNT(*) FROM session_urls').fetchone()[0], 2)
+
+    def test_slower_tests(self):
+        """Test the indexed trend query compares the newer half of recent runs against the older half"""
+        for day, login in enumerate(['1.0', '1.0', '1.2', '3.0', '3.2', '3.0'], 1):
+            self.make_report(f'Reports/202509{day:02d}_100000', login=login)
+        katalon_report_parser.index_reports([str(self.temp_dir / 'Reports')], self.catalog)
+
+        slower = self.catalog.slower_tests(runs=6)
+        self.assertEqual([test['name'] for test in slower], ['Test Cases/Login'])
+        self.assertEqual((slower[0]['earlier_mean_seconds'], slower[0]['recent_mean_seconds']), (1.067, 3.067))
+        self.assertEqual(self.catalog.slower_tests(runs=2), [])
+
+    def test_slower_command_with_zero_earlier_mean(self):
+        """Test the slower command prints n/a instead of a percentage when the earlier runs took 0s"""
+        for day, login in enumerate(['0', '0', '0', '2.0', '2.0', '2.0'], 1):
+            self.make_report(f'Reports/202509{day:02d}_100000', login=login)
+        katalon_report_parser.index_reports([str(self.temp_dir / 'Reports')], self.catalog)
+        self.assertIsNone(self.catalog.slower_tests(runs=6)[0]['change_pct'])
+
+        output = io.StringIO()
+        argv = ['katalon-report-parser.py', 'slower', '--runs', '6', '--catalog', str(self.temp_dir / 'catalog.sqlite3')]
+        with mock.patch.object(sys, 'argv', argv), contextlib.redirect_stdout(output):
+            katalon_report_parser.main()
+        self.assertIn('(+2.00s, n/a)  Test Cases/Login', output.getvalue())
+
+
+class TestTestHistory(unittest.TestCase):
+    """Test flaky-test and duration-trend analytics"""
+
+    JUNIT = TestBatchParsing.JUNIT
+    make_report = TestBatchParsing.make_report
+
+    def build_history(self):
+        history = katalon_report_parser.TestHistory()
+        for run in range(10):
+            history.add_run(f'run-{run}', [
+                {'name': 'Stable', 'status': 'PASSED', 'time': 2.0 + (run % 2) * 0.01},
+                {'name': 'Flaky', 'status': 'FAILED' if run % 3 == 0 else 'PASSED', 'time': 1.0},
+                {'name': 'Slower', 'status': 'PASSED', 'time': 1.0 if run < 6 else 4.0},
+                {'name': 'Skipped', 'status': 'SKIPPED', 'time': 0.0},
+            ])
+        return history
+
+    def test_test_stats(self):
+        """Test flip rate, duration statistics and step change per test"""
+        stats = {test['name']: test for test in self.build_history().test_stats()}
+        self.assertNotIn('Skipped', stats)
+
+        flaky = stats['Flaky']
+        self.assertEqual((flaky['runs'], flaky['failed'], flaky['flips']), (10, 4, 6))
+        self.assertEqual(flaky['flip_rate'], round(6 / 9, 4))
+        self.assertEqual(flaky['mean_seconds'], 1.0)
+
+        stable = stats['Stable']
+        self.assertEqual((stable['flips'], stable['step_change']), (0, None))
+        self.assertEqual((stable['mean_seconds'], stable['p95_seconds']), (2.005, 2.01))
+
+        step = stats['Slower']['step_change']
+        self.assertEqual(step['first_run'], 'run-6')
+        self.assertEqual((step['before_seconds'], step['after_seconds'], step['change_pct']), (1.0, 4.0, 300.0))
+
+    def test_analyze_ranking(self):
+        """Test ranked flaky and regressing lists and the min-runs threshold"""
+        history = self.build_history()
+        trends = history.analyze()
+        self.assertEqual((trends['runs'], trends['rows'], trends['tests']), (10, 40, 4))
+        self.assertEqual([test['name'] for test in trends['flaky']], ['Flaky'])
+        self.assertEqual([test['name'] for test in trends['regressing']], ['Slower'])
+        self.assertEqual(history.analyze(thresholds={'min_runs': 11})['flaky'], [])
+
+    def test_history_from_catalog(self):
+        """Test the catalog feeds runs oldest first"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        with katalon_report_parser.ReportCatalog(self.temp_dir / 'catalog.sqlite3') as catalog:
+            for day, failed in enumerate([False, True, False], 1):
+                self.make_report(f'Reports/2025090{day}_100000', failed=failed)
+            katalon_report_parser.index_reports([str(self.temp_dir / 'Reports')], catalog)
+
+            history = catalog.history()
+            self.assertEqual(history.run_labels,
+                             ['2025-09-01T10:00:00', '2025-09-02T10:00:00', '2025-09-03T10:00:00'])
+            stats = {test['name']: test for test in history.test_stats()}
+            self.assertEqual(stats['Test Cases/Checkout']['flips'], 2)
+            self.assertEqual(len(catalog.history(runs=2).run_labels), 2)
+
+class TestFailureClustering(unittest.TestCase):
+    """Test failure message normalization and clustering"""
+
+    @staticmethod
+    def failure(name, reason, frames=('at com.acme.Steps.click(Steps.groovy:42)',
+                                      'at com.kms.katalon.core.keyword.internal.KeywordMain.runKeyword(KeywordMain.groovy:75)',
+                                      'at Quote Steps.run(Quote Steps:31)')):
+        message = f'{name} FAILED.\nReason:\n{reason}\n' + '\n'.join('\t' + frame for frame in frames)
+        return {'name': name, 'status': 'FAILED', 'time': 1.0, 'failure_message': message}
+
+    def test_failure_signature(self):
+        """Test the Katalon preamble is dropped and volatile tokens are normalized"""
+        case = self.failure(
+            'Test Cases/A',
+            'Session 3d8d51b5-582a-498e-907d-8c1c7021d128 at 2025-09-24T16:50:38.123Z: '
+            'java.lang.Object@1b6d3586 at 0x7ffe12 returned 401 for quote 1758732572085 (deadbeef01)',
+            frames=[f'at TempTestSuite1758732572085.run(TempTestSuite.groovy:{line})' for line in (35, 36, 37, 38)])
+        self.assertEqual(katalon_report_parser.failure_signature(case),
+                         'Session <uuid> at <timestamp>: java.lang.Object@<hex> at <hex> returned 401 '
+                         'for quote <n> (<hex>)\n' +
+                         '\n'.join(['at TempTestSuite<n>.run(TempTestSuite.groovy:<line>)'] * 3))
+
+        junit_style = {'name': 'B', 'status': 'ERROR', 'error_message': 'Element not found',
+                       'stack_trace': 'NoSuchElementException: Element not found\n\tat Page.find(Page.java:9)'}
+        self.assertEqual(katalon_report_parser.failure_signature(junit_style),
+                         'Element not found\nNoSuchElementException: Element not found\nat Page.find(Page.java:<line>)')
+
+    def test_cluster_failures(self):
+        """Test failures group by root cause with counts and one representative"""
+        test_cases = [{'name': 'Test Cases/Passing', 'status': 'PASSED', 'time': 1.0}]
+        for n in range(6):
+            test_cases.append(self.failure(
+                f'Test Cases/Quote {n}',
+                f"StepFailedException: Unable to click on object 'Page_Quote/button_Save' (request {1000 + n * 7919})"))
+        # Near duplicate: same exception, one different word
+        test_cases.append(self.failure(
+            'Test Cases/Policy', "StepFailedException: Unable to click on object 'Page_Quote/button_Submit' (request 4711)"))
+        test_cases.append(self.failure('Test Cases/Status', "Actual object '401' and expected object '200' are not equal",
+                                       frames=['at com.acme.Api.verify(Api.groovy:12)']))
+
+        clusters = katalon_report_parser.cluster_failures(test_cases)
+        self.assertEqual([(cluster['count'], cluster['variants']) for cluster in clusters], [(7, 2), (1, 1)])
+        first = clusters[0]
+        self.assertEqual(first['representative']['name'], 'Test Cases/Quote 0')
+        self.assertEqual(first['representative']['message'],
+                         "StepFailedException: Unable to click on object 'Page_Quote/button_Save' (request 1000)")
+        self.assertEqual(first['test_count'], 7)
+        self.assertIn('Test Cases/Policy', first['tests'])
+        self.assertEqual(clusters[1]['tests'], ['Test Cases/Status'])
+        self.assertEqual(katalon_report_parser.cluster_failures(test_cases, similarity=1.0)[0]['count'], 6)
+
+    def test_parse_includes_failure_clusters(self):
+        """Test parse() output carries the clusters of the sample report"""
+        sample = Path(__file__).parent.parent / 'resources' / '401ErrorReportDir'
+        clusters = KatalonReportParser(str(sample)).parse()['failure_clusters']
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]['representative']['message'],
+                         "com.kms.katalon.core.exception.StepFailedException: "
+                         "Actual object '401' and expected object '200' are not equal")
+        json.dumps(clusters)
+
+
+class TestLazySections(unittest.TestCase):
+    """Test on-demand report sections"""
+
+    sample_report_dir = Path(__file__).parent.parent / 'resources' / '401ErrorReportDir'
+
+    def test_summary_only(self):
+        """Test the summary section matches the JUnit totals without walking the folder"""
+        parser = KatalonReportParser(str(self.sample_report_dir))
+        summary = parser.parse(sections=['summary'])
+        self.assertEqual(list(summary), ['summary'])
+        self.assertIsNone(parser._files)
+
+        junit = KatalonReportParser(str(self.sample_report_dir)).parse_junit_xml()
+        junit.pop('test_cases')
+        self.assertEqual(summary['summary'], junit)
+
+    def test_lazy_report_memoizes_accessed_sections(self):
+        """Test sections are computed on first access only"""
+        parser = KatalonReportParser(str(self.sample_report_dir))
+        report = parser.report()
+        self.assertEqual(list(report), list(katalon_report_parser.PARSE_SECTIONS))
+        self.assertEqual(report.computed, [])
+
+        clusters = report['failure_clusters']
+        self.assertEqual(report.computed, ['junit_xml', 'failure_clusters'])
+        self.assertIs(report['failure_clusters'], clusters)
+        self.assertEqual(report.get('summary', 'absent'), 'absent')
+        self.assertEqual(report.to_dict(), parser.parse())
+
+    def test_section_selector(self):
+        """Test parse(sections=...) returns only the selected sections and rejects unknown ones"""
+        parser = KatalonReportParser(str(self.sample_report_dir))
+        data = parser.parse(sections=['failure_clusters', 'session_urls'])
+        self.assertEqual(list(data), ['failure_clusters', 'session_urls'])
+        self.assertEqual(len(data['failure_clusters']), 1)
+        self.assertIn('logrocket_url', data['session_urls'])
+        with self.assertRaises(ValueError):
+            parser.parse(sections=['summary', 'screenshots'])
+
+
+class TestNdjsonOutput(unittest.TestCase):
+    """Test streaming NDJSON records"""
+
+    def test_report_records(self):
+        """Test header, per-test-case, cluster, artifact and session URL records"""
+        sample = Path(__file__).parent.parent / 'resources' / '401ErrorReportDir'
+        output = io.StringIO()
+        with katalon_report_parser.NdjsonWriter(output, flush_every=2) as writer:
+            for record in KatalonReportParser(str(sample)).iter_records(stack_trace_limit=0):
+                writer.write(record)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        header = records[0]
+        self.assertEqual(header['record'], 'header')
+        self.assertEqual((header['total_tests'], header['failures']), (5, 1))
+        self.assertEqual(header['execution_uuid'], '3d8d51b5-582a-498e-907d-8c1c7021d128')
+        self.assertEqual(writer.count, len(records))
+
+        by_type = {}
+        for record in records[1:]:
+            by_type.setdefault(record['record'], []).append(record)
+        self.assertEqual(len(by_type['test_case']), 5)
+        self.assertEqual(len(by_type['failure_cluster']), 1)
+        self.assertEqual(len([r for r in by_type['artifact'] if r['kind'] == 'screenshots']), 8)
+        self.assertEqual({r['provider'] for r in by_type['session_url']}, {'logrocket_url', 'device_farm_url'})
+        self.assertEqual([r['record'] for r in records[1:6]], ['test_case'] * 5)
+
+    def test_writer_encodes_any_value(self):
+        """Test NdjsonWriter encodes values JSON cannot and leaves a passed-in file open"""
+        output = io.StringIO()
+        with katalon_report_parser.NdjsonWriter(output) as writer:
+            writer.write({'path': Path('/tmp/report')})
+        self.assertEqual(json.loads(output.getvalue()), {'path': '/tmp/report'})
+        self.assertFalse(output.closed)
+
+    def test_report_records_without_session_urls(self):
+        """Test a JUnit-only report with no session URLs streams every record"""
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            (temp_dir / 'JUnit_Report.xml').write_text(TestBatchParsing.JUNIT.format(
+                total=3.0, login='1.0', failures=1, status='FAILED',
+                failure='<failure message="Element not found"/>', timestamp=''))
+            output = io.StringIO()
+            with katalon_report_parser.NdjsonWriter(output) as writer:
+                for record in KatalonReportParser(str(temp_dir)).iter_records():
+                    writer.write(record)
+            records = [json.loads(line) for line in output.getvalue().splitlines()]
+        finally:
+            shutil.rmtree(temp_dir)
+
+        self.assertEqual([r['record'] for r in records],
+                         ['header', 'test_case', 'test_case', 'failure_cluster'])
+
+
+class TestWatchMode(unittest.TestCase):
+    """Test watching for completed report folders"""
+
+    JUNIT = TestBatchParsing.JUNIT
+    make_report = TestBatchParsing.make_report
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        (self.temp_dir / 'Reports').mkdir()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_watcher_hands_out_settled_reports_once(self):
+        """Test a folder is ready once its JUnit report settles, and again only when rewritten"""
+        watcher = katalon_report_parser.ReportWatcher([str(self.temp_dir / 'Reports')], settle_seconds=5)
+        running = self.temp_dir / 'Reports' / '20250924_100000' / 'Suite' / '20250924_100000'
+        running.mkdir(parents=True)
+        (running / 'execution0.log').touch()
+        now = time.time()
+        self.assertEqual(watcher.poll(now), [])
+
+        folder = self.make_report('Reports/20250924_100000/Suite/20250924_100000/done')
+        self.assertEqual(watcher.poll(now), [])
+        self.assertEqual(watcher.poll(now + 10), [str(folder)])
+        self.assertEqual(watcher.poll(now + 20), [])
+
+        os.utime(folder / 'JUnit_Report.xml', (now + 15, now + 15))
+        self.assertEqual(watcher.poll(now + 30), [str(folder)])
+
+    def test_watch_once_appends_to_ndjson_and_catalog(self):
+        """Test completed folders are parsed once, with HAR analysis, into NDJSON records and the catalog"""
+        sample = Path(__file__).parent.parent / 'resources' / '401ErrorReportDir'
+        shutil.copytree(str(sample), str(self.temp_dir / 'Reports' / '20250924_100000'))
+        self.make_report('Reports/20250925_100000', failed=True)
+        broken = self.temp_dir / 'Reports' / 'broken'
+        broken.mkdir()
+        (broken / 'JUnit_Report.xml').write_text('<testsuites')
+
+        output = io.StringIO()
+        with katalon_report_parser.ReportCatalog(self.temp_dir / 'catalog.sqlite3') as catalog:
+            stats = katalon_report_parser.watch_reports(
+                [str(self.temp_dir / 'Reports')], catalog, katalon_report_parser.NdjsonWriter(output),
+                workers=2, settle_seconds=0, once=True)
+            self.assertEqual(stats, {'processed': 2, 'errors': 1, 'har_files': 2})
+            self.assertEqual(catalog.execution_count(), 2)
+
+            stats = katalon_report_parser.watch_reports([str(self.temp_dir / 'Reports')], catalog,
+                                                        workers=1, settle_seconds=0, once=True)
+            self.assertEqual(stats['processed'], 0)
+
+        records = {Path(record['folder']).name: record
+                   for record in map(json.loads, output.getvalue().splitlines())}
+        self.assertIn('error', records['broken'])
+        sample_record = records['20250924_100000']
+        self.assertEqual((sample_record['total_tests'], sample_record['passed']), (5, 4))
+        self.assertEqual(len(sample_record['failure_clusters']), 1)
+        self.assertEqual(sorted(Path(har['file']).name for har in sample_record['har_files']),
+                         ['Generate-Document_1.har', 'Get-Quote-Data_0.har'])
+        self.assertTrue(all('summary' in har for har in sample_record['har_files']))
+        self.assertEqual(records['20250925_100000']['test_cases'][1]['message'], 'Element not found')
+
+
 if __name__ == '__main__':
     # Run tests with verbose output
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Skill Engine Benchmark
+Runs the generation engine against the offline stub backend, no API key needed
+
+Creates N synthetic plugins in a temporary directory, generates their
+SKILL.md files through the full pipeline (context, prompt, rate-limited
+calls, validation, write, audit log) and reports throughput and latency.
+--capacity makes the stub answer 429 above that many calls in flight, to
+check that the adaptive controller converges on it. --cache runs the set
+twice through a response cache, deleting the SKILL.md files in between, to
+show that a rerun of unchanged plugins makes no API calls.
+
+Usage:
+    python3 scripts/benchmark-skills-engine.py [--plugins N] [--latency S] [--capacity N]
+                                               [--max-concurrency N] [--rpm N] [--cache] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rate_limiter import AsyncAdaptiveConcurrency, RateLimiter
+from skill_engine import AuditLog, ResponseCache, SkillEngine, StubBackend, plugin_jobs, summarize
+
+
+def create_plugins(root: Path, count: int):
+    """Synthetic plugins with the files read_plugin_context() looks at"""
+    plugins = []
+    for i in range(count):
+        name = f'bench-plugin-{i:04d}'
+        base = root / 'plugins' / 'benchmark' / name
+        (base / '.claude-plugin').mkdir(parents=True)
+        (base / 'commands').mkdir()
+        (base / '.claude-plugin' / 'plugin.json').write_text(json.dumps({
+            'name': name,
+            'description': f'Benchmark plugin {i}',
+            'category': 'testing',
+        }, indent=2))
+        (base / 'README.md').write_text(f"# {name}\n\n" + "Benchmark plugin documentation. " * 80)
+        (base / 'commands' / 'run.md').write_text(f"# /run\n\nRun {name}.\n")
+        plugins.append({'name': name, 'source': f'./plugins/benchmark/{name}',
+                        'description': f'Benchmark plugin {i}', 'category': 'testing'})
+    return plugins
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def run_once(root: Path, entries: list, latency: float, capacity: int, max_concurrency: int,
+             rpm: float, cache: ResponseCache = None) -> dict:
+    jobs = plugin_jobs(entries, root)
+    backend = StubBackend(latency=latency, capacity=capacity, retry_after=latency)
+    concurrency = AsyncAdaptiveConcurrency(maximum=max_concurrency)
+    limiter = RateLimiter({'requests_per_minute': rpm} if rpm else {})
+    engine = SkillEngine(backend, limiter, concurrency, audit=AuditLog(root / 'audit.db'),
+                         max_retries=10, retry_delay=latency, cache=cache, verbose=False)
+
+    start = time.perf_counter()
+    results = asyncio.run(engine.run(jobs))
+    elapsed = time.perf_counter() - start
+
+    seconds = [job['seconds'] for job in results if job['status'] == 'success']
+    return {
+        'plugins': len(entries),
+        'elapsed_seconds': round(elapsed, 3),
+        'plugins_per_second': round(len(entries) / elapsed, 1),
+        'latency_p50': round(statistics.median(seconds), 3) if seconds else 0.0,
+        'latency_p95': round(percentile(seconds, 0.95), 3),
+        'api_calls': backend.calls,
+        'throttles': concurrency.throttles,
+        'peak_concurrency': concurrency.peak,
+        'final_concurrency': int(concurrency.limit),
+        'statuses': summarize(results),
+    }
+
+
+def run_benchmark(plugins: int, latency: float, capacity: int = None, max_concurrency: int = 16,
+                  rpm: float = None, cached: bool = False) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        entries = create_plugins(root, plugins)
+        cache = ResponseCache(root / 'response-cache') if cached else None
+        result = run_once(root, entries, latency, capacity, max_concurrency, rpm, cache)
+        if cached:
+            for skill_file in root.glob('plugins/*/*/skills/*/SKILL.md'):
+                skill_file.unlink()
+            result['rerun'] = run_once(root, entries, latency, capacity, max_concurrency, rpm, cache)
+            result['cache'] = {'hits': cache.hits, 'misses': cache.misses, 'bytes': cache.size}
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the skill generation engine against the stub backend')
+    parser.add_argument('--plugins', type=int, default=200, help='synthetic plugins to generate (default 200)')
+    parser.add_argument('--latency', type=float, default=0.05, help='stub latency per call in seconds (default 0.05)')
+    parser.add_argument('--capacity', type=int, default=None,
+                        help='calls in flight the stub accepts before answering 429 (default unlimited)')
+    parser.add_argument('--max-concurrency', type=int, default=16, help='adaptive controller maximum (default 16)')
+    parser.add_argument('--rpm', type=float, default=None, help='requests per minute limit (default none)')
+    parser.add_argument('--cache', action='store_true',
+                        help='rerun the same plugins through a response cache after the first pass')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    result = run_benchmark(args.plugins, args.latency, args.capacity, args.max_concurrency, args.rpm, args.cache)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    ideal = args.plugins * args.latency / min(args.max_concurrency, args.capacity or args.max_concurrency)
+    print(f"\n📊 Skill engine benchmark ({args.plugins} plugins, stub latency {args.latency}s)")
+    print(f"   - Total time: {result['elapsed_seconds']:.2f}s (ideal at full concurrency ~{ideal:.2f}s)")
+    print(f"   - Throughput: {result['plugins_per_second']} plugins/s")
+    print(f"   - Per plugin: p50 {result['latency_p50']}s, p95 {result['latency_p95']}s")
+    print(f"   - API calls: {result['api_calls']} ({result['throttles']} throttled)")
+    print(f"   - Concurrency: peak {result['peak_concurrency']}, final {result['final_concurrency']}")
+    print(f"   - Results: {result['statuses']}")
+    if args.cache:
+        rerun = result['rerun']
+        print(f"   - Cached rerun: {rerun['elapsed_seconds']:.2f}s, {rerun['api_calls']} API calls "
+              f"({result['cache']['hits']} hits, {result['cache']['misses']} misses, "
+              f"{result['cache']['bytes'] / 1024:.0f} KB)")
+        if rerun['statuses']['success'] != args.plugins:
+            sys.exit(1)
+    if result['statuses']['success'] != args.plugins:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Shared API rate limiter for the skill generators
+
+Token buckets per quota dimension (requests, input/output tokens per minute,
+daily caps) with a configurable burst. acquire_async() reserves capacity
+from every bucket at once and then sleeps for its share of the debt, so
+concurrent calls queue in reservation order instead of re-checking the
+buckets in a loop.
+
+Tier presets mirror the tables in CLAUDE_RATE_LIMITS.md and
+GEMINI_RATE_LIMITS.md; override single limits with --rpm/--itpm/--otpm.
+Limits reported in response headers (anthropic-ratelimit-*, x-ratelimit-*)
+replace the per-minute presets as soon as the first response arrives; limits
+given on the command line are kept.
+
+AdaptiveConcurrency caps the calls in flight with AIMD: the cap grows while
+calls succeed and halves on 429/overload responses, and retry-after pauses
+every worker (each resuming at a jittered time). AsyncAdaptiveConcurrency
+and call_with_retries_async() apply it to coroutines sharing one event loop
+(see skill_pipeline.py); the generators have no threaded call path.
+
+Usage:
+    from rate_limiter import AsyncAdaptiveConcurrency, call_with_retries_async, limiter_from_argv
+    rate_limiter, args = limiter_from_argv('claude', 'free', sys.argv[1:])
+    concurrency = AsyncAdaptiveConcurrency(maximum=16)
+    response = await call_with_retries_async(lambda: client.create(...), concurrency, rate_limiter,
+                                             input_tokens=estimate_tokens(prompt), output_tokens=1500)
+    rate_limiter.record_usage(estimated_input, estimated_output, actual_input, actual_output)
+"""
+
+import asyncio
+import math
+import random
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+MINUTE = 60.0
+DAY = 86400.0
+CHARS_PER_TOKEN = 4  # rough English/markdown average, good enough to pre-reserve input tokens
+
+# Quota dimension -> (what it counts, period in seconds)
+DIMENSIONS = {
+    'requests_per_minute': ('requests', MINUTE),
+    'input_tokens_per_minute': ('input', MINUTE),
+    'output_tokens_per_minute': ('output', MINUTE),
+    'tokens_per_minute': ('tokens', MINUTE),
+    'requests_per_day': ('requests', DAY),
+    'tokens_per_day': ('tokens', DAY),
+}
+
+# Published quotas (see CLAUDE_RATE_LIMITS.md / GEMINI_RATE_LIMITS.md).
+# The guides list one combined TPM figure, so it is applied to input + output.
+TIERS = {
+    'claude': {
+        'free': {'requests_per_minute': 5, 'tokens_per_minute': 10_000, 'requests_per_day': 50},
+        'tier1': {'requests_per_minute': 1000, 'tokens_per_minute': 150_000, 'tokens_per_day': 2_500_000},
+        'tier2': {'requests_per_minute': 2000, 'tokens_per_minute': 400_000, 'tokens_per_day': 5_000_000},
+    },
+    'gemini': {
+        'free': {'requests_per_minute': 15, 'tokens_per_day': 1_000_000, 'requests_per_day': 1500},
+        'paid': {'requests_per_minute': 360, 'tokens_per_day': 4_000_000, 'requests_per_day': 10_000},
+    },
+}
+
+# Rate-limit response headers: anthropic-ratelimit-<key>-limit / x-ratelimit-limit-<key> -> dimension
+HEADER_DIMENSIONS = {
+    'requests': 'requests_per_minute',
+    'tokens': 'tokens_per_minute',
+    'input-tokens': 'input_tokens_per_minute',
+    'output-tokens': 'output_tokens_per_minute',
+}
+
+# Adaptive concurrency defaults
+INITIAL_CONCURRENCY = 2
+MAX_CONCURRENCY = 16
+CONCURRENCY_DECREASE = 0.5
+PAUSE_JITTER = 0.25   # workers resume spread over the last 25% of a pause
+MAX_RETRIES = 3
+RETRY_DELAY = 10      # seconds, doubled per attempt when the provider gives no retry-after
+
+_RETRY_IN_MESSAGE = re.compile(r'retry in (\d+(?:\.\d+)?)\s*s\b|retry_delay\s*\{\s*seconds:\s*(\d+)', re.IGNORECASE)
+
+# Command-line overrides -> dimension
+LIMIT_FLAGS = {
+    '--rpm': 'requests_per_minute',
+    '--itpm': 'input_tokens_per_minute',
+    '--otpm': 'output_tokens_per_minute',
+    '--tpm': 'tokens_per_minute',
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for a prompt (about 4 characters per token)"""
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+class TokenBucket:
+    """
+    Holds up to `capacity` units, refilled continuously at `rate` per second.
+
+    A reservation may take the balance below zero: the debt is what later
+    callers have to wait for, which keeps waiters in reservation order.
+    """
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` is available (call refill() first)"""
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float):
+        """Remove amount (negative amounts give units back, up to capacity)"""
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class RateLimiter:
+    """
+    Multi-dimension token-bucket limiter shared by all workers.
+
+    limits maps DIMENSIONS keys to quotas; None or missing means unlimited.
+    burst is the share of a per-minute quota that may be spent at once
+    (1.0 = a full minute's worth, like the providers' own buckets); daily
+    buckets always hold the whole day's quota.
+    """
+
+    def __init__(self, limits: Dict[str, float], burst: float = 1.0, clock=time.monotonic, sleep=asyncio.sleep):
+        unknown = [name for name in limits if name not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown rate limit(s): {', '.join(unknown)}")
+        if not 0 < burst <= 1:
+            raise ValueError("burst must be in (0, 1]")
+        self.limits = {name: quota for name, quota in limits.items() if quota}
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self.lock = threading.Lock()
+        now = clock()
+        self.buckets = {}
+        for name, quota in self.limits.items():
+            _, period = DIMENSIONS[name]
+            capacity = quota if period == DAY else max(1.0, quota * burst)
+            self.buckets[name] = TokenBucket(quota / period, capacity, now)
+        self.pinned = set()  # set on the command line; response headers do not override these
+        self.requests = 0
+        self.waited_seconds = 0.0
+
+    @staticmethod
+    def _amounts(requests: float, input_tokens: float, output_tokens: float) -> Dict[str, float]:
+        return {'requests': requests, 'input': input_tokens, 'output': output_tokens,
+                'tokens': input_tokens + output_tokens}
+
+    def reserve(self, input_tokens: int = 0, output_tokens: int = 0) -> float:
+        """Reserve one request's capacity now; returns how long to wait before sending it"""
+        amounts = self._amounts(1, input_tokens, output_tokens)
+        with self.lock:
+            now = self._clock()
+            wait = 0.0
+            for name, bucket in self.buckets.items():
+                bucket.refill(now)
+                wait = max(wait, bucket.delay(amounts[DIMENSIONS[name][0]]))
+            for name, bucket in self.buckets.items():
+                bucket.take(amounts[DIMENSIONS[name][0]])
+            self.requests += 1
+            self.waited_seconds += wait
+        return wait
+
+    async def acquire_async(self, input_tokens: int = 0, output_tokens: int = 0) -> float:
+        """Wait until one request with these token estimates fits every quota; returns seconds waited"""
+        wait = self.reserve(input_tokens, output_tokens)
+        if wait > 0:
+            await self._sleep(wait)
+        return wait
+
+    def record_usage(self, estimated_input: int, estimated_output: int,
+                     actual_input: Optional[int] = None, actual_output: Optional[int] = None):
+        """Correct the token buckets once the response reports real usage"""
+        delta_input = 0 if actual_input is None else actual_input - estimated_input
+        delta_output = 0 if actual_output is None else actual_output - estimated_output
+        amounts = self._amounts(0, delta_input, delta_output)
+        with self.lock:
+            now = self._clock()
+            for name, bucket in self.buckets.items():
+                bucket.refill(now)
+                bucket.take(amounts[DIMENSIONS[name][0]])
+
+    def set_limit(self, dimension: str, quota: float):
+        """Replace one quota (e.g. with the limit the provider reports)"""
+        _, period = DIMENSIONS[dimension]
+        capacity = quota if period == DAY else max(1.0, quota * self.burst)
+        with self.lock:
+            self.limits[dimension] = quota
+            bucket = self.buckets.get(dimension)
+            if bucket is None:
+                self.buckets[dimension] = TokenBucket(quota / period, capacity, self._clock())
+            else:
+                bucket.refill(self._clock())
+                bucket.rate = quota / period
+                bucket.capacity = capacity
+                bucket.tokens = min(bucket.tokens, capacity)
+
+    def observe_headers(self, headers):
+        """
+        Adopt the limits a response reports and never assume more headroom
+        than its remaining counts (requests already reserved stay reserved).
+        Preset per-minute limits the response does not report are dropped;
+        daily caps and pinned limits are kept.
+        """
+        if not headers:
+            return
+        reported = set()
+        for key, dimension in HEADER_DIMENSIONS.items():
+            limit = _header_number(headers, f'anthropic-ratelimit-{key}-limit', f'x-ratelimit-limit-{key}')
+            if limit:
+                reported.add(dimension)
+                if dimension not in self.pinned and limit != self.limits.get(dimension):
+                    self.set_limit(dimension, limit)
+            remaining = _header_number(headers, f'anthropic-ratelimit-{key}-remaining',
+                                       f'x-ratelimit-remaining-{key}')
+            if remaining is not None and dimension in self.buckets:
+                with self.lock:
+                    bucket = self.buckets[dimension]
+                    bucket.refill(self._clock())
+                    bucket.tokens = min(bucket.tokens, remaining)
+        if reported:
+            with self.lock:
+                for dimension in set(HEADER_DIMENSIONS.values()) - reported - self.pinned:
+                    self.limits.pop(dimension, None)
+                    self.buckets.pop(dimension, None)
+
+    def min_duration(self, requests: int, input_tokens: int = 0, output_tokens: int = 0) -> float:
+        """Shortest time `requests` requests of this size can take under the quotas (from full buckets)"""
+        amounts = self._amounts(requests, requests * input_tokens, requests * output_tokens)
+        seconds = 0.0
+        for name, bucket in self.buckets.items():
+            seconds = max(seconds, (amounts[DIMENSIONS[name][0]] - bucket.capacity) / bucket.rate)
+        return max(0.0, seconds)
+
+    def describe(self) -> str:
+        return ', '.join(f"{quota:,.0f} {name.replace('_', ' ')}" for name, quota in self.limits.items()) \
+            or 'unlimited'
+
+
+def _header_number(headers, *names) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+class RateLimitExceeded(Exception):
+    """A call was still throttled after the last retry"""
+
+
+def classify_error(error: Exception) -> Tuple[Optional[str], Optional[float]]:
+    """
+    ('rate_limited' | 'overloaded' | None, retry-after seconds or None) for an
+    API error: HTTP status attributes first (Anthropic status_code, Google
+    api_core code), then the message, as the generators always matched it.
+    """
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        status = None
+    message = str(error).lower()
+    if status == 429 or '429' in message or 'quota' in message or 'rate limit' in message \
+            or 'resource exhausted' in message or 'resource_exhausted' in message:
+        kind = 'rate_limited'
+    elif status in (503, 529) or 'overloaded' in message or '529' in message:
+        kind = 'overloaded'
+    else:
+        return None, None
+
+    headers = _error_headers(error)
+    retry_after = None
+    if headers:
+        retry_after = _header_number(headers, 'retry-after')
+        if retry_after is None:
+            milliseconds = _header_number(headers, 'retry-after-ms')
+            retry_after = None if milliseconds is None else milliseconds / 1000
+    if retry_after is None:
+        match = _RETRY_IN_MESSAGE.search(str(error))
+        if match:
+            retry_after = float(match.group(1) or match.group(2))
+    return kind, retry_after
+
+
+def _error_headers(error: Exception):
+    return getattr(getattr(error, 'response', None), 'headers', None)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD cap on calls in flight: the state and update rules, without waiting.
+
+    Starts at `initial` and doubles per round of successes (slow start) until
+    the first throttle, then grows by one per round; every 429 or overload
+    halves it, at most once per congestion event (calls that started before
+    the last decrease do not decrease it again). A pause holds every worker
+    back, e.g. for a retry-after, and releases them at jittered times so
+    their retries do not land together. AsyncAdaptiveConcurrency adds the
+    acquire()/release()/pause() coroutines the pipeline awaits.
+    """
+
+    def __init__(self, initial: int = INITIAL_CONCURRENCY, maximum: int = MAX_CONCURRENCY, minimum: int = 1,
+                 decrease: float = CONCURRENCY_DECREASE, jitter: float = PAUSE_JITTER,
+                 clock=time.monotonic, rng: random.Random = None):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.decrease = decrease
+        self.jitter = jitter
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.successes = 0
+        self.throttles = 0
+        self.peak = int(self.limit)
+        self._slow_start = True
+        self._last_decrease = float('-inf')
+        self._pause_jitter = 0.0
+        self._clock = clock
+        self._rng = rng or random.Random()
+
+    def _admission_delay(self, now: float) -> Optional[float]:
+        """0 if a call may start now, seconds left in a pause, or None while the cap is full"""
+        if now < self.paused_until:
+            return self.paused_until - now + self._rng.uniform(0, self._pause_jitter)
+        if self.in_flight < int(self.limit):
+            return 0.0
+        return None
+
+    def _record(self, started: float, outcome: str):
+        self.in_flight -= 1
+        if outcome == 'success':
+            self.successes += 1
+            self.limit = min(self.maximum, self.limit + (1.0 if self._slow_start else 1.0 / self.limit))
+            self.peak = max(self.peak, int(self.limit))
+        elif outcome == 'throttled':
+            self.throttles += 1
+            self._slow_start = False
+            if started >= self._last_decrease:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._last_decrease = self._clock()
+
+    def _extend_pause(self, seconds: float):
+        until = self._clock() + seconds
+        if until > self.paused_until:
+            self.paused_until = until
+            self._pause_jitter = seconds * self.jitter
+
+
+class AsyncAdaptiveConcurrency(AdaptiveConcurrency):
+    """AdaptiveConcurrency for coroutines sharing one event loop"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> float:
+        """Wait until a call may start; returns its start time for release()"""
+        async with self._condition:
+            while True:
+                now = self._clock()
+                delay = self._admission_delay(now)
+                if delay == 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._condition.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            self.in_flight += 1
+            return now
+
+    async def release(self, started: float, outcome: str = 'success'):
+        """End a call: outcome is 'success', 'throttled' or 'error' (other failures leave the cap alone)"""
+        async with self._condition:
+            self._record(started, outcome)
+            self._condition.notify_all()
+
+    async def pause(self, seconds: float):
+        """Hold back every new call for `seconds`"""
+        async with self._condition:
+            self._extend_pause(seconds)
+            self._condition.notify_all()
+
+
+async def call_with_retries_async(request: Callable[[], Awaitable], concurrency: AsyncAdaptiveConcurrency,
+                                  limiter: RateLimiter = None, input_tokens: int = 0, output_tokens: int = 0,
+                                  max_retries: int = MAX_RETRIES, retry_delay: float = RETRY_DELAY,
+                                  on_retry: Callable[[str, int, float], None] = None):
+    """
+    Await request() once the limiter and concurrency cap allow it, retrying
+    429/overload errors after the provider's retry-after (or an exponential
+    delay). Other errors are raised at once; RateLimitExceeded is raised
+    when the last attempt is still throttled. on_retry(kind, attempt, delay)
+    is called before each retry.
+    """
+    for attempt in range(1, max_retries + 1):
+        if limiter is not None:
+            await limiter.acquire_async(input_tokens, output_tokens)
+        started = await concurrency.acquire()
+        try:
+            result = await request()
+        except Exception as e:
+            kind, retry_after = classify_error(e)
+            await concurrency.release(started, 'throttled' if kind else 'error')
+            if kind is None:
+                raise
+            if limiter is not None:
+                limiter.observe_headers(_error_headers(e))
+            if attempt == max_retries:
+                raise RateLimitExceeded(f"{kind.replace('_', ' ')} after {max_retries} attempts") from e
+            delay = retry_after if retry_after is not None else retry_delay * 2 ** (attempt - 1)
+            await concurrency.pause(delay)
+            if on_retry is not None:
+                on_retry(kind, attempt, delay)
+            continue
+        await concurrency.release(started, 'success')
+        return result
+
+
+def retry_reporter(concurrency: AdaptiveConcurrency, max_retries: int = MAX_RETRIES, indent: str = '  '):
+    """on_retry callback printing the generators' usual retry lines"""
+    def report(kind, attempt, delay):
+        reason = 'Rate limit exceeded' if kind == 'rate_limited' else 'API overloaded'
+        print(f"{indent}⚠️  {reason} (attempt {attempt}/{max_retries})")
+        print(f"{indent}⏳ Waiting {delay:.0f} seconds before retry "
+              f"(concurrency now {int(concurrency.limit)})...")
+    return report
+
+
+def tier_limits(provider: str, tier: str) -> Dict[str, float]:
+    """Preset quotas for a provider tier"""
+    tiers = TIERS[provider]
+    if tier not in tiers:
+        raise ValueError(f"Unknown {provider} tier '{tier}' (choose from {', '.join(tiers)})")
+    return dict(tiers[tier])
+
+
+def limiter_from_argv(provider: str, default_tier: str, argv: List[str]) -> Tuple[RateLimiter, List[str]]:
+    """
+    RateLimiter configured from --tier NAME, --burst F and the LIMIT_FLAGS
+    overrides in argv; returns it with argv minus those options.
+    """
+    options = {}
+    remaining = []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--tier' or arg == '--burst' or arg in LIMIT_FLAGS:
+            options[arg] = next(args, None)
+        else:
+            remaining.append(arg)
+
+    limits = tier_limits(provider, options.get('--tier') or default_tier)
+    pinned = set()
+    for flag, dimension in LIMIT_FLAGS.items():
+        if options.get(flag):
+            limits[dimension] = float(options[flag])
+            pinned.add(dimension)
+    limiter = RateLimiter(limits, burst=float(options.get('--burst') or 1.0))
+    limiter.pinned = pinned
+    return limiter, remaining
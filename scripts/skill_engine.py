@@ -0,0 +1,866 @@
+#!/usr/bin/env python3
+"""
+Provider-agnostic SKILL.md generation engine
+
+One engine for every generator script: it reads the plugin context, builds
+the prompt, calls a Backend through the asyncio pipeline (skill_pipeline.py)
+under the shared token buckets and adaptive concurrency (rate_limiter.py),
+validates the result against Anthropic's SKILL.md guidelines, writes it and
+records every attempt in the SQLite audit database.
+
+Backends:
+- AnthropicBackend  Claude via AsyncAnthropic (rate-limit headers observed)
+- GeminiBackend     Gemini API key via google.generativeai
+- VertexBackend     Gemini on Vertex AI (gcloud application-default credentials)
+- StubBackend       deterministic offline responses, for tests and benchmarks
+
+Provider SDKs are imported by their backend only, so the stub runs without
+any of them installed.
+
+ResponseCache keeps every raw response on disk under a hash of what
+produced it (backend, model, generation parameters, full prompt), so a
+rerun after a crash or a validation change replays unchanged plugins at no
+cost and only plugins whose files changed reach the API.
+
+Usage:
+    backend = AnthropicBackend(os.environ['ANTHROPIC_API_KEY'])
+    cache, args = cache_from_argv(args)
+    engine = SkillEngine(backend, rate_limiter, concurrency, audit=AuditLog(DB_PATH), cache=cache)
+    jobs = plugin_jobs(marketplace['plugins'], repo_root)
+    results = asyncio.run(engine.run(jobs))
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from rate_limiter import (MAX_CONCURRENCY, MAX_RETRIES, RETRY_DELAY, AsyncAdaptiveConcurrency, RateLimiter,
+                          call_with_retries_async, estimate_tokens, retry_reporter)
+from skill_pipeline import Stage, run_pipeline
+
+ESTIMATED_OUTPUT_TOKENS = 1500  # typical SKILL.md; corrected from the response's usage
+ESTIMATED_INPUT_TOKENS = 2000   # plugin context + prompt, for time estimates
+MAX_SKILL_LINES = 500           # Anthropic's recommendation (a warning, not a failure)
+DEFAULT_DB_PATH = Path(__file__).parent.parent / 'backups' / 'skills-audit' / 'skills_generation.db'
+DEFAULT_CACHE_DIR = DEFAULT_DB_PATH.parent / 'response-cache'
+DEFAULT_CACHE_MB = 200
+CACHE_EVICT_TO = 0.9  # eviction frees space down to 90% of the size limit
+
+# Text, token usage and response headers of one API call
+Generation = namedtuple('Generation', 'text input_tokens output_tokens headers')
+
+
+def read_plugin_context(plugin_path):
+    """Read plugin files to understand what it does"""
+    base = Path(plugin_path)
+    context = []
+
+    # Read plugin.json
+    plugin_json = base / '.claude-plugin' / 'plugin.json'
+    if plugin_json.exists():
+        context.append(f"=== plugin.json ===\n{plugin_json.read_text()}\n")
+
+    # Read README (first 3000 chars)
+    readme = base / 'README.md'
+    if readme.exists():
+        content = readme.read_text()[:3000]
+        context.append(f"=== README.md ===\n{content}\n")
+
+    # Sample commands
+    commands_dir = base / 'commands'
+    if commands_dir.exists():
+        cmd_files = list(commands_dir.glob('*.md'))[:2]
+        for cmd in cmd_files:
+            context.append(f"=== Command: {cmd.name} ===\n{cmd.read_text()[:600]}\n")
+
+    # Sample agents
+    agents_dir = base / 'agents'
+    if agents_dir.exists():
+        agent_files = list(agents_dir.glob('*.md'))[:2]
+        for agent in agent_files:
+            context.append(f"=== Agent: {agent.name} ===\n{agent.read_text()[:600]}\n")
+
+    return "\n".join(context)
+
+
+def build_prompt(plugin_name: str, plugin_category: str, plugin_desc: str, context: str) -> str:
+    """Prompt for one plugin's SKILL.md, following Anthropic's official guidelines"""
+    return f"""You are an expert at creating Agent Skills for Claude Code following Anthropic's official guidelines.
+
+CONTEXT - What You're Creating:
+
+Claude Code is Anthropic's CLI tool for software development. Users install PLUGINS (extensions) to add capabilities.
+
+AGENT SKILLS are instruction manuals (SKILL.md files) that teach Claude Code:
+- WHEN to automatically activate a specific plugin (trigger phrases)
+- HOW to use the plugin effectively (workflow steps)
+- WHAT the plugin is best used for (examples and scenarios)
+
+When a user says something like "create ansible playbook", Claude Code:
+1. Scans installed plugins' SKILL.md frontmatter at startup
+2. Matches "ansible playbook" to the trigger terms in a skill's description
+3. Reads the full SKILL.md for detailed instructions
+4. Automatically activates that plugin with the correct workflow
+
+Your job: Write the SKILL.md instruction manual for the plugin described below.
+
+OFFICIAL ANTHROPIC REQUIREMENTS:
+- YAML frontmatter with ONLY two fields: 'name' and 'description' (no other fields allowed)
+- name: Max 64 characters, use gerund form (e.g., "Processing PDFs", "Analyzing Security")
+- description: Max 1024 characters, third person, explain WHAT it does and WHEN to use it
+- Keep total length under 500 lines (Anthropic recommendation)
+- Conciseness is critical - only include what Claude doesn't already know
+- Use consistent terminology throughout
+- Include specific trigger terms in description
+
+PLUGIN DETAILS:
+- Name: {plugin_name}
+- Category: {plugin_category}
+- Description: {plugin_desc}
+
+PLUGIN FILES:
+{context}
+
+TASK: Generate a complete SKILL.md file following this EXACT format:
+
+---
+name: [Gerund-form name, max 64 chars]
+description: |
+  [Third-person description, max 1024 chars. Explain WHAT this skill does and WHEN Claude should use it. Include specific trigger terms and contexts. Be concise and specific to THIS plugin's purpose.]
+---
+
+## Overview
+
+[Brief 2-3 sentence overview of what this skill enables Claude to do]
+
+## How It Works
+
+[Step-by-step workflow in 3-5 clear steps:]
+
+1. **[Step name]**: [What happens]
+2. **[Step name]**: [What happens]
+3. **[Step name]**: [What happens]
+
+## When to Use This Skill
+
+This skill activates when you need to:
+- [Trigger scenario 1]
+- [Trigger scenario 2]
+- [Trigger scenario 3]
+
+## Examples
+
+### Example 1: [Realistic Use Case]
+
+User request: "[Natural language request]"
+
+The skill will:
+1. [Action taken]
+2. [Result produced]
+
+### Example 2: [Another Scenario]
+
+User request: "[Another request]"
+
+The skill will:
+1. [Action taken]
+2. [Result produced]
+
+## Best Practices
+
+- **[Practice category]**: [Specific actionable advice]
+- **[Practice category]**: [Specific actionable advice]
+- **[Practice category]**: [Specific actionable advice]
+
+## Integration
+
+[How this skill works with other tools/plugins in the Claude Code ecosystem]
+
+CRITICAL REQUIREMENTS:
+- ONLY 'name' and 'description' in YAML frontmatter (no other fields)
+- Name must be gerund form and under 64 characters
+- Description must be under 1024 characters
+- Total length MUST be under 500 lines
+- Be SPECIFIC to {plugin_name}'s actual purpose (not generic)
+- Use consistent terminology throughout
+- NO placeholder text like [TODO] or [INSERT]
+- Third person voice in description
+- Active, engaging voice in body
+- Examples must be realistic for this plugin's domain
+
+Generate the complete SKILL.md content now:"""
+
+
+def strip_code_fences(content: str) -> str:
+    """Strip markdown code fences if present (Gemini sometimes wraps in ```markdown)"""
+    content = content.strip()
+    if content.startswith('```'):
+        lines = content.split('\n')
+        # Remove first line (```markdown or similar)
+        lines = lines[1:]
+        # Remove last line if it's ```
+        if lines and lines[-1].strip() == '```':
+            lines = lines[:-1]
+        content = '\n'.join(lines).strip()
+    return content
+
+
+def validate_skill_content(content: str) -> Tuple[bool, Optional[str], str, List[str]]:
+    """
+    Validate generated SKILL.md content against Anthropic guidelines
+
+    Returns: (is_valid, error_message, cleaned_content, warnings)
+    """
+    content = strip_code_fences(content)
+    warnings = []
+
+    # Check 1: Has YAML frontmatter
+    if not content.startswith('---'):
+        return False, f"Missing YAML frontmatter (starts with: {content[:50]!r})", content, warnings
+
+    # Extract frontmatter
+    parts = content.split('---', 2)
+    if len(parts) < 3:
+        return False, "Invalid YAML frontmatter structure", content, warnings
+    frontmatter = parts[1].strip()
+    body = parts[2].strip()
+
+    # Check 2: Has required fields (name and description ONLY per Anthropic docs)
+    if 'name:' not in frontmatter:
+        return False, "Missing 'name' field in frontmatter", content, warnings
+    if 'description:' not in frontmatter:
+        return False, "Missing 'description' field in frontmatter", content, warnings
+
+    # Check 3: No invalid fields (Anthropic only allows name and description)
+    forbidden_fields = ['allowed-tools', 'tools', 'permissions', 'version', 'author']
+    for field in forbidden_fields:
+        if f'{field}:' in frontmatter.lower():
+            return False, f"Invalid field '{field}' in frontmatter (Anthropic only allows 'name' and 'description')", \
+                content, warnings
+
+    # Check 4: name is at most 64 characters
+    name_line = [l for l in frontmatter.split('\n') if l.strip().startswith('name:')]
+    if name_line:
+        name_value = name_line[0].split('name:', 1)[1].strip()
+        if len(name_value) > 64:
+            return False, f"Name exceeds 64 character limit ({len(name_value)} chars)", content, warnings
+
+    # Check 5: Line count (Anthropic recommends under 500 lines)
+    line_count = len(content.split('\n'))
+    if line_count > MAX_SKILL_LINES:
+        warnings.append(f"{line_count} lines (Anthropic recommends <{MAX_SKILL_LINES})")
+
+    # Check 6: Has actual content
+    if len(body) < 100:
+        return False, "Body content too short (less than 100 characters)", content, warnings
+
+    # Check 7: No placeholder text
+    for pattern in ['[Your', '[TODO', '[INSERT', '[PLACEHOLDER', 'TODO:', 'FIXME:']:
+        if pattern in content:
+            return False, f"Contains placeholder text: {pattern}", content, warnings
+
+    return True, None, content, warnings
+
+
+class AuditLog:
+    """
+    SQLite audit trail of every generation attempt, shared by all workers
+
+    NOTE: Stores absolute paths. When the codebase is moved to a new machine,
+    run scripts/update-skills-db-paths.sh to fix paths:
+      ./scripts/update-skills-db-paths.sh backups/skills-audit/skills_generation.db $(pwd)
+    """
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS skill_generations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    plugin_name TEXT NOT NULL,
+                    plugin_category TEXT NOT NULL,
+                    plugin_path TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    char_count INTEGER,
+                    line_count INTEGER,
+                    error_message TEXT,
+                    generation_time_seconds REAL,
+                    skill_content TEXT
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS validation_failures (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    plugin_name TEXT NOT NULL,
+                    reason TEXT NOT NULL,
+                    details TEXT
+                )
+            ''')
+            conn.commit()
+            conn.close()
+
+    def log_generation(self, plugin_name: str, plugin_category: str, plugin_path, status: str,
+                       char_count: int = None, line_count: int = None, error_message: str = None,
+                       generation_time: float = None, skill_content: str = None):
+        """Log one generation; a SUCCESS replaces the plugin's earlier ERROR records"""
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            if status == 'SUCCESS':
+                conn.execute("DELETE FROM skill_generations WHERE plugin_name = ? AND status = 'ERROR'",
+                             (plugin_name,))
+            conn.execute('''
+                INSERT INTO skill_generations
+                (timestamp, plugin_name, plugin_category, plugin_path, status,
+                 char_count, line_count, error_message, generation_time_seconds, skill_content)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (datetime.now().isoformat(), plugin_name, plugin_category, str(plugin_path), status,
+                  char_count, line_count, error_message, generation_time, skill_content))
+            conn.commit()
+            conn.close()
+
+    def log_validation_failure(self, plugin_name: str, reason: str, details: str = None):
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('''
+                INSERT INTO validation_failures (timestamp, plugin_name, reason, details)
+                VALUES (?, ?, ?, ?)
+            ''', (datetime.now().isoformat(), plugin_name, reason, details))
+            conn.commit()
+            conn.close()
+
+    def statistics(self) -> Dict[str, float]:
+        """Counts per status and averages of successful generations"""
+        with self.lock:
+            conn = sqlite3.connect(self.db_path)
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM skill_generations GROUP BY status"))
+            avg_time, avg_lines = conn.execute(
+                "SELECT AVG(generation_time_seconds), AVG(line_count) FROM skill_generations "
+                "WHERE status = 'SUCCESS'").fetchone()
+            conn.close()
+        return {
+            'success': counts.get('SUCCESS', 0),
+            'error': counts.get('ERROR', 0),
+            'validation_failed': counts.get('VALIDATION_FAILED', 0),
+            'avg_time': avg_time or 0,
+            'avg_lines': avg_lines or 0,
+        }
+
+
+class Backend:
+    """
+    One model on one provider. generate() returns a Generation or raises the
+    provider's error (rate_limiter.classify_error() recognizes throttling).
+    `provider` selects the rate-limit presets, `name` identifies the backend
+    in cache keys and `params` are the generation parameters sent with every
+    call.
+    """
+
+    name = None
+    provider = None
+    label = None
+
+    def __init__(self, model: str, params: Dict = None):
+        self.model = model
+        self.params = dict(params or {})
+
+    async def generate(self, prompt: str) -> Generation:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class AnthropicBackend(Backend):
+    name = 'anthropic'
+    provider = 'claude'
+    label = 'Claude API'
+
+    def __init__(self, api_key: str, model: str = 'claude-sonnet-4-20250514', max_tokens: int = 4096):
+        super().__init__(model, {'max_tokens': max_tokens})
+        from anthropic import AsyncAnthropic
+        # One client, one pooled set of HTTP connections; the SDK's own
+        # retries would hide 429s from the adaptive controller
+        self.client = AsyncAnthropic(api_key=api_key, max_retries=0)
+
+    async def generate(self, prompt: str) -> Generation:
+        raw = await self.client.messages.with_raw_response.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            **self.params
+        )
+        message = await raw.parse()
+        usage = getattr(message, 'usage', None)
+        return Generation(message.content[0].text,
+                          usage.input_tokens if usage else None,
+                          usage.output_tokens if usage else None,
+                          raw.headers)
+
+    async def close(self):
+        await self.client.close()
+
+
+def _gemini_generation(response) -> Generation:
+    usage = getattr(response, 'usage_metadata', None)
+    return Generation(response.text,
+                      usage.prompt_token_count if usage else None,
+                      usage.candidates_token_count if usage else None,
+                      None)
+
+
+class GeminiBackend(Backend):
+    name = 'gemini-api'
+    provider = 'gemini'
+    label = 'Gemini API'
+
+    def __init__(self, api_key: str, model: str = 'gemini-2.0-flash-exp'):
+        super().__init__(model)
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.client = genai.GenerativeModel(model)
+
+    async def generate(self, prompt: str) -> Generation:
+        return _gemini_generation(await self.client.generate_content_async(prompt))
+
+
+class VertexBackend(Backend):
+    name = 'vertex'
+    provider = 'gemini'
+    label = 'Vertex AI Gemini'
+
+    def __init__(self, project: str, location: str, model: str = 'gemini-2.0-flash-exp',
+                 generation_config: Dict = None):
+        super().__init__(model, generation_config or {"temperature": 0.7, "top_p": 0.9, "max_output_tokens": 2048})
+        import vertexai
+        from vertexai.generative_models import GenerativeModel, SafetySetting
+        vertexai.init(project=project, location=location)
+        self.client = GenerativeModel(model)
+        # Safety settings (allow creative output)
+        self.safety_settings = [
+            SafetySetting(
+                category=SafetySetting.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+                threshold=SafetySetting.HarmBlockThreshold.BLOCK_ONLY_HIGH
+            ),
+        ]
+
+    async def generate(self, prompt: str) -> Generation:
+        response = await self.client.generate_content_async(
+            prompt, safety_settings=self.safety_settings, generation_config=self.params)
+        return _gemini_generation(response)
+
+
+class StubRateLimitError(Exception):
+    """429 raised by StubBackend, shaped like the SDKs' errors"""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"429 rate limit exceeded (stub capacity), retry in {retry_after}s")
+        self.response = type('StubResponse', (), {'headers': {'retry-after': str(retry_after)}})()
+
+
+class StubBackend(Backend):
+    """
+    Deterministic offline backend: the same prompt always yields the same
+    valid SKILL.md and latency. With `capacity` set, calls beyond that many
+    in flight fail with a 429 like a real quota, to exercise the controller.
+    """
+
+    name = 'stub'
+    provider = 'gemini'
+    label = 'stub backend'
+
+    def __init__(self, latency: float = 0.05, capacity: int = None, retry_after: float = 0.5):
+        super().__init__('stub', {'latency': latency})
+        self.latency = latency
+        self.capacity = capacity
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.calls = 0
+
+    async def generate(self, prompt: str) -> Generation:
+        self.calls += 1
+        if self.capacity is not None and self.in_flight >= self.capacity:
+            raise StubRateLimitError(self.retry_after)
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        self.in_flight += 1
+        try:
+            # 0.5x to 1.5x the nominal latency, fixed per prompt
+            await asyncio.sleep(self.latency * (0.5 + int(digest[:4], 16) / 0xffff))
+        finally:
+            self.in_flight -= 1
+        match = re.search(r'^- Name: (.+)$', prompt, re.MULTILINE)
+        name = match.group(1).strip() if match else digest[:12]
+        text = f"""---
+name: Using {name[:50]}
+description: |
+  Generates and runs {name} workflows. Use when the user asks for {name} or mentions its commands.
+---
+
+## Overview
+
+This skill teaches Claude how to apply the {name} plugin (stub response {digest[:12]}).
+
+## How It Works
+
+1. **Inspect**: Read the relevant project files.
+2. **Apply**: Run the {name} commands with the right options.
+3. **Report**: Summarize the results for the user.
+"""
+        return Generation(text, estimate_tokens(prompt), estimate_tokens(text), None)
+
+
+class ResponseCache:
+    """
+    Content-addressed store of raw backend responses, one JSON file each.
+
+    The key hashes the backend, model, generation parameters and the full
+    prompt (plugin context and metadata included), so a rerun serves an
+    unchanged plugin for free while any change to its files misses.
+    SkillEngine only stores responses that passed validation. Reads refresh
+    an entry's mtime; once the cache grows past max_bytes the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.size = sum(path.stat().st_size for path in self._entries())
+
+    @staticmethod
+    def key(backend: Backend, prompt: str) -> str:
+        payload = json.dumps({
+            'backend': backend.name,
+            'model': backend.model,
+            'params': backend.params,
+            'prompt': prompt,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entries(self):
+        return self.directory.glob('*/*.json')
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}.json'
+
+    def get(self, key: str) -> Optional[Generation]:
+        path = self._path(key)
+        try:
+            data = json.loads(path.read_text())
+            os.utime(path)
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return Generation(data['text'], data['input_tokens'], data['output_tokens'], None)
+
+    def put(self, key: str, generation: Generation):
+        path = self._path(key)
+        encoded = json.dumps({
+            'text': generation.text,
+            'input_tokens': generation.input_tokens,
+            'output_tokens': generation.output_tokens,
+            'created': datetime.now().isoformat(),
+        }).encode('utf-8')
+        path.parent.mkdir(exist_ok=True)
+        # Write-then-rename, so a crash never leaves a truncated entry
+        temporary = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        temporary.write_bytes(encoded)
+        with self.lock:
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(temporary, path)
+            self.size += len(encoded) - previous
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        for _, size, path in entries:
+            if self.size <= self.max_bytes * CACHE_EVICT_TO:
+                break
+            path.unlink(missing_ok=True)
+            self.size -= size
+            self.evictions += 1
+
+    def describe(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses, {self.evictions} evicted, {self.size / 1024 / 1024:.1f} MB"
+
+
+def cache_from_argv(argv: List[str]) -> Tuple[Optional[ResponseCache], List[str]]:
+    """
+    ResponseCache configured from --cache-dir DIR and --cache-mb N, or None
+    with --no-cache; returns it with argv minus those options.
+    """
+    options = {}
+    remaining = []
+    args = iter(argv)
+    for arg in args:
+        if arg == '--no-cache':
+            options[arg] = True
+        elif arg in ('--cache-dir', '--cache-mb'):
+            options[arg] = next(args, None)
+        else:
+            remaining.append(arg)
+
+    if options.get('--no-cache'):
+        return None, remaining
+    try:
+        cache_mb = float(options.get('--cache-mb') or DEFAULT_CACHE_MB)
+    except ValueError:
+        raise ValueError(f"--cache-mb expects a size in MB, got '{options['--cache-mb']}'") from None
+    return ResponseCache(options.get('--cache-dir') or DEFAULT_CACHE_DIR, int(cache_mb * 1024 * 1024)), remaining
+
+
+def update_keywords(plugin_path: Path, source: str, marketplace_path: Path):
+    """Add the agent-skills keyword to plugin.json and to the plugin's marketplace entry"""
+
+    # Update plugin.json
+    plugin_json_path = Path(plugin_path) / '.claude-plugin' / 'plugin.json'
+    if plugin_json_path.exists():
+        with open(plugin_json_path, 'r') as f:
+            data = json.load(f)
+
+        if 'keywords' not in data:
+            data['keywords'] = []
+
+        if 'agent-skills' not in data['keywords']:
+            data['keywords'].append('agent-skills')
+
+        with open(plugin_json_path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+
+    # Update marketplace.extended.json
+    with open(marketplace_path, 'r') as f:
+        marketplace = json.load(f)
+
+    for plugin in marketplace['plugins']:
+        if plugin['source'] == source:
+            if 'keywords' not in plugin:
+                plugin['keywords'] = []
+            if 'agent-skills' not in plugin['keywords']:
+                plugin['keywords'].append('agent-skills')
+            break
+
+    with open(marketplace_path, 'w') as f:
+        json.dump(marketplace, f, indent=2)
+        f.write('\n')
+
+
+def keyword_updater(marketplace_path: Path) -> Callable[[Dict], None]:
+    """SkillEngine on_written callback that runs update_keywords() for each written skill"""
+    def add_keywords(job: Dict):
+        update_keywords(job['plugin_path'], job['entry']['source'], marketplace_path)
+        print(f"  ✅ {job['plugin']}: Updated keywords")
+    return add_keywords
+
+
+def plugin_jobs(plugins: List[Dict], repo_root: Path) -> List[Dict]:
+    """Pipeline jobs for marketplace plugin entries"""
+    jobs = []
+    for index, plugin in enumerate(plugins, 1):
+        plugin_path = Path(repo_root) / plugin['source'].lstrip('./')
+        jobs.append({
+            'index': index,
+            'total': len(plugins),
+            'plugin': plugin['name'],
+            'entry': plugin,
+            'plugin_path': plugin_path,
+            'skill_file': plugin_path / 'skills' / 'skill-adapter' / 'SKILL.md',
+        })
+    return jobs
+
+
+class SkillEngine:
+    """
+    Generate SKILL.md files for pipeline jobs with any Backend.
+
+    Stages: read context -> build prompt -> generate -> write. The generate
+    stage validates each response and regenerates an invalid one, for up to
+    `validation_attempts` calls (a failed validation means another API call);
+    throttled calls are retried by call_with_retries_async(). With a cache,
+    the first attempt is served from it when possible and only responses
+    that pass validation are stored, so an invalid response is never
+    replayed.
+    on_written(job) runs in the write stage after the file is saved (e.g.
+    keyword updates).
+    """
+
+    def __init__(self, backend: Backend, limiter: RateLimiter = None, concurrency: AsyncAdaptiveConcurrency = None,
+                 audit: AuditLog = None, validate: bool = True, validation_attempts: int = MAX_RETRIES,
+                 max_retries: int = MAX_RETRIES, retry_delay: float = RETRY_DELAY,
+                 cache: ResponseCache = None, on_written: Callable[[Dict], None] = None, verbose: bool = True):
+        self.backend = backend
+        self.limiter = limiter if limiter is not None else RateLimiter({})
+        self.concurrency = concurrency or AsyncAdaptiveConcurrency(maximum=MAX_CONCURRENCY)
+        self.audit = audit
+        self.validate = validate
+        self.validation_attempts = validation_attempts
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.cache = cache
+        self.on_written = on_written
+        self.verbose = verbose
+
+    def _print(self, message: str):
+        if self.verbose:
+            print(message)
+
+    # Stages
+
+    def read_context(self, job: Dict):
+        """Skip existing skills, then read plugin.json and the plugin's files"""
+        self._print(f"\n🎯 [{job['index']}/{job['total']}] Processing: {job['plugin']}")
+        job['started'] = time.time()
+
+        if job['skill_file'].exists():
+            self._print(f"  ⏭️  {job['plugin']}: SKILL.md already exists")
+            job['status'] = 'skipped'
+            return
+
+        plugin_json_path = job['plugin_path'] / '.claude-plugin' / 'plugin.json'
+        with open(plugin_json_path, 'r') as f:
+            plugin_json = json.load(f)
+        entry = job.get('entry', {})
+        job['category'] = entry.get('category') or plugin_json.get('category', 'unknown')
+        job['description'] = entry.get('description') or plugin_json.get('description', '')
+        job['context'] = read_plugin_context(job['plugin_path'])
+
+    def build_prompt(self, job: Dict):
+        job['prompt'] = build_prompt(job['plugin'], job['category'], job['description'], job['context'])
+
+    async def call_backend(self, prompt: str) -> Generation:
+        """One rate-limited, retried backend call"""
+        input_estimate = estimate_tokens(prompt)
+
+        async def request():
+            generation = await self.backend.generate(prompt)
+            self.limiter.observe_headers(generation.headers)
+            return generation
+
+        generation = await call_with_retries_async(request, self.concurrency, self.limiter,
+                                                   input_tokens=input_estimate,
+                                                   output_tokens=ESTIMATED_OUTPUT_TOKENS,
+                                                   max_retries=self.max_retries, retry_delay=self.retry_delay,
+                                                   on_retry=retry_reporter(self.concurrency, self.max_retries)
+                                                   if self.verbose else None)
+        self.limiter.record_usage(input_estimate, ESTIMATED_OUTPUT_TOKENS,
+                                  generation.input_tokens, generation.output_tokens)
+        return generation
+
+    async def generate(self, job: Dict):
+        self._print(f"  🤖 {job['plugin']}: Generating with {self.backend.label}...")
+        key = cached = None
+        if self.cache is not None:
+            key = ResponseCache.key(self.backend, job['prompt'])
+            cached = await asyncio.to_thread(self.cache.get, key)
+        for attempt in range(1, self.validation_attempts + 1):
+            # A cached response is used once; if it no longer validates,
+            # the remaining attempts go to the backend
+            from_cache = cached is not None
+            if from_cache:
+                self._print(f"  ♻️  {job['plugin']}: Cached response")
+                generation, cached = cached, None
+            else:
+                generation = await self.call_backend(job['prompt'])
+            if not self.validate:
+                job['content'] = strip_code_fences(generation.text)
+                if key and not from_cache:
+                    await asyncio.to_thread(self.cache.put, key, generation)
+                return
+            is_valid, error_msg, content, warnings = validate_skill_content(generation.text)
+            if is_valid:
+                if key and not from_cache:
+                    await asyncio.to_thread(self.cache.put, key, generation)
+                job['content'] = content
+                for warning in warnings:
+                    self._print(f"  ⚠️  {job['plugin']}: {warning}")
+                    if self.audit:
+                        await asyncio.to_thread(self.audit.log_validation_failure, job['plugin'],
+                                                "Exceeds 500-line recommendation", warning)
+                return
+            if self.audit:
+                await asyncio.to_thread(self.audit.log_validation_failure, job['plugin'], "Failed validation",
+                                        error_msg)
+            if attempt < self.validation_attempts:
+                self._print(f"  ⚠️  {job['plugin']}: Validation failed: {error_msg}, "
+                            f"retrying ({attempt}/{self.validation_attempts})")
+        job.update(status='validation_failed', error=error_msg)
+
+    def write(self, job: Dict):
+        skill_content = job['content']
+        if not skill_content:
+            raise ValueError("Empty response")
+        job['skill_file'].parent.mkdir(parents=True, exist_ok=True)
+        job['skill_file'].write_text(skill_content)
+
+        job['chars'] = len(skill_content)
+        job['lines'] = len(skill_content.split('\n'))
+        job['seconds'] = time.time() - job['started']
+        if self.audit:
+            self.audit.log_generation(job['plugin'], job['category'], job['plugin_path'], 'SUCCESS',
+                                      char_count=job['chars'], line_count=job['lines'],
+                                      generation_time=job['seconds'], skill_content=skill_content)
+        self._print(f"  ✅ {job['plugin']}: Created SKILL.md ({job['chars']} chars, {job['lines']} lines)")
+        if self.on_written is not None:
+            self.on_written(job)
+
+    async def finish(self, job: Dict):
+        """Log a failed job (called as each job leaves the pipeline)"""
+        if job['status'] not in ('error', 'validation_failed'):
+            return
+        job['seconds'] = time.time() - job['started']
+        self._print(f"  ❌ {job['plugin']}: {job['error']}")
+        if self.audit:
+            await asyncio.to_thread(self.audit.log_generation, job['plugin'], job.get('category', 'unknown'),
+                                    job['plugin_path'],
+                                    'ERROR' if job['status'] == 'error' else 'VALIDATION_FAILED',
+                                    error_message=job['error'], generation_time=job['seconds'])
+
+    async def run(self, jobs: List[Dict]) -> List[Dict]:
+        """Stream the jobs through the pipeline; returns them with their 'status'"""
+        stages = [
+            Stage('context', self.read_context, blocking=True),
+            Stage('prompt', self.build_prompt),
+            Stage('generate', self.generate, workers=self.concurrency.maximum),
+            Stage('write', self.write, blocking=True),
+        ]
+        try:
+            return await run_pipeline(jobs, stages, on_done=self.finish)
+        finally:
+            await self.backend.close()
+
+
+def summarize(results: List[Dict]) -> Dict[str, int]:
+    """Job count per status"""
+    counts = {'success': 0, 'skipped': 0, 'error': 0, 'validation_failed': 0}
+    for job in results:
+        counts[job['status']] = counts.get(job['status'], 0) + 1
+    return counts
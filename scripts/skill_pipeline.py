@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Asyncio pipeline shared by the skill generators
+
+Plugins stream through stages connected by bounded queues:
+
+    read context -> build prompt -> API call -> validate -> write
+
+Each stage runs its own workers on one event loop, so hundreds of plugins
+can be in different stages at once: context for the next plugins is read
+while earlier prompts wait on the API, and finished skills are written
+while new calls are in flight. The bounded queues hold the readers back
+when the API stage falls behind. Blocking stages (file and SQLite I/O) run
+in the default thread pool; the API stage awaits the provider's async
+client, gated by AsyncAdaptiveConcurrency and the token buckets
+(rate_limiter.py), so its in-flight count follows the account's quota.
+
+A job is a dict describing one plugin. Stage handlers update it in place;
+a handler that sets job['status'] (e.g. 'skipped') ends the job early, and
+an exception ends it with status 'error'. An exception from on_done is
+recorded in job['on_done_error'] and never stops a worker.
+
+Usage:
+    stages = [
+        Stage('context', read_context, blocking=True),
+        Stage('prompt', build_prompt),
+        Stage('api', call_api, workers=MAX_CONCURRENCY),
+        Stage('validate', validate),
+        Stage('write', write_skill, blocking=True),
+    ]
+    results = asyncio.run(run_pipeline(jobs, stages, on_done=report))
+"""
+
+import asyncio
+import inspect
+from typing import Callable, Dict, Iterable, List
+
+QUEUE_SIZE = 32  # jobs buffered between two stages
+
+
+class Stage:
+    """One pipeline step: handler(job) with `workers` concurrent workers"""
+
+    def __init__(self, name: str, handler: Callable, workers: int = 1, blocking: bool = False):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.blocking = blocking
+
+    async def run(self, job: Dict):
+        if self.blocking:
+            result = await asyncio.to_thread(self.handler, job)
+        else:
+            result = self.handler(job)
+        if inspect.isawaitable(result):
+            await result
+
+
+async def run_pipeline(jobs: Iterable[Dict], stages: List[Stage], queue_size: int = QUEUE_SIZE,
+                       on_done: Callable[[Dict], None] = None) -> List[Dict]:
+    """
+    Push every job through the stages; returns the jobs in completion order,
+    each with a 'status' ('success' once it passed the last stage) and, for
+    errors, 'error' and the failing 'stage'. on_done(job) (a function or a
+    coroutine function) is called as each job finishes.
+    """
+    queues = [asyncio.Queue(queue_size) for _ in stages]
+    finished = []
+
+    async def finish(job):
+        job.setdefault('status', 'success')
+        finished.append(job)
+        if on_done is None:
+            return
+        # A failing callback must not kill the worker: the jobs behind it
+        # would never be consumed and queue.join() would wait forever
+        try:
+            result = on_done(job)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            job['on_done_error'] = str(e)
+
+    async def work(index: int, stage: Stage):
+        source = queues[index]
+        while True:
+            job = await source.get()
+            try:
+                try:
+                    await stage.run(job)
+                except Exception as e:
+                    job.update(status='error', error=str(e), stage=stage.name)
+                if 'status' in job or index + 1 == len(stages):
+                    await finish(job)
+                else:
+                    await queues[index + 1].put(job)
+            finally:
+                source.task_done()
+
+    workers = [asyncio.create_task(work(index, stage))
+               for index, stage in enumerate(stages) for _ in range(stage.workers)]
+    try:
+        for job in jobs:
+            await queues[0].put(job)
+        # A job reaches the next queue before it is marked done in this one
+        for queue in queues:
+            await queue.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    return finished
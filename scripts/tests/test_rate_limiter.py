@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared rate limiter
+Token buckets, header-learned limits, error classification and the AIMD
+concurrency controller, driven by an injected clock and sleep
+"""
+
+import asyncio
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rate_limiter import (AdaptiveConcurrency, AsyncAdaptiveConcurrency, RateLimiter, RateLimitExceeded,
+                          TokenBucket, call_with_retries_async, classify_error, limiter_from_argv)
+from skill_engine import StubBackend, StubRateLimitError
+
+
+class FakeClock:
+    """Monotonic clock that only moves when sleep() is awaited"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+class ApiError(Exception):
+    """SDK-style error with a status code and response headers"""
+
+    def __init__(self, message, status_code=None, headers=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = type('Response', (), {'headers': headers or {}})()
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_refill_is_capped_at_capacity(self):
+        bucket = TokenBucket(rate=2.0, capacity=10, now=0)
+        bucket.take(10)
+        bucket.refill(3)
+        self.assertEqual(bucket.tokens, 6)
+        bucket.refill(100)
+        self.assertEqual(bucket.tokens, 10)
+
+    def test_debt_and_delay(self):
+        bucket = TokenBucket(rate=1.0, capacity=2, now=0)
+        self.assertEqual(bucket.delay(2), 0)
+        bucket.take(5)
+        self.assertEqual(bucket.tokens, -3)
+        self.assertEqual(bucket.delay(1), 4)
+        # Negative amounts give units back, never past capacity
+        bucket.take(-10)
+        self.assertEqual(bucket.tokens, 2)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def limiter(self, limits, **kwargs):
+        return RateLimiter(limits, clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_burst_then_reservation_order(self):
+        limiter = self.limiter({'requests_per_minute': 60})
+        waits = [limiter.reserve() for _ in range(62)]
+        self.assertEqual(waits[:60], [0.0] * 60)
+        # Each later caller waits for the debt of the ones ahead of it
+        self.assertAlmostEqual(waits[60], 1.0)
+        self.assertAlmostEqual(waits[61], 2.0)
+        self.assertEqual(limiter.requests, 62)
+
+    def test_burst_fraction_limits_capacity(self):
+        limiter = self.limiter({'requests_per_minute': 60}, burst=0.1)
+        waits = [limiter.reserve() for _ in range(7)]
+        self.assertEqual(waits[:6], [0.0] * 6)
+        self.assertAlmostEqual(waits[6], 1.0)
+
+    def test_token_dimensions(self):
+        limiter = self.limiter({'input_tokens_per_minute': 600, 'output_tokens_per_minute': 60})
+        self.assertEqual(limiter.reserve(input_tokens=100, output_tokens=60), 0)
+        # Output bucket is empty: 30 output tokens take 30 seconds at 1/s
+        self.assertAlmostEqual(limiter.reserve(input_tokens=100, output_tokens=30), 30.0)
+
+    def test_acquire_async_sleeps_for_the_wait(self):
+        limiter = self.limiter({'requests_per_minute': 60}, burst=1 / 60)
+        start = self.clock.now
+
+        async def three():
+            return [await limiter.acquire_async() for _ in range(3)]
+
+        self.assertEqual(asyncio.run(three()), [0.0, 1.0, 1.0])
+        self.assertAlmostEqual(self.clock.now - start, 2.0)
+        self.assertAlmostEqual(limiter.waited_seconds, 2.0)
+
+    def test_record_usage_corrects_estimates(self):
+        limiter = self.limiter({'output_tokens_per_minute': 600})
+        limiter.reserve(output_tokens=500)
+        limiter.record_usage(0, 500, actual_output=100)
+        self.assertAlmostEqual(limiter.buckets['output_tokens_per_minute'].tokens, 500)
+        limiter.record_usage(0, 100, actual_output=1100)
+        self.assertAlmostEqual(limiter.buckets['output_tokens_per_minute'].tokens, -500)
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            self.limiter({'requests_per_hour': 5})
+        with self.assertRaises(ValueError):
+            self.limiter({}, burst=0)
+
+    def test_min_duration(self):
+        limiter = self.limiter({'requests_per_minute': 60})
+        self.assertEqual(limiter.min_duration(60), 0)
+        self.assertAlmostEqual(limiter.min_duration(120), 60.0)
+        self.assertEqual(self.limiter({}).min_duration(1000), 0)
+
+
+class TestObserveHeaders(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_reported_limits_replace_presets(self):
+        limiter = RateLimiter({'requests_per_minute': 5, 'tokens_per_minute': 10_000, 'requests_per_day': 50},
+                              clock=self.clock)
+        limiter.observe_headers({
+            'anthropic-ratelimit-requests-limit': '50',
+            'anthropic-ratelimit-input-tokens-limit': '30000',
+            'anthropic-ratelimit-output-tokens-limit': '8000',
+        })
+        self.assertEqual(limiter.limits['requests_per_minute'], 50)
+        self.assertEqual(limiter.limits['input_tokens_per_minute'], 30000)
+        self.assertEqual(limiter.limits['output_tokens_per_minute'], 8000)
+        # The combined preset is not reported, so it no longer applies; daily caps stay
+        self.assertNotIn('tokens_per_minute', limiter.limits)
+        self.assertNotIn('tokens_per_minute', limiter.buckets)
+        self.assertEqual(limiter.limits['requests_per_day'], 50)
+
+    def test_pinned_limits_are_kept(self):
+        limiter, args = limiter_from_argv('claude', 'free', ['plugin-a', '--rpm', '3', '--tpm', '9000'])
+        self.assertEqual(args, ['plugin-a'])
+        self.assertEqual(limiter.pinned, {'requests_per_minute', 'tokens_per_minute'})
+        limiter.observe_headers({'anthropic-ratelimit-requests-limit': '50',
+                                 'anthropic-ratelimit-input-tokens-limit': '30000'})
+        self.assertEqual(limiter.limits['requests_per_minute'], 3)
+        self.assertEqual(limiter.limits['tokens_per_minute'], 9000)
+        self.assertEqual(limiter.limits['input_tokens_per_minute'], 30000)
+
+    def test_remaining_caps_the_balance(self):
+        limiter = RateLimiter({'requests_per_minute': 100}, clock=self.clock)
+        limiter.observe_headers({'x-ratelimit-limit-requests': '100', 'x-ratelimit-remaining-requests': '3'})
+        self.assertEqual(limiter.buckets['requests_per_minute'].tokens, 3)
+        self.assertEqual([limiter.reserve() for _ in range(3)], [0.0] * 3)
+        self.assertGreater(limiter.reserve(), 0)
+
+    def test_missing_or_malformed_headers(self):
+        limiter = RateLimiter({'requests_per_minute': 5}, clock=self.clock)
+        limiter.observe_headers(None)
+        limiter.observe_headers({'anthropic-ratelimit-requests-limit': 'n/a'})
+        self.assertEqual(limiter.limits, {'requests_per_minute': 5})
+
+
+class TestClassifyError(unittest.TestCase):
+
+    def test_status_codes_and_retry_after(self):
+        self.assertEqual(classify_error(ApiError('Too many', 429, {'retry-after': '12'})), ('rate_limited', 12.0))
+        self.assertEqual(classify_error(ApiError('Too many', 429, {'retry-after-ms': '1500'})),
+                         ('rate_limited', 1.5))
+        self.assertEqual(classify_error(ApiError('Overloaded', 529)), ('overloaded', None))
+        self.assertEqual(classify_error(ApiError('Unavailable', 503)), ('overloaded', None))
+
+    def test_messages(self):
+        self.assertEqual(classify_error(Exception('429 Resource exhausted. Please retry in 7.5s.')),
+                         ('rate_limited', 7.5))
+        self.assertEqual(classify_error(Exception('Quota exceeded retry_delay { seconds: 31 }')),
+                         ('rate_limited', 31.0))
+        self.assertEqual(classify_error(StubRateLimitError(0.25)), ('rate_limited', 0.25))
+
+    def test_other_errors(self):
+        self.assertEqual(classify_error(ValueError('Missing YAML frontmatter')), (None, None))
+        self.assertEqual(classify_error(ApiError('Bad request', 400)), (None, None))
+
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def controller(self, **kwargs):
+        return AdaptiveConcurrency(clock=self.clock, rng=random.Random(1), **kwargs)
+
+    def start(self, controller):
+        controller.in_flight += 1
+        return self.clock()
+
+    def test_slow_start_then_additive_increase(self):
+        controller = self.controller(initial=2, maximum=64)
+        for _ in range(4):
+            controller._record(self.start(controller), 'success')
+        self.assertEqual(controller.limit, 6)
+
+        controller._record(self.start(controller), 'throttled')
+        self.assertEqual(controller.limit, 3)
+        controller._record(self.start(controller), 'success')
+        self.assertAlmostEqual(controller.limit, 3 + 1 / 3)
+        self.assertEqual(controller.peak, 6)
+
+    def test_one_decrease_per_congestion_event(self):
+        controller = self.controller(initial=16, maximum=16)
+        started = [self.start(controller) for _ in range(3)]
+        self.clock.now += 1
+        for when in started:
+            controller._record(when, 'throttled')
+        self.assertEqual(controller.limit, 8)
+        self.assertEqual(controller.throttles, 3)
+
+        # A call started after the decrease signals a new event
+        self.clock.now += 1
+        controller._record(self.start(controller), 'throttled')
+        self.assertEqual(controller.limit, 4)
+
+    def test_bounds_and_errors(self):
+        controller = self.controller(initial=2, maximum=3, minimum=1)
+        for _ in range(5):
+            controller._record(self.start(controller), 'success')
+        self.assertEqual(controller.limit, 3)
+        controller._record(self.start(controller), 'error')
+        self.assertEqual(controller.limit, 3)
+        for _ in range(5):
+            self.clock.now += 1
+            controller._record(self.start(controller), 'throttled')
+        self.assertEqual(controller.limit, 1)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_admission_and_jittered_pause(self):
+        controller = self.controller(initial=2, jitter=0.25)
+        self.assertEqual(controller._admission_delay(self.clock()), 0)
+        controller.in_flight = 2
+        self.assertIsNone(controller._admission_delay(self.clock()))
+
+        controller.in_flight = 0
+        controller._extend_pause(8)
+        delays = [controller._admission_delay(self.clock()) for _ in range(20)]
+        self.assertTrue(all(8 <= delay <= 10 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+        # A shorter pause does not cut a longer one short
+        controller._extend_pause(1)
+        self.assertEqual(controller.paused_until, self.clock() + 8)
+        self.clock.now += 8
+        self.assertEqual(controller._admission_delay(self.clock()), 0)
+
+
+class TestAsyncCalls(unittest.TestCase):
+
+    def test_concurrency_cap_is_respected(self):
+        concurrency = AsyncAdaptiveConcurrency(initial=3, maximum=3)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            started = await concurrency.acquire()
+            peak = max(peak, concurrency.in_flight)
+            await asyncio.sleep(0.005)
+            await concurrency.release(started)
+
+        async def main():
+            await asyncio.gather(*(call() for _ in range(12)))
+
+        asyncio.run(main())
+        self.assertEqual(peak, 3)
+        self.assertEqual(concurrency.in_flight, 0)
+        self.assertEqual(concurrency.successes, 12)
+
+    def test_retries_throttled_calls(self):
+        attempts = []
+        retries = []
+
+        async def request():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise StubRateLimitError(0.01)
+            return 'ok'
+
+        concurrency = AsyncAdaptiveConcurrency(initial=4)
+        result = asyncio.run(call_with_retries_async(request, concurrency, max_retries=3,
+                                                     on_retry=lambda *args: retries.append(args)))
+        self.assertEqual(result, 'ok')
+        self.assertEqual(retries, [('rate_limited', 1, 0.01), ('rate_limited', 2, 0.01)])
+        self.assertEqual(concurrency.throttles, 2)
+        self.assertEqual(concurrency.in_flight, 0)
+
+    def test_gives_up_after_max_retries(self):
+        async def request():
+            raise StubRateLimitError(0.01)
+
+        with self.assertRaises(RateLimitExceeded):
+            asyncio.run(call_with_retries_async(request, AsyncAdaptiveConcurrency(), max_retries=2))
+
+    def test_other_errors_are_not_retried(self):
+        attempts = []
+
+        async def request():
+            attempts.append(1)
+            raise ValueError('bad request')
+
+        with self.assertRaises(ValueError):
+            asyncio.run(call_with_retries_async(request, AsyncAdaptiveConcurrency(), max_retries=3))
+        self.assertEqual(len(attempts), 1)
+
+    def test_controller_converges_on_stub_capacity(self):
+        backend = StubBackend(latency=0.01, capacity=3, retry_after=0.01)
+        concurrency = AsyncAdaptiveConcurrency(initial=2, maximum=16)
+
+        async def main():
+            calls = [call_with_retries_async(lambda i=i: backend.generate(f'- Name: plugin-{i}'), concurrency,
+                                             max_retries=20, retry_delay=0.01)
+                     for i in range(40)]
+            return await asyncio.gather(*calls)
+
+        results = asyncio.run(main())
+        self.assertEqual(len(results), 40)
+        self.assertGreater(concurrency.throttles, 0)
+        self.assertLessEqual(int(concurrency.limit), 6)
+        self.assertEqual(backend.in_flight, 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared skill generation engine
+Backends are driven through fakes and the offline StubBackend; no API key needed
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from skill_engine import (AnthropicBackend, Generation, ResponseCache, SkillEngine, StubBackend, keyword_updater,
+                          plugin_jobs, summarize)
+
+
+class FakeAsyncRawResponse:
+    """AsyncAPIResponse as returned by AsyncAnthropic's with_raw_response: parse() is a coroutine"""
+
+    def __init__(self, message, headers):
+        self.message = message
+        self.headers = headers
+
+    async def parse(self):
+        return self.message
+
+
+class FakeAsyncAnthropic:
+    def __init__(self, api_key=None, max_retries=None):
+        self.max_retries = max_retries
+        self.requests = []
+        self.closed = False
+        self.messages = types.SimpleNamespace(
+            with_raw_response=types.SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.requests.append(kwargs)
+        message = types.SimpleNamespace(
+            content=[types.SimpleNamespace(text='---\nname: Testing\n---\nbody')],
+            usage=types.SimpleNamespace(input_tokens=120, output_tokens=340))
+        return FakeAsyncRawResponse(message, {'anthropic-ratelimit-requests-limit': '50'})
+
+    async def close(self):
+        self.closed = True
+
+
+class TestAnthropicBackend(unittest.TestCase):
+
+    def setUp(self):
+        fake_sdk = types.ModuleType('anthropic')
+        fake_sdk.AsyncAnthropic = FakeAsyncAnthropic
+        patcher = mock.patch.dict(sys.modules, {'anthropic': fake_sdk})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_generate_awaits_raw_response(self):
+        backend = AnthropicBackend('key', max_tokens=1000)
+        generation = asyncio.run(backend.generate('prompt'))
+
+        self.assertEqual(generation.text, '---\nname: Testing\n---\nbody')
+        self.assertEqual((generation.input_tokens, generation.output_tokens), (120, 340))
+        self.assertEqual(generation.headers['anthropic-ratelimit-requests-limit'], '50')
+        self.assertEqual(backend.client.requests[0]['max_tokens'], 1000)
+        self.assertEqual(backend.client.requests[0]['messages'], [{'role': 'user', 'content': 'prompt'}])
+        # SDK retries stay off so 429s reach the adaptive controller
+        self.assertEqual(backend.client.max_retries, 0)
+
+    def test_close(self):
+        backend = AnthropicBackend('key')
+        asyncio.run(backend.close())
+        self.assertTrue(backend.client.closed)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.backend = StubBackend()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def generation(self, size=1000):
+        return Generation('x' * size, 10, 20, {'ignored': 'headers'})
+
+    def test_round_trip_and_counters(self):
+        cache = ResponseCache(self.directory)
+        key = ResponseCache.key(self.backend, 'prompt')
+        self.assertIsNone(cache.get(key))
+        cache.put(key, self.generation(5))
+        self.assertEqual(cache.get(key), Generation('xxxxx', 10, 20, None))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # The size survives a restart
+        self.assertEqual(ResponseCache(self.directory).size, cache.size)
+
+    def test_key_covers_backend_model_params_and_prompt(self):
+        key = ResponseCache.key(self.backend, 'prompt')
+        self.assertEqual(key, ResponseCache.key(StubBackend(), 'prompt'))
+        self.assertNotEqual(key, ResponseCache.key(self.backend, 'prompt '))
+        self.assertNotEqual(key, ResponseCache.key(StubBackend(latency=1), 'prompt'))
+        other_model = StubBackend()
+        other_model.model = 'stub-2'
+        self.assertNotEqual(key, ResponseCache.key(other_model, 'prompt'))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ResponseCache(self.directory, max_bytes=4000)
+        keys = [ResponseCache.key(self.backend, f'prompt {i}') for i in range(3)]
+        for age, key in zip((30, 20, 10), keys):
+            cache.put(key, self.generation())
+            stamp = os.stat(cache._path(key)).st_mtime - age
+            os.utime(cache._path(key), (stamp, stamp))
+        # Reading the oldest entry makes it the most recently used
+        self.assertIsNotNone(cache.get(keys[0]))
+
+        cache.put(ResponseCache.key(self.backend, 'prompt 3'), self.generation())
+
+        # Four entries exceed the limit; dropping the oldest gets under 90% of it
+        self.assertLessEqual(cache.size, 4000 * 0.9)
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNotNone(cache.get(keys[2]))
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = ResponseCache(self.directory)
+        key = ResponseCache.key(self.backend, 'prompt')
+        cache.put(key, self.generation())
+        cache._path(key).write_text('{truncated')
+        self.assertIsNone(cache.get(key))
+
+
+class InvalidStubBackend(StubBackend):
+    """Stub whose responses never pass validation (no frontmatter)"""
+
+    async def generate(self, prompt):
+        generation = await super().generate(prompt)
+        return generation._replace(text=generation.text.replace('---', '', 1))
+
+
+def create_plugins(root, count):
+    plugins = []
+    for i in range(count):
+        name = f'plugin-{i}'
+        base = root / 'plugins' / 'testing' / name
+        (base / '.claude-plugin').mkdir(parents=True)
+        (base / '.claude-plugin' / 'plugin.json').write_text(json.dumps({'name': name, 'category': 'testing'}))
+        (base / 'README.md').write_text(f'# {name}\n\nDocumentation for {name}.')
+        plugins.append({'name': name, 'source': f'./plugins/testing/{name}', 'description': name})
+    return plugins
+
+
+class TestSkillEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.plugins = create_plugins(self.root, 4)
+        self.cache = ResponseCache(self.root / 'cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def run_engine(self, backend, **kwargs):
+        engine = SkillEngine(backend, cache=self.cache, retry_delay=0.01, verbose=False, **kwargs)
+        return summarize(asyncio.run(engine.run(plugin_jobs(self.plugins, self.root))))
+
+    def delete_skills(self):
+        for skill_file in self.root.glob('plugins/*/*/skills/*/SKILL.md'):
+            skill_file.unlink()
+
+    def test_generates_and_skips_existing(self):
+        backend = StubBackend(latency=0.001)
+        self.assertEqual(self.run_engine(backend)['success'], 4)
+        self.assertEqual(len(list(self.root.glob('plugins/*/*/skills/skill-adapter/SKILL.md'))), 4)
+        self.assertEqual(self.run_engine(StubBackend(latency=0.001))['skipped'], 4)
+
+    def test_rerun_served_from_cache(self):
+        self.run_engine(StubBackend(latency=0.001))
+        self.delete_skills()
+        backend = StubBackend(latency=0.001)
+        self.assertEqual(self.run_engine(backend)['success'], 4)
+        self.assertEqual(backend.calls, 0)
+        self.assertEqual(self.cache.hits, 4)
+
+    def test_invalid_responses_not_cached(self):
+        backend = InvalidStubBackend(latency=0.001)
+        self.assertEqual(self.run_engine(backend, validation_attempts=2)['validation_failed'], 4)
+        self.assertEqual(backend.calls, 8)
+        self.assertEqual(list(self.cache.directory.glob('*/*.json')), [])
+
+        # The next run goes back to the API instead of replaying failures
+        backend = StubBackend(latency=0.001)
+        self.assertEqual(self.run_engine(backend)['success'], 4)
+        self.assertEqual(backend.calls, 4)
+
+    def test_cached_response_failing_validation_is_replaced(self):
+        backend = StubBackend(latency=0.001)
+        # Seed every plugin's key with an invalid response
+        engine = SkillEngine(backend, verbose=False)
+        jobs = plugin_jobs(self.plugins, self.root)
+        for job in jobs:
+            engine.read_context(job)
+            engine.build_prompt(job)
+            self.cache.put(ResponseCache.key(backend, job['prompt']), Generation('not a skill', 1, 1, None))
+
+        self.assertEqual(self.run_engine(backend)['success'], 4)
+        self.assertEqual(backend.calls, 4)
+        self.delete_skills()
+        backend = StubBackend(latency=0.001)
+        self.assertEqual(self.run_engine(backend)['success'], 4)
+        self.assertEqual(backend.calls, 0)
+
+    def test_keyword_updater(self):
+        marketplace = self.root / 'marketplace.extended.json'
+        marketplace.write_text(json.dumps({'plugins': [dict(plugin, keywords=['testing']) for plugin in self.plugins]}))
+
+        self.run_engine(StubBackend(latency=0.001), on_written=keyword_updater(marketplace))
+
+        for plugin in json.loads(marketplace.read_text())['plugins']:
+            self.assertEqual(plugin['keywords'], ['testing', 'agent-skills'])
+        plugin_json = self.root / 'plugins' / 'testing' / 'plugin-0' / '.claude-plugin' / 'plugin.json'
+        self.assertEqual(json.loads(plugin_json.read_text())['keywords'], ['agent-skills'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
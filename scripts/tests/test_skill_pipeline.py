@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the asyncio skill generation pipeline
+"""
+
+import asyncio
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from skill_pipeline import Stage, run_pipeline
+
+
+def run(jobs, stages, **kwargs):
+    # A hang is a failure, not a stuck test run
+    return asyncio.run(asyncio.wait_for(run_pipeline(jobs, stages, **kwargs), timeout=5))
+
+
+class TestRunPipeline(unittest.TestCase):
+
+    def test_jobs_pass_every_stage_in_order(self):
+        def step(name):
+            return lambda job: job['trace'].append(name)
+
+        stages = [Stage('a', step('a')), Stage('b', step('b'), workers=4), Stage('c', step('c'), blocking=True)]
+        results = run([{'n': n, 'trace': []} for n in range(20)], stages, queue_size=3)
+
+        self.assertEqual(sorted(job['n'] for job in results), list(range(20)))
+        for job in results:
+            self.assertEqual(job['status'], 'success')
+            self.assertEqual(job['trace'], ['a', 'b', 'c'])
+
+    def test_status_ends_job_early(self):
+        def skip_odd(job):
+            if job['n'] % 2:
+                job['status'] = 'skipped'
+
+        reached = []
+        results = run([{'n': n} for n in range(6)],
+                      [Stage('check', skip_odd), Stage('last', lambda job: reached.append(job['n']))])
+
+        self.assertEqual(sorted(reached), [0, 2, 4])
+        self.assertEqual(sorted(job['n'] for job in results if job['status'] == 'skipped'), [1, 3, 5])
+
+    def test_exception_marks_job_failed(self):
+        def explode(job):
+            if job['n'] == 2:
+                raise ValueError('boom')
+
+        done = []
+        results = run([{'n': n} for n in range(4)], [Stage('first', explode), Stage('second', lambda job: None)],
+                      on_done=done.append)
+
+        failed = [job for job in results if job['status'] == 'error']
+        self.assertEqual(len(failed), 1)
+        self.assertEqual((failed[0]['n'], failed[0]['error'], failed[0]['stage']), (2, 'boom', 'first'))
+        self.assertEqual(len(done), 4)
+
+    def test_blocking_stage_runs_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        threads = []
+
+        run([{}], [Stage('io', lambda job: threads.append(threading.get_ident()), blocking=True)])
+        self.assertNotEqual(threads, [loop_thread])
+
+    def test_async_stage_workers_overlap(self):
+        active = peak = 0
+
+        async def call(job):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        run([{} for _ in range(20)], [Stage('api', call, workers=5)], queue_size=2)
+        self.assertEqual(peak, 5)
+
+    def test_on_done_exception_does_not_stall_workers(self):
+        def fail(job):
+            raise RuntimeError('database is locked')
+
+        jobs = [{'n': n} for n in range(50)]
+        results = run(jobs, [Stage('one', lambda job: None)], queue_size=2, on_done=fail)
+
+        self.assertEqual(len(results), 50)
+        self.assertTrue(all(job['status'] == 'success' for job in results))
+        self.assertTrue(all(job['on_done_error'] == 'database is locked' for job in results))
+
+    def test_coroutine_on_done_is_awaited(self):
+        seen = []
+
+        async def record(job):
+            await asyncio.sleep(0)
+            seen.append(job['n'])
+
+        run([{'n': n} for n in range(5)], [Stage('one', lambda job: None)], on_done=record)
+        self.assertEqual(sorted(seen), list(range(5)))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)